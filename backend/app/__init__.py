@@ -67,6 +67,10 @@ def create_app(config_name='default'):
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(ml_bp)
     
+    # torch's thread pool is process-wide, so size it once here
+    from app.services.forecasting_service import configure_torch_threads
+    configure_torch_threads()
+    
     # Health check endpoint
     @app.route('/api/health')
     def health_check():
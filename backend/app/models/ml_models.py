@@ -124,15 +124,23 @@ class ModelPrediction(db.Model):
 class CausalRelationship(db.Model):
     """Store discovered causal relationships from causal discovery algorithms."""
     __tablename__ = 'causal_relationships'
+    __table_args__ = (
+        db.Index('ix_causal_rel_version_effect', 'model_version', 'effect_variable'),
+        db.Index('ix_causal_rel_version_cause', 'model_version', 'cause_variable'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     
+    # Training run that produced this row
+    model_version = db.Column(db.String(20), index=True)  # matches ModelRegistry version
+    data_hash = db.Column(db.String(32), index=True)
+    
     # Relationship identification
     cause_variable = db.Column(db.String(100), nullable=False, index=True)
     effect_variable = db.Column(db.String(100), nullable=False, index=True)
     
     # Discovery method
-    discovery_method = db.Column(db.String(50))  # pc_algorithm, granger, transfer_entropy
+    discovery_method = db.Column(db.String(50), index=True)  # pc_algorithm, granger_causality, consensus_dag
     
     # Effect statistics
     effect_size = db.Column(db.Float)  # Estimated causal effect
@@ -175,9 +183,53 @@ class CausalRelationship(db.Model):
             'optimal_lag': self.optimal_lag,
             'edge_strength': self.edge_strength,
             'confidence_score': self.confidence_score,
+            'sample_size': self.sample_size,
+            'model_version': self.model_version,
+            'data_hash': self.data_hash,
             'is_validated': self.is_validated,
         }
     
+    @classmethod
+    def bulk_save(cls, relationships, model_version, data_hash=None):
+        """Replace all rows of a model version with the given relationships.
+        
+        Args:
+            relationships: List of column-name -> value dicts
+            model_version: Training run version the rows belong to
+            data_hash: Hash of the training data
+            
+        Returns:
+            Number of rows inserted
+        """
+        cls.query.filter_by(model_version=model_version).delete(synchronize_session=False)
+        
+        now = datetime.utcnow()
+        mappings = [
+            {
+                **rel,
+                'model_version': model_version,
+                'data_hash': data_hash,
+                'created_at': now,
+                'updated_at': now,
+            }
+            for rel in relationships
+        ]
+        if mappings:
+            db.session.bulk_insert_mappings(cls, mappings)
+        db.session.commit()
+        return len(mappings)
+    
+    @classmethod
+    def latest_version(cls):
+        """Most recently written model version, or None if the table is empty."""
+        row = (
+            db.session.query(cls.model_version)
+            .filter(cls.model_version.isnot(None))
+            .order_by(cls.created_at.desc(), cls.id.desc())
+            .first()
+        )
+        return row[0] if row else None
+    
     def __repr__(self):
         return f'<CausalRelationship {self.cause_variable} -> {self.effect_variable}>'
 
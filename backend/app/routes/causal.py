@@ -7,6 +7,17 @@ from app.models.activity import Activity
 causal_bp = Blueprint('causal', __name__)
 
 
+def _parse_flag(value) -> bool:
+    """JSON boolean, 0/1, or a 'true'/'false' style string; ValueError otherwise."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ('true', '1', 'yes', 'false', '0', 'no'):
+        return value.strip().lower() in ('true', '1', 'yes')
+    raise ValueError(f'not a boolean: {value!r}')
+
+
 @causal_bp.route('/graphs', methods=['GET'])
 @jwt_required()
 def get_causal_graphs():
@@ -144,25 +155,47 @@ def estimate_treatment_effects():
     treatment = data.get('treatment')  # e.g., 'interest_rates'
     outcome = data.get('outcome')  # e.g., 'tech_returns'
     dag_structure = data.get('dag_structure')
+    try:
+        refute = _parse_flag(data.get('refute', False))  # queue refutation tests
+        # Each simulation is a DoWhy re-estimation on the shared refutation pool
+        num_simulations = max(1, min(int(data.get('num_simulations', 100)), 1000))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'refute must be a boolean and num_simulations an integer'}), 400
     
     if not treatment or not outcome:
         return jsonify({'error': 'Treatment and outcome are required'}), 400
     
     # Run causal effect estimation
     from app.services.causal_service import estimate_causal_effect
-    result = estimate_causal_effect(treatment, outcome, dag_structure)
+    result = estimate_causal_effect(
+        treatment, outcome, dag_structure,
+        refute=refute, num_simulations=num_simulations
+    )
     
     # Log activity
     Activity.log_activity(
         user_id=current_user_id,
         activity_type='causal_analysis',
         title=f'Estimated effect: {treatment} → {outcome}',
-        metadata={'result': result}
+        activity_metadata={'result': result}
     )
     
     return jsonify(result), 200
 
 
+@causal_bp.route('/estimate-effects/<job_id>', methods=['GET'])
+@jwt_required()
+def get_refutation_results(job_id):
+    """Poll the refutation tests queued by an effect estimate"""
+    from app.services.treatment_effects import get_refutation_job
+    job = get_refutation_job(job_id)
+    
+    if not job:
+        return jsonify({'error': 'Refutation job not found'}), 404
+    
+    return jsonify(job), 200
+
+
 @causal_bp.route('/sensitivity-matrix', methods=['GET'])
 @jwt_required(optional=True)
 def get_sensitivity_matrix():
@@ -22,13 +22,28 @@ from ..services.ml_training_pipeline import (
     MLTrainingPipeline, 
     PredictionService, 
     ModelRegistry,
+    GRANGER_MAX_LAG,
+    FORECAST_CACHE_HORIZONS,
+    rolling_ate_path,
+    invalidate_forecast_cache,
+    get_forecast_cache,
     get_training_pipeline,
     get_prediction_service
 )
 from ..services.data_pipeline import DataPipeline
-from ..services.causal_discovery import CausalDiscoveryEngine
+from ..services.causal_discovery import CausalDiscoveryEngine, get_causal_discovery_engine
 from ..services.regime_detection import MarketRegimeDetector, detect_current_regime
+from ..services.causal_service import (
+    refresh_effect_table,
+    invalidate_effect_table,
+    invalidate_cate_surface,
+    estimate_conditional_effect
+)
+from ..models.ml_models import CausalRelationship
+from .. import db
+from sqlalchemy.exc import SQLAlchemyError
 import pandas as pd
+import numpy as np
 
 logger = logging.getLogger(__name__)
 ml_bp = Blueprint('ml', __name__, url_prefix='/api/ml')
@@ -72,6 +87,9 @@ def start_training():
         # Get pipeline
         pipeline = get_training_pipeline(fred_api_key=fred_api_key)
         
+        # Training writes to the database from a worker thread
+        app = current_app._get_current_object()
+        
         # Create job ID
         job_id = str(uuid.uuid4())[:8]
         _training_jobs[job_id] = {
@@ -85,11 +103,12 @@ def start_training():
         # Run training in background thread
         def run_training():
             try:
-                result = pipeline.run_full_pipeline(
-                    start_date=start_date,
-                    end_date=end_date,
-                    skip_data_fetch=skip_data_fetch
-                )
+                with app.app_context():
+                    result = pipeline.run_full_pipeline(
+                        start_date=start_date,
+                        end_date=end_date,
+                        skip_data_fetch=skip_data_fetch
+                    )
                 if 'error' in result:
                     _training_jobs[job_id]['status'] = 'failed'
                     _training_jobs[job_id]['error'] = result['error']
@@ -187,6 +206,9 @@ def fetch_data():
         pipeline = DataPipeline(fred_api_key=fred_api_key)
         result = pipeline.run_full_pipeline(start_date=start_date, end_date=end_date)
         
+        # Precompute treatment effects for the new data in the background
+        refresh_effect_table(background=True)
+        
         return jsonify({
             'success': True,
             'result': result
@@ -255,6 +277,9 @@ def predict_sector():
     """
     Predict sector returns.
     
+    Served from the forecast cache precomputed for the active model version
+    (standard horizons 1, 5, 21 and 63 days, and any horizon up to 63).
+    
     Request body:
     {
         "sector": "Technology",
@@ -265,7 +290,7 @@ def predict_sector():
         data = request.get_json() or {}
         
         sector = data.get('sector', 'Technology')
-        horizon = min(data.get('horizon', 21), 30)  # Cap at 30 days
+        horizon = min(data.get('horizon', 21), max(FORECAST_CACHE_HORIZONS))  # Cap at 63 days
         
         # Load recent data
         feature_path = os.path.join(DATA_DIR, 'processed', 'feature_matrix.parquet')
@@ -305,10 +330,21 @@ def predict_sector():
                 'message': 'Using demo predictions. Train ML models for real forecasts.'
             })
         
+        # Precomputed forecasts need no data or model loading
+        cache = get_forecast_cache()
+        cached = cache.lookup(sector, horizon) if cache is not None else None
+        if cached is not None:
+            return jsonify({
+                'success': True,
+                'sector': sector,
+                'horizon': horizon,
+                'predictions': cached
+            })
+        
         features = pd.read_parquet(feature_path)
         
         # Find sector column
-        sector_col = f"{sector}_Return_1d"
+        sector_col = f"{sector.replace(' ', '_')}_Return_1d"
         if sector_col not in features.columns:
             # Try to find similar
             similar = [c for c in features.columns if sector.lower() in c.lower()]
@@ -345,17 +381,52 @@ def predict_volatility():
     """
     Predict volatility using GARCH models.
     
+    Forecasts start from each sector's online GARCH state, updated with
+    every new return without refitting. Volatility paths for all requested
+    sectors are simulated together; ci_lower/ci_upper are the 2.5/97.5
+    percentile bands. method "analytic" returns the closed-form expected
+    variance path instead (no bands).
+    
     Request body:
     {
         "sector": "Technology",
-        "horizon": 21
+        "sectors": ["Technology", "Energy"],  # optional, instead of sector
+        "horizon": 21,
+        "method": "simulation",  # or "analytic"
+        "n_simulations": 1000
     }
     """
     try:
         data = request.get_json() or {}
         
         sector = data.get('sector', 'Technology')
-        horizon = min(data.get('horizon', 21), 30)  # Cap at 30 days
+        try:
+            horizon = max(1, min(int(data.get('horizon', 21)), 30))  # Cap at 30 days
+            n_simulations = max(1, min(int(data.get('n_simulations', 1000)), 10000))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'horizon and n_simulations must be integers'
+            }), 400
+        
+        method = data.get('method', 'simulation')
+        if method not in ('analytic', 'simulation'):
+            return jsonify({
+                'success': False,
+                'error': "method must be 'analytic' or 'simulation'"
+            }), 400
+        
+        # Several sectors share one simulation
+        requested = data.get('sectors')
+        if requested is not None and not (
+            isinstance(requested, list) and all(isinstance(name, str) for name in requested)
+        ):
+            return jsonify({
+                'success': False,
+                'error': 'sectors must be a list of sector names'
+            }), 400
+        multi_sector = bool(requested)
+        sectors = requested if multi_sector else [sector]
         
         # Load recent data
         feature_path = os.path.join(DATA_DIR, 'processed', 'feature_matrix.parquet')
@@ -395,54 +466,63 @@ def predict_volatility():
                 'message': 'Using demo predictions. Train ML models for GARCH forecasts.'
             })
         
-        features = pd.read_parquet(feature_path)
-        
-        # Get return column
-        sector_col = f"{sector}_Return_1d"
-        if sector_col not in features.columns:
-            sector_col = [c for c in features.columns if sector.lower() in c.lower() and 'Return' in c][0]
-        
-        from ..services.forecasting_service import GARCHForecaster
-        
-        recent_returns = features[sector_col].dropna().tail(500)
-        
-        # Try loading pre-trained GARCH model from registry first
-        garch = GARCHForecaster()
-        pretrained_loaded = False
+        from ..services.forecasting_service import get_volatility_nowcaster, simulate_garch_paths
         
-        try:
-            import glob
-            model_dir = os.path.join(DATA_DIR, 'models')
-            # Model files follow pattern: garch_{SectorName}_{version}.pkl
-            sector_name = sector.replace(' ', '_')
-            pattern = os.path.join(model_dir, f'garch_{sector_name}_*.pkl')
-            model_files = sorted(glob.glob(pattern), reverse=True)  # Latest first
-            
-            if model_files:
-                garch.load(model_files[0])
-                pretrained_loaded = True
-                logger.info(f"Loaded pre-trained GARCH for {sector}: {os.path.basename(model_files[0])}")
-        except Exception as e:
-            logger.warning(f"Failed to load pre-trained GARCH for {sector}: {e}")
+        # Online GARCH states are already current with the feature store;
+        # no model is loaded or fitted per request
+        nowcaster = get_volatility_nowcaster()
+        forecasts, states = {}, {}
         
-        if not pretrained_loaded:
-            garch.fit(recent_returns)
-            logger.info(f"Fitted fresh GARCH model for {sector}")
+        for name in sectors:
+            state = nowcaster.get_state(name)
+            if state is None:
+                forecasts[name] = {'error': f'No volatility model available for {name}'}
+            else:
+                states[name] = state
+        
+        if method == 'analytic':
+            for name, state in states.items():
+                variance = state.forecast(horizon)
+                forecasts[name] = {'volatility': np.sqrt(variance * 252), 'variance': variance}
+        elif states:
+            # One vectorized simulation for every sector
+            sims = simulate_garch_paths([s.as_params() for s in states.values()], horizon=horizon, n_simulations=n_simulations)
+            for i, name in enumerate(states):
+                forecasts[name] = {key: sims[key][i] for key in ('volatility', 'variance', 'ci_lower', 'ci_upper')}
+        
+        def to_list(values):
+            return values.tolist() if hasattr(values, 'tolist') else list(values)
+        
+        results = {}
+        for name in sectors:
+            predictions = forecasts[name]
+            if 'error' in predictions:
+                results[name] = {'error': predictions['error']}
+                continue
+            results[name] = {
+                'volatility': to_list(predictions['volatility']),
+                'variance': to_list(predictions['variance']),
+                'ci_lower': to_list(predictions.get('ci_lower', [])),
+                'ci_upper': to_list(predictions.get('ci_upper', [])),
+                'as_of': states[name].last_date,
+            }
         
-        predictions = garch.predict(steps=horizon)
+        if multi_sector:
+            return jsonify({
+                'success': True,
+                'sectors': results,
+                'horizon': horizon
+            })
         
-        vol_list = predictions['volatility'].tolist() if hasattr(predictions['volatility'], 'tolist') else list(predictions['volatility'])
-        var_list = predictions['variance'].tolist() if hasattr(predictions['variance'], 'tolist') else list(predictions['variance'])
+        if 'error' in results[sector]:
+            return jsonify({'success': False, 'error': results[sector]['error']}), 500
         
         return jsonify({
             'success': True,
             'sector': sector,
             'horizon': horizon,
-            'predictions': {
-                'volatility': vol_list,
-                'variance': var_list
-            },
-            'volatility': vol_list  # Top-level for frontend compatibility
+            'predictions': results[sector],
+            'volatility': results[sector]['volatility']  # Top-level for frontend compatibility
         })
         
     except Exception as e:
@@ -576,11 +656,37 @@ def get_regime_recommendations():
 # CAUSAL ANALYSIS ENDPOINTS
 # ============================================
 
+def _served_causal_version():
+    """
+    Model version whose persisted relationships the causal endpoints serve.
+    
+    Prefers the active causal model in the registry and falls back to the
+    most recently written version. Returns (version, hyperparameters), or
+    (None, {}) when nothing has been persisted yet or the table cannot be
+    read (e.g. a database not yet migrated), so callers compute live.
+    """
+    active = ModelRegistry().get_active_model('causal') or {}
+    version = active.get('version')
+    
+    try:
+        if version and CausalRelationship.query.filter_by(model_version=version).first():
+            return version, active.get('hyperparameters', {})
+        
+        return CausalRelationship.latest_version(), {}
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.warning(f"Persisted causal relationships unavailable, computing live: {e}")
+        return None, {}
+
+
 @ml_bp.route('/causal/granger', methods=['POST'])
 def compute_granger_causality():
     """
     Compute Granger causality between variables.
     
+    Served from the persisted training results when the pair was tested with
+    the same max_lag; otherwise the test is run on the feature matrix.
+    
     Request body:
     {
         "cause_variable": "Fed_Funds_Rate",
@@ -601,6 +707,36 @@ def compute_granger_causality():
                 'error': 'cause_variable and effect_variable required'
             }), 400
         
+        version, hyperparameters = _served_causal_version()
+        if version and int(max_lag) == hyperparameters.get('max_lag', GRANGER_MAX_LAG):
+            row = CausalRelationship.query.filter_by(
+                model_version=version,
+                cause_variable=cause,
+                effect_variable=effect,
+                discovery_method='granger_causality'
+            ).first()
+            
+            if row is not None:
+                significance = hyperparameters.get(
+                    'significance', get_causal_discovery_engine().significance_level
+                )
+                return jsonify({
+                    'success': True,
+                    'result': {
+                        'cause': cause,
+                        'effect': effect,
+                        'method': 'granger_causality',
+                        'is_causal': row.p_value is not None and row.p_value < significance,
+                        'p_value': row.p_value,
+                        'f_statistic': row.granger_f_statistic,
+                        'optimal_lag': row.optimal_lag,
+                        'significance_level': significance,
+                        'sample_size': row.sample_size,
+                        'model_version': version,
+                    },
+                    'source': 'database'
+                })
+        
         feature_path = os.path.join(DATA_DIR, 'processed', 'feature_matrix.parquet')
         
         if not os.path.exists(feature_path):
@@ -625,7 +761,8 @@ def compute_granger_causality():
         
         return jsonify({
             'success': True,
-            'result': result
+            'result': result,
+            'source': 'computed'
         })
         
     except Exception as e:
@@ -640,8 +777,75 @@ def compute_granger_causality():
 def get_causal_dag():
     """
     Get the learned causal DAG structure.
+    
+    Reads the consensus edges persisted by the latest training run and only
+    recomputes from the feature matrix when nothing has been persisted.
+    
+    Query params:
+        significance: Granger p-value cutoff (default: the level the served
+            model was trained with). Persisted edges left without any
+            supporting method at this level are dropped; a looser level
+            cannot add edges outside the persisted DAG.
     """
     try:
+        version, hyperparameters = _served_causal_version()
+        significance = request.args.get(
+            'significance',
+            hyperparameters.get('significance', get_causal_discovery_engine().significance_level),
+            type=float
+        )
+        
+        if version:
+            edge_rows = CausalRelationship.query.filter_by(
+                model_version=version, discovery_method='consensus_dag'
+            ).all()
+            
+            # Which methods found each edge
+            method_rows = CausalRelationship.query.filter(
+                CausalRelationship.model_version == version,
+                CausalRelationship.discovery_method.in_(['granger_causality', 'pc_algorithm'])
+            ).with_entities(
+                CausalRelationship.cause_variable,
+                CausalRelationship.effect_variable,
+                CausalRelationship.discovery_method,
+                CausalRelationship.p_value,
+            ).all()
+            methods = {}
+            for cause, effect, method, p_value in method_rows:
+                if method == 'granger_causality' and (p_value is None or p_value >= significance):
+                    continue
+                methods.setdefault((cause, effect), []).append(method)
+            
+            nodes = set()
+            edges = []
+            for row in edge_rows:
+                edge_methods = methods.get((row.cause_variable, row.effect_variable), [])
+                if not edge_methods:
+                    continue
+                nodes.update([row.cause_variable, row.effect_variable])
+                edges.append({
+                    'from': row.cause_variable,
+                    'to': row.effect_variable,
+                    'agreement_count': len(edge_methods),
+                    'methods': edge_methods,
+                    'avg_p_value': row.p_value,
+                    'strength': row.edge_strength,
+                    'weight': row.edge_strength,
+                })
+            
+            return jsonify({
+                'success': True,
+                'dag': {
+                    'nodes': sorted(nodes),
+                    'edges': edges,
+                    'min_methods': 1,
+                    'total_relationships': len(method_rows),
+                    'significance_level': significance,
+                },
+                'model_version': version,
+                'source': 'database'
+            })
+        
         feature_path = os.path.join(DATA_DIR, 'processed', 'feature_matrix.parquet')
         
         if not os.path.exists(feature_path):
@@ -656,12 +860,17 @@ def get_causal_dag():
         sector_cols = [c for c in features.columns if c.endswith('_Return_1d')]
         sector_returns = features[sector_cols].dropna()
         
-        engine = CausalDiscoveryEngine()
-        dag = engine.build_causal_dag(sector_returns)
+        engine = CausalDiscoveryEngine(significance_level=significance)
+        relationships = engine.discover_all_relationships(
+            sector_returns, methods=['granger', 'pc']
+        )
+        dag = engine.build_causal_dag(relationships)
+        dag['significance_level'] = significance
         
         return jsonify({
             'success': True,
-            'dag': dag
+            'dag': dag,
+            'source': 'computed'
         })
         
     except Exception as e:
@@ -672,6 +881,186 @@ def get_causal_dag():
         }), 500
 
 
+@ml_bp.route('/causal/drivers/<variable>', methods=['GET'])
+def get_causal_drivers(variable):
+    """
+    Get the variables that Granger-cause a given variable.
+    
+    Query params:
+        max_p_value: Significance cutoff (default: 0.05)
+        limit: Maximum number of drivers returned (default: 10)
+    """
+    try:
+        max_p_value = request.args.get('max_p_value', 0.05, type=float)
+        limit = request.args.get('limit', 10, type=int)
+        
+        version, _ = _served_causal_version()
+        if not version:
+            return jsonify({
+                'success': False,
+                'error': 'No persisted causal relationships. Train ML models first.'
+            }), 404
+        
+        rows = CausalRelationship.query.filter(
+            CausalRelationship.model_version == version,
+            CausalRelationship.effect_variable == variable,
+            CausalRelationship.discovery_method == 'granger_causality',
+            CausalRelationship.p_value < max_p_value
+        ).order_by(CausalRelationship.p_value.asc()).limit(limit).all()
+        
+        return jsonify({
+            'success': True,
+            'variable': variable,
+            'model_version': version,
+            'drivers': [
+                {
+                    'cause': row.cause_variable,
+                    'p_value': row.p_value,
+                    'f_statistic': row.granger_f_statistic,
+                    'optimal_lag': row.optimal_lag,
+                    'strength': row.edge_strength,
+                    'sample_size': row.sample_size,
+                }
+                for row in rows
+            ]
+        })
+        
+    except Exception as e:
+        logger.error(f"Driver lookup failed: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@ml_bp.route('/causal/rolling-effects', methods=['GET'])
+def get_rolling_effects():
+    """
+    Get the time-varying effect of a macro treatment on sector returns.
+    
+    Served from the rolling ATE series stored with the active treatment model.
+    
+    Query params:
+        treatment: Treatment variable (e.g. 'Fed_Funds_Rate_Change')
+        outcome: Optional sector or return column (default: all sectors)
+        start: Optional first date (YYYY-MM-DD)
+        end: Optional last date (YYYY-MM-DD)
+    """
+    try:
+        from ..services.treatment_effects import load_rolling_ate
+        
+        treatment = request.args.get('treatment')
+        outcome = request.args.get('outcome')
+        
+        if not treatment:
+            return jsonify({'success': False, 'error': 'treatment is required'}), 400
+        
+        active = ModelRegistry().get_active_model('treatment') or {}
+        version = active.get('version')
+        path = rolling_ate_path(version) if version else None
+        
+        if not path or not os.path.exists(path):
+            return jsonify({
+                'success': False,
+                'error': 'No rolling effects stored. Train ML models first.'
+            }), 404
+        
+        rolling = load_rolling_ate(path)
+        
+        if treatment not in rolling['treatments']:
+            return jsonify({
+                'success': False,
+                'error': f'Unknown treatment: {treatment}',
+                'available_treatments': rolling['treatments']
+            }), 404
+        
+        outcomes = rolling['outcomes']
+        if outcome:
+            outcomes = [o for o in outcomes if o in (outcome, f'{outcome}_Return_1d')]
+            if not outcomes:
+                return jsonify({
+                    'success': False,
+                    'error': f'Unknown outcome: {outcome}',
+                    'available_outcomes': rolling['outcomes']
+                }), 404
+        
+        dates = rolling['dates']
+        mask = np.ones(len(dates), dtype=bool)
+        if request.args.get('start'):
+            mask &= dates >= request.args['start']
+        if request.args.get('end'):
+            mask &= dates <= request.args['end']
+        
+        t = rolling['treatments'].index(treatment)
+        series = {}
+        for o in outcomes:
+            j = rolling['outcomes'].index(o)
+            ate = rolling['ate'][t, mask, j].astype(float)
+            se = rolling['standard_error'][t, mask, j].astype(float)
+            series[o.replace('_Return_1d', '')] = {
+                'ate': [None if np.isnan(v) else v for v in ate.tolist()],
+                'standard_error': [None if np.isnan(v) else v for v in se.tolist()],
+            }
+        
+        return jsonify({
+            'success': True,
+            'treatment': treatment,
+            'method': rolling['method'],
+            'window': rolling['window'],
+            'confounders': rolling['confounders'],
+            'model_version': version,
+            'dates': dates[mask].tolist(),
+            'sample_size': rolling['sample_size'][mask].tolist(),
+            'series': series
+        })
+        
+    except Exception as e:
+        logger.error(f"Rolling effects lookup failed: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@ml_bp.route('/causal/cate', methods=['POST'])
+def get_conditional_effect():
+    """
+    Get a treatment effect under given market conditions.
+    
+    Interpolated from the CATE surface stored with the active treatment model.
+    
+    Request body:
+    {
+        "treatment": "Fed_Funds_Rate_Change",
+        "outcome": "Technology",
+        "modifiers": {"VIX": 30, "Yield_Curve_Spread": -0.5}
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        treatment = data.get('treatment')
+        outcome = data.get('outcome')
+        
+        if not treatment or not outcome:
+            return jsonify({'success': False, 'error': 'treatment and outcome are required'}), 400
+        
+        result = estimate_conditional_effect(treatment, outcome, data.get('modifiers') or {})
+        if 'error' in result:
+            return jsonify({'success': False, **result}), 404
+        
+        return jsonify({
+            'success': True,
+            'result': result
+        })
+        
+    except Exception as e:
+        logger.error(f"CATE lookup failed: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @ml_bp.route('/causal/sensitivity-matrix', methods=['GET'])
 def get_sensitivity_matrix():
     """
@@ -844,6 +1233,14 @@ def activate_model(model_type, model_id):
         success = registry.set_active_model(model_type, model_id)
         
         if success:
+            if model_type == 'treatment':
+                invalidate_effect_table()
+                invalidate_cate_surface()
+            elif model_type == 'forecast':
+                from ..services.forecasting_service import get_volatility_nowcaster
+                get_volatility_nowcaster().reset()
+                invalidate_forecast_cache()
+            
             return jsonify({
                 'success': True,
                 'message': f'Model {model_id} activated'
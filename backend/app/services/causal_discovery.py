@@ -13,6 +13,7 @@ These replace the hardcoded SECTOR_SENSITIVITY_MATRIX with data-driven discoveri
 """
 
 import os
+import time
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
@@ -42,6 +43,7 @@ class CausalDiscoveryEngine:
             significance_level: p-value threshold for statistical tests
         """
         self.significance_level = significance_level
+        self.last_screening_report = None
         self._pc_available = False
         self._statsmodels_available = False
         self._check_dependencies()
@@ -121,7 +123,7 @@ class CausalDiscoveryEngine:
                         best_fstat = f_stat
                         best_lag = lag
             
-            is_causal = best_pvalue < self.significance_level
+            is_causal = bool(best_pvalue < self.significance_level)
             
             return {
                 'cause': cause_col,
@@ -228,6 +230,126 @@ class CausalDiscoveryEngine:
         
         return results_matrix, pvalue_matrix
     
+    def rolling_granger_causality(
+        self,
+        data: pd.DataFrame,
+        variables: Optional[List[str]] = None,
+        window: int = 252,
+        max_lag: int = 5,
+        step: int = 1,
+        refresh_every: int = 250,
+        output_path: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Granger causality matrices over a sliding window, from running sums.
+        
+        All pairwise Granger regressions are sub-blocks of one lagged design
+        z_t = [1, X(t-1), ..., X(t-max_lag)] with targets X(t), so each window
+        only needs the cross-products Z'Z, Z'Y and Y'Y. These are updated
+        incrementally as the window slides (add the new rows, subtract the
+        dropped rows) and recomputed exactly every refresh_every windows to
+        bound floating-point drift. Restricted and unrestricted residual sums
+        of squares for every pair and lag come from batched solves on those
+        sub-blocks, and each pair keeps its lowest p-value lag as in
+        granger_causality_test.
+        
+        Unlike grangercausalitytests, every lag order is fit on the same rows
+        (the first max_lag observations are always dropped), so F-statistics
+        for lags below max_lag differ slightly from the single-pair test.
+        
+        Args:
+            data: DataFrame with time series
+            variables: Variables to test (default: all columns)
+            window: Rows per estimation window
+            max_lag: Maximum lag order
+            step: Rows the window advances between outputs
+            refresh_every: Windows between exact recomputations of the sums
+            output_path: Optional .npz path to store the stacked results
+            
+        Returns:
+            Dictionary with window end dates and (n_windows, d, d) stacks of
+            adjacency, p-value, F-statistic and optimal-lag matrices, where
+            entry [w, i, j] refers to variable i Granger-causing variable j
+        """
+        if variables is None:
+            variables = list(data.columns)
+        
+        clean = data[variables].dropna()
+        X = clean.values.astype(float)
+        T, d = X.shape
+        L = max_lag
+        
+        if window < 2 * (2 * L + 1) or T < window + L:
+            return {'error': 'Insufficient data for rolling Granger causality'}
+        
+        Z, Y = _lagged_design(X, L)
+        n_rows = len(Z)
+        pair_index = _granger_pair_index(d, L)
+        causes, effects = pair_index['causes'], pair_index['effects']
+        
+        ends = list(range(window, n_rows + 1, step))
+        n_windows = len(ends)
+        p_values = np.ones((n_windows, d, d), dtype=np.float32)
+        f_stats = np.zeros((n_windows, d, d), dtype=np.float32)
+        lags = np.zeros((n_windows, d, d), dtype=np.uint8)
+        
+        logger.info(f"Rolling Granger causality: {d} variables, {n_windows} windows of {window} rows")
+        
+        G = H = yy = None
+        for w, end in enumerate(ends):
+            start = end - window
+            if G is None or w % refresh_every == 0:
+                Zw, Yw = Z[start:end], Y[start:end]
+                G, H, yy = Zw.T @ Zw, Zw.T @ Yw, np.einsum('ij,ij->j', Yw, Yw)
+            else:
+                # Slide: add rows entering the window, subtract rows leaving it
+                Z_in, Y_in = Z[end - step:end], Y[end - step:end]
+                Z_out, Y_out = Z[start - step:start], Y[start - step:start]
+                G += Z_in.T @ Z_in - Z_out.T @ Z_out
+                H += Z_in.T @ Y_in - Z_out.T @ Y_out
+                yy += np.einsum('ij,ij->j', Y_in, Y_in) - np.einsum('ij,ij->j', Y_out, Y_out)
+            
+            best_p, best_f, best_lag = _granger_from_cross_products(
+                G, H, yy, window, pair_index, L
+            )
+            p_values[w, causes, effects] = best_p
+            f_stats[w, causes, effects] = best_f
+            lags[w, causes, effects] = best_lag
+        
+        adjacency = p_values < self.significance_level
+        dates = np.array(clean.index[L:][np.array(ends) - 1].astype(str), dtype=str)
+        
+        result = {
+            'method': 'rolling_granger',
+            'variables': variables,
+            'dates': dates,
+            'adjacency': adjacency,
+            'p_values': p_values,
+            'f_statistics': f_stats,
+            'optimal_lags': lags,
+            'window': window,
+            'max_lag': max_lag,
+            'step': step,
+            'significance_level': self.significance_level,
+        }
+        
+        if output_path:
+            np.savez_compressed(
+                output_path,
+                variables=np.asarray(variables),
+                dates=dates,
+                adjacency=adjacency,
+                p_values=p_values,
+                f_statistics=f_stats,
+                optimal_lags=lags,
+                params=np.array([window, max_lag, step]),
+                significance_level=np.array(self.significance_level),
+            )
+            result['output_path'] = output_path
+            logger.info(f"Saved rolling Granger results to {output_path}")
+        
+        return result
+    
     # ============================================
     # PC ALGORITHM (Constraint-Based Discovery)
     # ============================================
@@ -338,6 +460,96 @@ class CausalDiscoveryEngine:
             'warning': 'Correlation does not imply causation - use for exploration only'
         }
     
+    # ============================================
+    # SCORE-BASED STRUCTURE LEARNING
+    # ============================================
+
+    def continuous_structure_learning(
+        self,
+        data: pd.DataFrame,
+        variables: Optional[List[str]] = None,
+        lambdas: Tuple[float, ...] = (0.1, 0.05, 0.02),
+        mu_path: Tuple[float, ...] = (1.0, 0.1, 0.01, 0.001),
+        w_threshold: float = 0.3,
+        standardize: bool = True,
+        tol: float = 1e-6
+    ) -> Dict[str, Any]:
+        """
+        Learn a weighted DAG by continuous optimization (NOTEARS/DAGMA family).
+
+        Minimizes the least-squares loss 0.5/n * ||X - XW||^2 with an L1
+        penalty over the weighted adjacency matrix W, subject to the smooth
+        log-determinant acyclicity function h(W) = -log det(I - W * W), which
+        is zero exactly when W is a DAG. The constraint is enforced along a
+        central path: for decreasing mu, L-BFGS-B minimizes
+        mu * (loss + lambda * |W|_1) + h(W), each solve warm-started from the
+        previous one. The penalty path is solved from the sparsest lambda
+        down, also warm-started, and the lambda with the lowest BIC is kept.
+
+        Loss and gradient are computed from the sample covariance, so each
+        evaluation costs O(d^3) regardless of sample size and there is no
+        conditioning-set search as in the PC algorithm.
+
+        Args:
+            data: DataFrame with variables
+            variables: Variables to include (default: all)
+            lambdas: L1 penalties to solve, warm-starting along the path
+            mu_path: Decreasing loss weights of the central path
+            w_threshold: Absolute weight below which edges are pruned
+            standardize: Standardize columns so weights are comparable
+            tol: Relative objective tolerance for each L-BFGS-B solve
+
+        Returns:
+            Dictionary with weighted edges, adjacency matrix and penalty path
+        """
+        if variables is None:
+            variables = list(data.columns)
+
+        analysis_data = data[variables].dropna()
+        n, d = analysis_data.shape
+
+        if n < 2 * d or n < 30:
+            return {'error': 'Insufficient data for continuous structure learning'}
+
+        X = analysis_data.values.astype(float)
+        X = X - X.mean(axis=0)
+        if standardize:
+            std = X.std(axis=0)
+            std[std == 0] = 1.0
+            X = X / std
+
+        # Sufficient statistic: loss and gradient only need X'X / n
+        cov = X.T @ X / n
+
+        logger.info(f"Running continuous structure learning on {d} variables with {n} samples")
+
+        best, path, n_evals = _continuous_structure_from_cov(
+            cov, n, lambdas, mu_path, w_threshold, tol
+        )
+
+        W = best['W']
+        edges = []
+        for i, j in zip(*np.nonzero(W)):
+            edges.append({
+                'from': variables[i],
+                'to': variables[j],
+                'weight': float(W[i, j]),
+                'method': 'continuous_optimization'
+            })
+
+        return {
+            'method': 'continuous_optimization',
+            'edges': edges,
+            'nodes': variables,
+            'adjacency': pd.DataFrame(W, index=variables, columns=variables),
+            'selected_lambda': best['lambda'],
+            'lambda_path': path,
+            'function_evaluations': n_evals,
+            'w_threshold': w_threshold,
+            'standardized': standardize,
+            'sample_size': n,
+        }
+
     # ============================================
     # TRANSFER ENTROPY
     # ============================================
@@ -450,19 +662,107 @@ class CausalDiscoveryEngine:
     # COMBINED DISCOVERY
     # ============================================
     
+    def screen_candidate_pairs(
+        self,
+        data: pd.DataFrame,
+        variables: Optional[List[str]] = None,
+        max_lag: int = 10,
+        top_k: int = 5,
+        threshold: float = 0.05
+    ) -> Dict[str, Any]:
+        """
+        Screen ordered (cause, effect) pairs by lagged cross-correlation.
+        
+        The full lagged cross-correlation tensor is computed once with FFTs:
+        entry [l, i, j] is corr(X_i(t - l), X_j(t)) for l = 1..max_lag. Each
+        pair is scored by its largest absolute lagged correlation, and for
+        every effect only the top_k causes scoring above threshold are kept
+        as candidates for the expensive pairwise tests.
+        
+        Args:
+            data: DataFrame with time series
+            variables: Variables to screen (default: all columns)
+            max_lag: Maximum lag to correlate over
+            top_k: Candidate causes kept per effect
+            threshold: Minimum absolute lagged correlation to keep a pair
+            
+        Returns:
+            Dictionary with candidate pairs, pair scores and best lags
+        """
+        if variables is None:
+            variables = list(data.columns)
+        
+        Z = data[variables].dropna().values.astype(float)
+        T, d = Z.shape
+        
+        if T <= max_lag + 10:
+            return {'error': 'Insufficient data for correlation screening'}
+        
+        std = Z.std(axis=0)
+        std[std == 0] = 1.0
+        Z = (Z - Z.mean(axis=0)) / std
+        
+        # Zero-pad to avoid circular wrap-around, round up for a fast FFT size
+        nfft = 1 << int(np.ceil(np.log2(2 * T)))
+        F = np.fft.rfft(Z, n=nfft, axis=0)
+        
+        # xcorr[l, i, j] = sum_t Z[t - l, i] * Z[t, j], one inverse FFT per effect
+        xcorr = np.empty((max_lag, d, d))
+        for j in range(d):
+            cc = np.fft.irfft(np.conj(F) * F[:, j:j + 1], n=nfft, axis=0)
+            xcorr[:, :, j] = cc[1:max_lag + 1]
+        xcorr /= (T - np.arange(1, max_lag + 1))[:, None, None]
+        
+        abs_xcorr = np.abs(xcorr)
+        scores = abs_xcorr.max(axis=0)
+        best_lags = abs_xcorr.argmax(axis=0) + 1
+        np.fill_diagonal(scores, 0.0)
+        
+        pairs = []
+        for j in range(d):
+            ranked = np.argsort(-scores[:, j])[:top_k]
+            for i in ranked:
+                if i != j and scores[i, j] > threshold:
+                    pairs.append((variables[i], variables[j]))
+        
+        return {
+            'pairs': pairs,
+            'scores': pd.DataFrame(scores, index=variables, columns=variables),
+            'best_lags': pd.DataFrame(best_lags, index=variables, columns=variables),
+            'cross_correlation': xcorr,
+            'pairs_total': d * (d - 1),
+            'pairs_kept': len(pairs),
+            'max_lag': max_lag,
+            'top_k': top_k,
+            'threshold': threshold,
+            'sample_size': T,
+        }
+    
     def discover_all_relationships(
         self,
         data: pd.DataFrame,
         variables: Optional[List[str]] = None,
-        methods: List[str] = ['granger', 'correlation']
+        methods: List[str] = ['granger', 'correlation'],
+        screen: bool = False,
+        screen_top_k: int = 5,
+        screen_threshold: float = 0.05
     ) -> List[Dict[str, Any]]:
         """
         Run multiple causal discovery methods and combine results.
         
+        With screen=True a lagged cross-correlation pre-filter runs first and
+        only its candidate pairs are passed to the Granger, transfer entropy
+        and PC stages. The number of skipped tests and the estimated wall time
+        saved are stored in self.last_screening_report.
+        
         Args:
             data: DataFrame with variables
             variables: Variables to analyze
-            methods: List of methods to use
+            methods: List of methods to use ('granger', 'pc', 'continuous',
+                'transfer_entropy', 'correlation')
+            screen: Prune candidate pairs before the expensive tests
+            screen_top_k: Candidate causes kept per effect when screening
+            screen_threshold: Minimum lagged correlation kept when screening
             
         Returns:
             List of discovered causal relationships
@@ -470,24 +770,65 @@ class CausalDiscoveryEngine:
         if variables is None:
             variables = list(data.columns)
         
+        # A report from an earlier screened call must not outlive it
+        self.last_screening_report = None
         all_relationships = []
         
+        all_pairs = [
+            (cause, effect)
+            for cause in variables
+            for effect in variables
+            if cause != effect
+        ]
+        candidate_pairs = all_pairs
+        screening = None
+        
+        if screen:
+            start = time.perf_counter()
+            screening = self.screen_candidate_pairs(
+                data, variables, top_k=screen_top_k, threshold=screen_threshold
+            )
+            if 'error' in screening:
+                logger.warning(f"Screening skipped: {screening['error']}")
+                screening = None
+            else:
+                candidate_pairs = screening['pairs']
+                screening['screening_seconds'] = time.perf_counter() - start
+                logger.info(
+                    f"Screening kept {len(candidate_pairs)} of {len(all_pairs)} pairs"
+                )
+        
+        stage_timings = {}
+        
         # Granger causality
         if 'granger' in methods:
             logger.info("Running Granger causality tests...")
-            for i, cause in enumerate(variables):
-                for j, effect in enumerate(variables):
-                    if i != j:
-                        result = self.granger_causality_test(data, cause, effect)
-                        if 'error' not in result and result.get('is_causal', False):
-                            all_relationships.append(result)
+            start = time.perf_counter()
+            for cause, effect in candidate_pairs:
+                result = self.granger_causality_test(data, cause, effect)
+                if 'error' not in result and result.get('is_causal', False):
+                    all_relationships.append(result)
+            stage_timings['granger'] = (time.perf_counter() - start, len(candidate_pairs))
         
         # PC algorithm
         if 'pc' in methods:
             logger.info("Running PC algorithm...")
-            pc_result = self.pc_algorithm(data, variables)
+            pc_variables = variables
+            if screening is not None:
+                screened = {v for pair in candidate_pairs for v in pair}
+                pc_variables = [v for v in variables if v in screened]
+            candidate_set = set(candidate_pairs)
+            
+            start = time.perf_counter()
+            pc_result = self.pc_algorithm(data, pc_variables)
+            stage_timings['pc'] = (time.perf_counter() - start, len(pc_variables))
+            
             if 'edges' in pc_result:
                 for edge in pc_result['edges']:
+                    if screening is not None and \
+                            (edge['from'], edge['to']) not in candidate_set and \
+                            (edge['to'], edge['from']) not in candidate_set:
+                        continue
                     all_relationships.append({
                         'cause': edge['from'],
                         'effect': edge['to'],
@@ -495,15 +836,37 @@ class CausalDiscoveryEngine:
                         'is_causal': True,
                     })
         
+        # Continuous-optimization structure learning
+        if 'continuous' in methods:
+            logger.info("Running continuous-optimization structure learning...")
+            structure_result = self.continuous_structure_learning(data, variables)
+            for edge in structure_result.get('edges', []):
+                all_relationships.append({
+                    'cause': edge['from'],
+                    'effect': edge['to'],
+                    'method': 'continuous_optimization',
+                    'weight': edge['weight'],
+                    'is_causal': True,
+                })
+        
         # Transfer entropy
         if 'transfer_entropy' in methods:
             logger.info("Computing transfer entropy...")
-            for i, source in enumerate(variables):
-                for j, target in enumerate(variables):
-                    if i != j:
-                        result = self.transfer_entropy(data, source, target)
-                        if 'error' not in result and result.get('is_causal', False):
-                            all_relationships.append(result)
+            start = time.perf_counter()
+            for source, target in candidate_pairs:
+                result = self.transfer_entropy(data, source, target)
+                if 'error' not in result and result.get('is_causal', False):
+                    all_relationships.append(result)
+            stage_timings['transfer_entropy'] = (time.perf_counter() - start, len(candidate_pairs))
+        
+        if screening is not None:
+            self.last_screening_report = self._screening_report(
+                screening, len(all_pairs), len(variables), stage_timings
+            )
+            logger.info(
+                f"Screening skipped {self.last_screening_report['tests_skipped']} tests, "
+                f"saving ~{self.last_screening_report['estimated_seconds_saved']:.1f}s"
+            )
         
         # Correlation-based (fallback)
         if 'correlation' in methods:
@@ -520,6 +883,199 @@ class CausalDiscoveryEngine:
         
         return all_relationships
     
+    def _screening_report(
+        self,
+        screening: Dict[str, Any],
+        n_pairs: int,
+        n_variables: int,
+        stage_timings: Dict[str, Tuple[float, int]]
+    ) -> Dict[str, Any]:
+        """Summarize tests skipped by screening and the wall time they would have cost."""
+        n_kept = screening['pairs_kept']
+        report = {
+            'pairs_total': n_pairs,
+            'pairs_kept': n_kept,
+            'screening_seconds': screening['screening_seconds'],
+            'tests_skipped': 0,
+            'by_method': {},
+        }
+        estimated_saved = 0.0
+        
+        for method, (elapsed, n_run) in stage_timings.items():
+            if method == 'pc':
+                # PC cost grows with the variable count; report variables dropped
+                skipped = n_variables - n_run
+                report['by_method'][method] = {'variables_dropped': skipped, 'seconds': elapsed}
+                continue
+            skipped = n_pairs - n_run
+            per_test = elapsed / n_run if n_run else 0.0
+            report['tests_skipped'] += skipped
+            estimated_saved += skipped * per_test
+            report['by_method'][method] = {
+                'tests_run': n_run,
+                'tests_skipped': skipped,
+                'seconds': elapsed,
+            }
+        
+        report['estimated_seconds_saved'] = estimated_saved - screening['screening_seconds']
+        return report
+    
+    # ============================================
+    # STABILITY SELECTION
+    # ============================================
+    
+    def stability_selection(
+        self,
+        data: pd.DataFrame,
+        variables: Optional[List[str]] = None,
+        methods: List[str] = ['granger'],
+        n_bootstrap: int = 200,
+        block_size: Optional[int] = None,
+        batch_size: int = 20,
+        min_bootstrap: int = 40,
+        tol: float = 0.01,
+        selection_threshold: float = 0.6,
+        min_methods: int = 1,
+        max_lag: int = 5,
+        n_jobs: int = -1,
+        random_state: int = 42
+    ) -> Dict[str, Any]:
+        """
+        Edge selection frequencies over moving-block bootstrap resamples.
+        
+        The lagged design is built once from the original series; each
+        resample then draws circular blocks of its rows (preserving
+        short-range autocorrelation while every row keeps its true lags),
+        forms the cross-products once and derives every requested method
+        from them: Granger tests from Z'Z / Z'Y and
+        continuous structure learning from the contemporaneous covariance,
+        which is a block of the same sums. Resamples run in parallel with
+        joblib in batches; sampling stops early once no edge frequency moves
+        by more than tol between consecutive batches.
+        
+        Args:
+            data: DataFrame with time series
+            variables: Variables to analyze (default: all columns)
+            methods: Methods to resample ('granger', 'continuous')
+            n_bootstrap: Maximum number of resamples
+            block_size: Block length in rows (default: T ** (1/3))
+            batch_size: Resamples per parallel batch / convergence check
+            min_bootstrap: Resamples drawn before early stopping is allowed
+            tol: Maximum change in any edge frequency to declare convergence
+            selection_threshold: Frequency at which an edge counts as stable
+            min_methods: Methods that must select an edge within one resample
+            max_lag: Maximum Granger lag
+            n_jobs: Parallel workers (-1 for all cores)
+            random_state: Seed for the resampling streams
+            
+        Returns:
+            Dictionary with stable edges, per-method frequency matrices and
+            relationships usable by build_causal_dag
+        """
+        from joblib import Parallel, delayed
+        
+        supported = [m for m in methods if m in ('granger', 'continuous')]
+        if len(supported) < len(methods):
+            logger.warning(
+                f"Stability selection ignores unsupported methods: {sorted(set(methods) - set(supported))}"
+            )
+        if not supported:
+            return {'error': 'No supported methods for stability selection'}
+        
+        if variables is None:
+            variables = list(data.columns)
+        
+        X = data[variables].dropna().values.astype(float)
+        T, d = X.shape
+        
+        if T < 10 * max_lag or T < 100:
+            return {'error': 'Insufficient data for stability selection'}
+        
+        if block_size is None:
+            block_size = max(int(round(T ** (1 / 3))), max_lag + 1)
+        
+        Z, Y = _lagged_design(X, max_lag)
+        
+        seeds = np.random.SeedSequence(random_state).generate_state(n_bootstrap)
+        config = {
+            'methods': supported,
+            'block_size': block_size,
+            'max_lag': max_lag,
+            'significance_level': self.significance_level,
+        }
+        
+        counts = {m: np.zeros((d, d)) for m in supported}
+        combined = np.zeros((d, d))
+        done = 0
+        converged = False
+        history = []
+        previous = None
+        
+        logger.info(f"Stability selection: up to {n_bootstrap} resamples of {d} variables, blocks of {block_size}")
+        
+        with Parallel(n_jobs=n_jobs) as parallel:
+            while done < n_bootstrap:
+                batch = min(batch_size, n_bootstrap - done)
+                outputs = parallel(
+                    delayed(_stability_resample)(Z, Y, int(seed), config)
+                    for seed in seeds[done:done + batch]
+                )
+                for selected in outputs:
+                    votes = np.zeros((d, d))
+                    for m in supported:
+                        counts[m] += selected[m]
+                        votes += selected[m]
+                    combined += votes >= min_methods
+                done += batch
+                
+                frequency = combined / done
+                if previous is not None:
+                    change = float(np.abs(frequency - previous).max())
+                    history.append({'n_resamples': done, 'max_change': change})
+                    if done >= min_bootstrap and change <= tol:
+                        converged = True
+                        break
+                previous = frequency
+        
+        frequency = combined / done
+        method_frequency = {
+            m: pd.DataFrame(counts[m] / done, index=variables, columns=variables)
+            for m in supported
+        }
+        
+        edges = []
+        relationships = []
+        for i, j in zip(*np.nonzero(frequency >= selection_threshold)):
+            edge = {
+                'from': variables[i],
+                'to': variables[j],
+                'selection_frequency': float(frequency[i, j]),
+                'method_frequency': {m: float(counts[m][i, j] / done) for m in supported},
+            }
+            edges.append(edge)
+            relationships.append({
+                'cause': variables[i],
+                'effect': variables[j],
+                'method': 'stability_selection',
+                'selection_frequency': edge['selection_frequency'],
+                'is_causal': True,
+            })
+        
+        return {
+            'method': 'stability_selection',
+            'edges': edges,
+            'relationships': relationships,
+            'nodes': variables,
+            'frequency': pd.DataFrame(frequency, index=variables, columns=variables),
+            'method_frequency': method_frequency,
+            'n_resamples': done,
+            'converged': converged,
+            'convergence_history': history,
+            'block_size': block_size,
+            'selection_threshold': selection_threshold,
+            'sample_size': T,
+        }
+    
     def build_causal_dag(
         self,
         relationships: List[Dict[str, Any]],
@@ -566,17 +1122,35 @@ class CausalDiscoveryEngine:
                 
                 # Aggregate evidence
                 details = edge_details[edge_key]
-                avg_pvalue = np.mean([d.get('p_value', 0.5) for d in details if 'p_value' in d])
+                p_values = [d['p_value'] for d in details if d.get('p_value') is not None]
+                avg_pvalue = float(np.mean(p_values)) if p_values else None
                 methods_used = list(set(d.get('method', 'unknown') for d in details))
+                weights = [d['weight'] for d in details if 'weight' in d]
+                frequencies = [d['selection_frequency'] for d in details if 'selection_frequency' in d]
                 
-                edges.append({
+                edge = {
                     'from': cause,
                     'to': effect,
                     'agreement_count': count,
                     'methods': methods_used,
-                    'avg_p_value': float(avg_pvalue),
-                    'strength': 1.0 - avg_pvalue,  # Higher strength for lower p-value
-                })
+                    'avg_p_value': avg_pvalue,
+                    # Higher strength for lower p-value; None when no method scored the edge
+                    'strength': 1.0 - avg_pvalue if avg_pvalue is not None else None,
+                }
+                
+                # Structure-learning weights are (standardized) effect sizes
+                if weights:
+                    edge['effect_strength'] = float(np.mean(weights))
+                    if avg_pvalue is None:
+                        edge['strength'] = float(min(1.0, abs(edge['effect_strength'])))
+                
+                # Bootstrap selection frequency is a direct stability score
+                if frequencies:
+                    edge['selection_frequency'] = float(np.mean(frequencies))
+                    if avg_pvalue is None:
+                        edge['strength'] = edge['selection_frequency']
+                
+                edges.append(edge)
         
         return {
             'nodes': list(nodes),
@@ -586,6 +1160,231 @@ class CausalDiscoveryEngine:
         }
 
 
+# ============================================
+# SHARED SUFFICIENT-STATISTIC KERNELS
+# ============================================
+
+def _lagged_design(X: np.ndarray, max_lag: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Lagged design [1, X(t-1), ..., X(t-max_lag)] (lag-major columns) and targets X(t)."""
+    T = len(X)
+    Z = np.hstack([np.ones((T - max_lag, 1))] + [X[max_lag - l:T - l] for l in range(1, max_lag + 1)])
+    return Z, X[max_lag:]
+
+
+def _granger_pair_index(d: int, max_lag: int) -> Dict[str, Any]:
+    """Design-column indices of every restricted and unrestricted Granger regression."""
+    def _cols(var_idx, lag):
+        return [1 + (l - 1) * d + var_idx for l in range(1, lag + 1)]
+    
+    causes, effects = np.nonzero(~np.eye(d, dtype=bool))
+    return {
+        'causes': causes,
+        'effects': effects,
+        'restricted': {
+            p: np.array([[0] + _cols(j, p) for j in range(d)]) for p in range(1, max_lag + 1)
+        },
+        'unrestricted': {
+            p: np.array([[0] + _cols(j, p) + _cols(i, p) for i, j in zip(causes, effects)])
+            for p in range(1, max_lag + 1)
+        },
+    }
+
+
+def _batched_rss(
+    G: np.ndarray,
+    H: np.ndarray,
+    yy: np.ndarray,
+    idx: np.ndarray,
+    target: np.ndarray
+) -> np.ndarray:
+    """Residual sums of squares of many sub-regressions of one set of cross-products."""
+    Gs = G[idx[:, :, None], idx[:, None, :]]
+    hs = H[idx, target[:, None]]
+    try:
+        beta = np.linalg.solve(Gs, hs[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        beta = np.einsum('kab,kb->ka', np.linalg.pinv(Gs), hs)
+    return yy[target] - np.einsum('ka,ka->k', hs, beta)
+
+
+def _granger_from_cross_products(
+    G: np.ndarray,
+    H: np.ndarray,
+    yy: np.ndarray,
+    n_obs: int,
+    pair_index: Dict[str, Any],
+    max_lag: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Granger ssr F-tests for every ordered pair from Z'Z, Z'Y and diag(Y'Y).
+    
+    Returns the lowest p-value over lags 1..max_lag per pair, with its
+    F-statistic and lag, ordered as pair_index['causes'/'effects'].
+    """
+    d = len(yy)
+    effects = pair_index['effects']
+    best_p = np.ones(len(effects))
+    best_f = np.zeros(len(effects))
+    best_lag = np.ones(len(effects), dtype=np.uint8)
+    
+    for p in range(1, max_lag + 1):
+        rss_r = _batched_rss(G, H, yy, pair_index['restricted'][p], np.arange(d))[effects]
+        rss_u = _batched_rss(G, H, yy, pair_index['unrestricted'][p], effects)
+        df_denom = n_obs - 2 * p - 1
+        f = ((rss_r - rss_u) / p) / np.maximum(rss_u / df_denom, 1e-300)
+        pv = stats.f.sf(f, p, df_denom)
+        better = pv < best_p
+        best_p[better] = pv[better]
+        best_f[better] = f[better]
+        best_lag[better] = p
+    
+    return best_p, best_f, best_lag
+
+
+def _continuous_structure_from_cov(
+    cov: np.ndarray,
+    n: int,
+    lambdas: Tuple[float, ...] = (0.1, 0.05, 0.02),
+    mu_path: Tuple[float, ...] = (1.0, 0.1, 0.01, 0.001),
+    w_threshold: float = 0.3,
+    tol: float = 1e-6
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], int]:
+    """
+    Log-det acyclicity structure learning on a covariance matrix.
+    
+    See CausalDiscoveryEngine.continuous_structure_learning. Returns the
+    BIC-selected solution, the penalty path and the function evaluations.
+    Each path entry records whether all of that penalty's solves converged.
+    """
+    from scipy.optimize import minimize, Bounds
+
+    d = cov.shape[0]
+    eye = np.eye(d)
+
+    # Weights are split into positive and negative parts so the L1 term is
+    # smooth; diagonal entries are pinned to zero (no self-loops)
+    upper = np.full((d, d), np.inf)
+    np.fill_diagonal(upper, 0.0)
+    upper = np.concatenate([upper.ravel(), upper.ravel()])
+    bounds = Bounds(np.zeros(2 * d * d), upper)
+
+    def _adj(w):
+        return (w[:d * d] - w[d * d:]).reshape(d, d)
+
+    def _loss(W):
+        R = eye - W
+        SR = cov @ R
+        return 0.5 * np.sum(R * SR), -SR
+
+    w_est = np.zeros(2 * d * d)
+    path = []
+    best = None
+    n_evals = 0
+
+    for lambda1 in sorted(lambdas, reverse=True):
+        converged = True
+        for mu in mu_path:
+            def _func(w):
+                W = _adj(w)
+                M = eye - W * W
+                sign, logdet = np.linalg.slogdet(M)
+                h = -logdet
+                if sign <= 0 or h < 0:
+                    # Outside the M-matrix domain: an infinite value makes the
+                    # line search backtrack to a shorter step
+                    return np.inf, np.zeros_like(w)
+                loss, G_loss = _loss(W)
+                G = mu * G_loss + 2 * W * np.linalg.inv(M).T
+                obj = mu * (loss + lambda1 * w.sum()) + h
+                grad = np.concatenate([(G + mu * lambda1).ravel(), (-G + mu * lambda1).ravel()])
+                return obj, grad
+
+            sol = minimize(
+                _func, w_est, method='L-BFGS-B', jac=True,
+                bounds=bounds, options={'ftol': tol}
+            )
+            n_evals += sol.nfev
+            if not sol.success:
+                converged = False
+                logger.warning(
+                    f"Structure learning solve did not converge (lambda={lambda1}, mu={mu}): {sol.message}"
+                )
+            if np.isfinite(sol.fun):
+                w_est = sol.x
+
+        W = _adj(w_est)
+        W_pruned = np.where(np.abs(W) >= w_threshold, W, 0.0)
+        n_edges = int(np.count_nonzero(W_pruned))
+        loss_value, _ = _loss(W_pruned)
+        bic = n * np.log(max(2 * loss_value / d, 1e-12)) + n_edges * np.log(n)
+        _, logdet = np.linalg.slogdet(eye - W_pruned * W_pruned)
+
+        path.append({
+            'lambda': float(lambda1),
+            'n_edges': n_edges,
+            'acyclicity': float(-logdet),
+            'bic': float(bic),
+            'converged': converged,
+        })
+
+        if best is None or bic < best['bic']:
+            best = {'lambda': float(lambda1), 'bic': float(bic), 'W': W_pruned}
+
+    return best, path, n_evals
+
+
+def _stability_resample(
+    Z: np.ndarray,
+    Y: np.ndarray,
+    seed: int,
+    config: Dict[str, Any]
+) -> Dict[str, np.ndarray]:
+    """
+    Run the configured methods on one circular block-bootstrap resample.
+    
+    Module-level so joblib can ship it to worker processes. Blocks are drawn
+    over the rows of the lagged design (Z, Y) rather than the raw series, so
+    block joins never pair a target with lags from another part of the
+    sample. The cross-products are computed once and shared: Granger tests
+    read Z'Z and Z'Y, and the contemporaneous covariance comes from Y'Y and
+    the intercept column of Z'Y.
+    """
+    rng = np.random.default_rng(seed)
+    n_obs, d = Y.shape
+    block_size = config['block_size']
+    max_lag = config['max_lag']
+    
+    starts = rng.integers(0, n_obs, int(np.ceil(n_obs / block_size)))
+    rows = ((starts[:, None] + np.arange(block_size)) % n_obs).ravel()[:n_obs]
+    Z = Z[rows]
+    Y = Y[rows]
+    
+    G = Z.T @ Z
+    H = Z.T @ Y
+    YY = Y.T @ Y
+    
+    selected = {}
+    
+    if 'granger' in config['methods']:
+        pair_index = _granger_pair_index(d, max_lag)
+        p_values, _, _ = _granger_from_cross_products(
+            G, H, np.diag(YY).copy(), n_obs, pair_index, max_lag
+        )
+        adjacency = np.zeros((d, d))
+        adjacency[pair_index['causes'], pair_index['effects']] = p_values < config['significance_level']
+        selected['granger'] = adjacency
+    
+    if 'continuous' in config['methods']:
+        mean = H[0] / n_obs
+        cov = YY / n_obs - np.outer(mean, mean)
+        std = np.sqrt(np.clip(np.diag(cov), 1e-12, None))
+        corr = cov / np.outer(std, std)
+        best, _, _ = _continuous_structure_from_cov(corr, n_obs)
+        selected['continuous'] = (best['W'] != 0).astype(float)
+    
+    return selected
+
+
 # ============================================
 # SECTOR-SPECIFIC CAUSAL DISCOVERY
 # ============================================
@@ -654,6 +1453,33 @@ def discover_sector_macro_relationships(
     return sector_drivers
 
 
+def load_rolling_granger(filepath: str) -> Dict[str, Any]:
+    """
+    Load rolling Granger results saved by rolling_granger_causality.
+    
+    Args:
+        filepath: Path to the .npz file
+        
+    Returns:
+        Dictionary with the same keys as rolling_granger_causality
+    """
+    with np.load(filepath) as stored:
+        window, max_lag, step = (int(v) for v in stored['params'])
+        return {
+            'method': 'rolling_granger',
+            'variables': stored['variables'].tolist(),
+            'dates': stored['dates'],
+            'adjacency': stored['adjacency'],
+            'p_values': stored['p_values'],
+            'f_statistics': stored['f_statistics'],
+            'optimal_lags': stored['optimal_lags'],
+            'window': window,
+            'max_lag': max_lag,
+            'step': step,
+            'significance_level': float(stored['significance_level']),
+        }
+
+
 # Singleton instance
 _engine = None
 
@@ -9,20 +9,31 @@ NOW INTEGRATED WITH ML MODELS:
 """
 
 from typing import Dict, List, Any, Optional
+from datetime import datetime
+import hashlib
 import logging
 import os
+import threading
+import time
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
 # Try to import ML services
 try:
-    from .ml_training_pipeline import PredictionService, get_prediction_service
+    from .ml_training_pipeline import (
+        PredictionService, ModelRegistry, MODELS_DIR, cate_surface_path, get_prediction_service
+    )
     ML_AVAILABLE = True
 except ImportError:
     ML_AVAILABLE = False
     logger.warning("ML services not available, using default sensitivity matrix")
 
+FEATURE_MATRIX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'data', 'processed', 'feature_matrix.parquet'
+)
+
 # Predefined sector sensitivity coefficients (based on empirical research)
 # These represent estimated causal effects of economic factors on sector returns
 # Used as FALLBACK when ML models are not trained
@@ -128,6 +139,42 @@ DEFAULT_SECTOR_SENSITIVITY = {
     }
 }
 
+# Map common names to column patterns
+COLUMN_ALIASES = {
+    'interest_rates': ['Fed_Funds_Rate_Change', 'Treasury_10Y_Yield_Change'],
+    'inflation': ['CPI_Change'],
+    'gdp_growth': ['GDP_Change'],
+    'unemployment': ['Unemployment_Rate_Change'],
+    'vix': ['VIX_Change', 'VIX'],
+    'oil_price': ['Oil_WTI_Change'],
+    'dollar_index': ['DXY_Change', 'Dollar_Index_Change', 'Treasury_10Y_Yield_Change'],
+    'technology': ['Technology_Return_1d'],
+    'healthcare': ['Healthcare_Return_1d'],
+    'energy': ['Energy_Return_1d'],
+    'financials': ['Financials_Return_1d'],
+    'industrials': ['Industrials_Return_1d'],
+    'consumer_discretionary': ['Consumer_Discretionary_Return_1d'],
+    'consumer_staples': ['Consumer_Staples_Return_1d'],
+    'utilities': ['Utilities_Return_1d'],
+    'materials': ['Materials_Return_1d'],
+    'real_estate': ['Real_Estate_Return_1d'],
+    'communication_services': ['Communication_Services_Return_1d'],
+}
+
+# Map common variations of sector names
+SECTOR_ALIASES = {
+    'tech': 'technology',
+    'tech_returns': 'technology',
+    'health': 'healthcare',
+    'finance': 'financials',
+    'industrial': 'industrials',
+    'consumer': 'consumer_discretionary',
+    'utility': 'utilities',
+    'material': 'materials',
+    'realestate': 'real_estate',
+    'communication': 'communication_services'
+}
+
 
 def _get_trained_sensitivity_matrix() -> Optional[Dict]:
     """
@@ -163,7 +210,9 @@ def get_active_sensitivity_matrix() -> Dict[str, Dict[str, float]]:
 def estimate_causal_effect(
     treatment: str,
     outcome: str,
-    dag_structure: Optional[Dict] = None
+    dag_structure: Optional[Dict] = None,
+    refute: bool = False,
+    num_simulations: int = 100
 ) -> Dict[str, Any]:
     """
     Estimate the causal effect of a treatment on an outcome
@@ -172,13 +221,36 @@ def estimate_causal_effect(
         treatment: The treatment variable (e.g., 'interest_rates')
         outcome: The outcome variable (e.g., 'technology')
         dag_structure: Optional DAG structure for custom analysis
+        refute: Estimate with DoWhy on historical data and queue refutation
+            tests; the result then includes a refutation_job_id to poll
+        num_simulations: Simulations per refuter
     
     Returns:
         Dictionary with effect estimate, confidence intervals, and p-value
     """
     try:
-        # First try to get the effect from trained ML models (PredictionService)
-        if ML_AVAILABLE:
+        # Precomputed effect table for known factor x sector pairs
+        if not refute:
+            table = get_effect_table()
+            cached = table.lookup(treatment, outcome) if table is not None else None
+            if cached is not None:
+                return {
+                    'treatment': treatment,
+                    'outcome': outcome,
+                    'effect': round(cached['effect'], 4),
+                    'effect_percentage': round(cached['effect'] * 100, 2),
+                    'ci_lower': round(cached['ci_lower'], 4),
+                    'ci_upper': round(cached['ci_upper'], 4),
+                    'p_value': round(cached['p_value'], 4),
+                    'significant': cached['p_value'] < 0.05,
+                    'method': 'Precomputed (OLS backdoor, HAC)',
+                    'model_version': table.version,
+                    'interpretation': _interpret_effect(treatment, outcome, cached['effect'])
+                }
+        
+        # Then try to get the effect from trained ML models (PredictionService).
+        # Refutation needs a DoWhy model, so refute=True goes straight to DoWhy.
+        if ML_AVAILABLE and not refute:
             try:
                 service = get_prediction_service()
                 trained_effect = service.get_causal_effects(treatment, outcome)
@@ -205,12 +277,8 @@ def estimate_causal_effect(
             import pandas as pd
 
             # Load real historical feature matrix
-            feature_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                'data', 'processed', 'feature_matrix.parquet'
-            )
-            if os.path.exists(feature_path):
-                feature_data = pd.read_parquet(feature_path)
+            if os.path.exists(FEATURE_MATRIX_PATH):
+                feature_data = pd.read_parquet(FEATURE_MATRIX_PATH)
 
                 # Map treatment/outcome to column names
                 treatment_col = _find_column(feature_data, treatment)
@@ -262,7 +330,7 @@ def estimate_causal_effect(
                             except Exception:
                                 p_value = 0.5  # Unknown significance
 
-                            return {
+                            result = {
                                 'treatment': treatment,
                                 'outcome': outcome,
                                 'effect': round(effect_value, 4),
@@ -275,6 +343,17 @@ def estimate_causal_effect(
                                 'interpretation': _interpret_effect(treatment, outcome, effect_value)
                             }
 
+                            # Refuters re-estimate many times, so run them in the background
+                            if refute:
+                                from .treatment_effects import submit_refutation_job
+                                result['refutation_job_id'] = submit_refutation_job(
+                                    model, estimand, estimate,
+                                    treatment=treatment_col, outcome=outcome_col,
+                                    num_simulations=num_simulations
+                                )
+                            
+                            return result
+        
         except ImportError:
             logger.warning("DoWhy not installed, using analytical estimates")
         except Exception as e:
@@ -303,29 +382,7 @@ def _find_column(df, name: str) -> Optional[str]:
         f'{name}_Return_1d',
     ]
 
-    # Map common names to column patterns
-    name_map = {
-        'interest_rates': ['Fed_Funds_Rate_Change', 'Treasury_10Y_Yield_Change'],
-        'inflation': ['CPI_Change'],
-        'gdp_growth': ['GDP_Change'],
-        'unemployment': ['Unemployment_Rate_Change'],
-        'vix': ['VIX_Change', 'VIX'],
-        'oil_price': ['Oil_WTI_Change'],
-        'dollar_index': ['DXY_Change', 'Dollar_Index_Change', 'Treasury_10Y_Yield_Change'],
-        'technology': ['Technology_Return_1d'],
-        'healthcare': ['Healthcare_Return_1d'],
-        'energy': ['Energy_Return_1d'],
-        'financials': ['Financials_Return_1d'],
-        'industrials': ['Industrials_Return_1d'],
-        'consumer_discretionary': ['Consumer_Discretionary_Return_1d'],
-        'consumer_staples': ['Consumer_Staples_Return_1d'],
-        'utilities': ['Utilities_Return_1d'],
-        'materials': ['Materials_Return_1d'],
-        'real_estate': ['Real_Estate_Return_1d'],
-        'communication_services': ['Communication_Services_Return_1d'],
-    }
-
-    candidates = patterns + name_map.get(name_lower, [])
+    candidates = patterns + COLUMN_ALIASES.get(name_lower, [])
     for candidate in candidates:
         if candidate in df.columns:
             return candidate
@@ -346,21 +403,7 @@ def _get_base_effect(treatment: str, outcome: str) -> float:
     # Normalize outcome name
     outcome_normalized = outcome.lower().replace(' ', '_').replace('-', '_')
     
-    # Map common variations
-    outcome_map = {
-        'tech': 'technology',
-        'tech_returns': 'technology',
-        'health': 'healthcare',
-        'finance': 'financials',
-        'industrial': 'industrials',
-        'consumer': 'consumer_discretionary',
-        'utility': 'utilities',
-        'material': 'materials',
-        'realestate': 'real_estate',
-        'communication': 'communication_services'
-    }
-    
-    outcome_key = outcome_map.get(outcome_normalized, outcome_normalized)
+    outcome_key = SECTOR_ALIASES.get(outcome_normalized, outcome_normalized)
     
     if outcome_key in sensitivity_matrix:
         return sensitivity_matrix[outcome_key].get(treatment, 0)
@@ -633,3 +676,356 @@ def get_treatment_recommendations(
     recommendations.sort(key=lambda x: abs(x['suggested_change']), reverse=True)
     
     return recommendations[:5]  # Return top 5 recommendations
+
+
+# Precomputed treatment-effect table
+# Effects for every factor x sector pair known to _find_column are estimated
+# in the background after each data refresh and kept in memory, so
+# estimate_causal_effect answers those pairs with an array lookup.
+
+EFFECT_TABLE_FIELDS = ('effect', 'ci_lower', 'ci_upper', 'p_value', 'standard_error', 'sample_size')
+EFFECT_TABLE_CONFOUNDERS = ['SP500_Return', 'SP500_Volatility_21d']
+# Seconds before a failed build is retried on the next request
+EFFECT_TABLE_RETRY_SECONDS = int(os.environ.get('EFFECT_TABLE_RETRY_SECONDS', '300'))
+
+_effect_table = None
+_effect_table_loaded = False
+_effect_table_lock = threading.Lock()
+_effect_table_building = set()
+_effect_table_failed_at = {}
+
+
+class EffectTable:
+    """Treatment effects for all factor x sector pairs in one (fields, F, S) array."""
+    
+    def __init__(
+        self,
+        factors: List[str],
+        sectors: List[str],
+        values: np.ndarray,
+        columns: Dict[str, str],
+        version: str,
+        data_hash: str,
+        computed_at: str
+    ):
+        self.factors = list(factors)
+        self.sectors = list(sectors)
+        self.values = values
+        self.columns = columns
+        self.version = version
+        self.data_hash = data_hash
+        self.computed_at = computed_at
+        
+        # Accept the friendly names and the underlying column names
+        self._factor_index = {f: i for i, f in enumerate(self.factors)}
+        self._sector_index = {s: j for j, s in enumerate(self.sectors)}
+        for name, column in columns.items():
+            if name in self._factor_index:
+                self._factor_index.setdefault(column.lower(), self._factor_index[name])
+            elif name in self._sector_index:
+                self._sector_index.setdefault(column.lower(), self._sector_index[name])
+    
+    def lookup(self, treatment: str, outcome: str) -> Optional[Dict[str, float]]:
+        """Get the stored estimate for a pair, or None if it is not in the table."""
+        treatment_key = treatment.lower().replace(' ', '_').replace('-', '_')
+        outcome_key = outcome.lower().replace(' ', '_').replace('-', '_')
+        outcome_key = SECTOR_ALIASES.get(outcome_key, outcome_key)
+        
+        i = self._factor_index.get(treatment_key)
+        j = self._sector_index.get(outcome_key)
+        if i is None or j is None or not np.isfinite(self.values[0, i, j]):
+            return None
+        
+        return dict(zip(EFFECT_TABLE_FIELDS, self.values[:, i, j].tolist()))
+    
+    def save(self, filepath: str):
+        """Save the table as a compressed npz archive."""
+        np.savez_compressed(
+            filepath,
+            factors=np.array(self.factors, dtype=str),
+            sectors=np.array(self.sectors, dtype=str),
+            values=self.values,
+            column_names=np.array(list(self.columns.keys()), dtype=str),
+            column_values=np.array(list(self.columns.values()), dtype=str),
+            meta=np.array([self.version, self.data_hash, self.computed_at], dtype=str)
+        )
+    
+    @classmethod
+    def load(cls, filepath: str) -> 'EffectTable':
+        """Load a table saved with save()."""
+        with np.load(filepath) as archive:
+            version, data_hash, computed_at = archive['meta'].tolist()
+            return cls(
+                factors=archive['factors'].tolist(),
+                sectors=archive['sectors'].tolist(),
+                values=archive['values'],
+                columns=dict(zip(archive['column_names'].tolist(), archive['column_values'].tolist())),
+                version=version,
+                data_hash=data_hash,
+                computed_at=computed_at
+            )
+
+
+def _active_effect_version() -> str:
+    """Version the effect table is keyed by: the active treatment model, if any."""
+    if ML_AVAILABLE:
+        try:
+            active = ModelRegistry().get_active_model('treatment')
+            if active and active.get('version'):
+                return active['version']
+        except Exception as e:
+            logger.debug(f"Could not read model registry: {e}")
+    return 'default'
+
+
+def _effect_table_path(version: str) -> str:
+    return os.path.join(MODELS_DIR, f'effect_table_{version}.npz')
+
+
+def build_effect_table(feature_data, version: str) -> EffectTable:
+    """
+    Estimate every factor x sector effect from a feature matrix.
+    
+    Uses the same backdoor adjustment as the live DoWhy path (linear
+    regression on SP500_Return and SP500_Volatility_21d) with HAC standard
+    errors. Each factor is one shared-design regression over all sectors.
+    
+    Args:
+        feature_data: Feature matrix DataFrame
+        version: Model version the table is keyed by
+        
+    Returns:
+        EffectTable
+    """
+    import pandas as pd
+    from .treatment_effects import TreatmentEffectEstimator
+    
+    factors = list(DEFAULT_SECTOR_SENSITIVITY['technology'].keys())
+    sectors = list(DEFAULT_SECTOR_SENSITIVITY.keys())
+    values = np.full((len(EFFECT_TABLE_FIELDS), len(factors), len(sectors)), np.nan)
+    
+    columns = {name: _find_column(feature_data, name) for name in factors + sectors}
+    columns = {name: col for name, col in columns.items() if col}
+    
+    estimator = TreatmentEffectEstimator()
+    for i, factor in enumerate(factors):
+        treatment_col = columns.get(factor)
+        if treatment_col is None:
+            continue
+        
+        outcome_cols = [columns[s] for s in sectors if s in columns and columns[s] != treatment_col]
+        confounders = [c for c in EFFECT_TABLE_CONFOUNDERS
+                       if c in feature_data.columns and c != treatment_col]
+        if not outcome_cols or not confounders:
+            continue
+        
+        effects = estimator.estimate_ate_grid(
+            feature_data, treatment_col, outcome_cols, confounders, inference='hac'
+        )
+        for j, sector in enumerate(sectors):
+            effect = effects.get(columns.get(sector))
+            if effect and 'ate' in effect and effect['sample_size'] >= 100:
+                values[:, i, j] = [
+                    effect['ate'], effect['ci_lower'], effect['ci_upper'],
+                    effect['p_value'], effect['standard_error'], effect['sample_size'],
+                ]
+    
+    data_hash = hashlib.md5(pd.util.hash_pandas_object(feature_data).values).hexdigest()[:12]
+    return EffectTable(
+        factors, sectors, values, columns,
+        version=version,
+        data_hash=data_hash,
+        computed_at=datetime.now().isoformat()
+    )
+
+
+def refresh_effect_table(
+    feature_data=None,
+    version: Optional[str] = None,
+    background: bool = True
+) -> Optional[EffectTable]:
+    """
+    Rebuild, save and activate the effect table.
+    
+    Call after each data refresh or training run.
+    
+    Args:
+        feature_data: Feature matrix (default: load from FEATURE_MATRIX_PATH)
+        version: Model version (default: the active treatment model)
+        background: Build in a daemon thread and return immediately
+        
+    Returns:
+        The new table when built synchronously, else None
+    """
+    if not ML_AVAILABLE:
+        return None
+    
+    version = version or _active_effect_version()
+    
+    def build():
+        global _effect_table, _effect_table_loaded
+        table = None
+        try:
+            data = feature_data
+            if data is None:
+                import pandas as pd
+                if not os.path.exists(FEATURE_MATRIX_PATH):
+                    logger.warning("Feature matrix not found, effect table not built")
+                    return None
+                data = pd.read_parquet(FEATURE_MATRIX_PATH)
+            
+            table = build_effect_table(data, version)
+            table.save(_effect_table_path(version))
+            logger.info(f"Effect table {version} built ({int(np.isfinite(table.values[0]).sum())} pairs)")
+            return table
+        except Exception as e:
+            logger.error(f"Effect table build failed: {e}")
+            table = None
+            return None
+        finally:
+            with _effect_table_lock:
+                _effect_table_building.discard(version)
+                if table is not None:
+                    _effect_table = table
+                    _effect_table_loaded = True
+                    _effect_table_failed_at.pop(version, None)
+                else:
+                    # Leave the table unloaded so get_effect_table retries after a delay
+                    _effect_table_failed_at[version] = time.monotonic()
+    
+    with _effect_table_lock:
+        if background and version in _effect_table_building:
+            return None
+        _effect_table_building.add(version)
+    
+    if background:
+        threading.Thread(target=build, daemon=True).start()
+        return None
+    return build()
+
+
+def invalidate_effect_table():
+    """Drop the in-memory table (e.g. after activating another model version)."""
+    global _effect_table, _effect_table_loaded
+    with _effect_table_lock:
+        _effect_table = None
+        _effect_table_loaded = False
+        _effect_table_failed_at.clear()
+
+
+def get_effect_table() -> Optional[EffectTable]:
+    """
+    Get the in-memory effect table.
+    
+    On first use (or after invalidation) the table for the active model
+    version is loaded from disk, or built in the background if missing;
+    None is returned until it is available. A failed build is retried on
+    the first request after EFFECT_TABLE_RETRY_SECONDS.
+    """
+    global _effect_table, _effect_table_loaded
+    if _effect_table_loaded or not ML_AVAILABLE:
+        return _effect_table
+    
+    version = _active_effect_version()
+    filepath = _effect_table_path(version)
+    failed_at = _effect_table_failed_at.get(version)
+    if failed_at is not None and time.monotonic() - failed_at < EFFECT_TABLE_RETRY_SECONDS:
+        return _effect_table
+    
+    if os.path.exists(filepath):
+        try:
+            table = EffectTable.load(filepath)
+            with _effect_table_lock:
+                _effect_table = table
+                _effect_table_loaded = True
+            return table
+        except Exception as e:
+            logger.warning(f"Could not load effect table {filepath}: {e}")
+    
+    refresh_effect_table(version=version, background=True)
+    return None
+
+
+# ============================================
+# CATE SURFACE SERVING
+# ============================================
+
+_cate_surface = None
+_cate_surface_loaded = False
+
+
+def invalidate_cate_surface():
+    """Drop the in-memory CATE surface (e.g. after activating another model version)."""
+    global _cate_surface, _cate_surface_loaded
+    with _effect_table_lock:
+        _cate_surface = None
+        _cate_surface_loaded = False
+
+
+def get_cate_surface():
+    """
+    Get the CATE surface stored with the active treatment model.
+    
+    Loaded from disk on first use (or after invalidation); None when the
+    active version has no surface.
+    """
+    global _cate_surface, _cate_surface_loaded
+    if _cate_surface_loaded or not ML_AVAILABLE:
+        return _cate_surface
+    
+    from .treatment_effects import CATESurface
+    
+    surface = None
+    filepath = cate_surface_path(_active_effect_version())
+    if os.path.exists(filepath):
+        try:
+            surface = CATESurface.load(filepath)
+        except Exception as e:
+            logger.warning(f"Could not load CATE surface {filepath}: {e}")
+    
+    with _effect_table_lock:
+        _cate_surface = surface
+        _cate_surface_loaded = True
+    return surface
+
+
+def estimate_conditional_effect(
+    treatment: str,
+    outcome: str,
+    modifiers: Dict[str, float]
+) -> Dict[str, Any]:
+    """
+    Treatment effect under given market conditions, from the CATE surface.
+    
+    Args:
+        treatment: Treatment column (e.g. 'Fed_Funds_Rate_Change')
+        outcome: Sector name or return column (e.g. 'Technology')
+        modifiers: Effect modifier values (e.g. {'VIX': 30, 'Yield_Curve_Spread': -0.5})
+        
+    Returns:
+        Interpolated effect with interval, or a dict with 'error'
+    """
+    surface = get_cate_surface()
+    if surface is None:
+        return {'error': 'No CATE surface available. Train ML models first.'}
+    
+    outcome_col = outcome if outcome in surface.outcomes else f"{outcome.replace(' ', '_')}_Return_1d"
+    unknown = [name for name in modifiers if name not in surface.modifiers]
+    if unknown:
+        return {'error': f'Unknown effect modifiers: {unknown}', 'modifiers': surface.modifiers}
+    
+    result = surface.query(treatment, outcome_col, modifiers)
+    if result is None:
+        return {
+            'error': f'No CATE for {treatment} -> {outcome}',
+            'treatments': surface.treatments,
+            'outcomes': surface.outcomes,
+        }
+    
+    result.update({
+        'treatment': treatment,
+        'outcome': outcome_col,
+        'method': surface.method,
+        'confidence_level': 1 - surface.alpha,
+    })
+    return result
@@ -13,7 +13,14 @@ Each model includes confidence intervals and backtesting validation.
 """
 
 import os
+import math
+import atexit
+import time
+import hashlib
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any, Union
 import numpy as np
@@ -29,6 +36,103 @@ warnings.filterwarnings('ignore')
 MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'models')
 os.makedirs(MODELS_DIR, exist_ok=True)
 
+# Feature store read by the volatility nowcaster
+FEATURE_MATRIX_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'processed', 'feature_matrix.parquet')
+
+
+# ============================================
+# ARIMA ORDER SEARCH
+# ============================================
+
+# Worker processes for parallel order search
+ARIMA_SEARCH_WORKERS = int(os.environ.get('ARIMA_SEARCH_WORKERS', min(4, os.cpu_count() or 1)))
+MAX_AIC_CACHE = 10000
+
+_aic_cache = {}  # (series hash, order) -> (aic, params)
+_aic_cache_lock = threading.Lock()
+_order_search_pool = None
+_order_search_pool_lock = threading.Lock()
+
+
+def _get_order_search_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by all ARIMA order searches.
+    
+    Workers are spawned, not forked: the web process runs background threads
+    and has torch loaded, and a forked child can inherit locks held by them.
+    The pool is shut down at interpreter exit.
+    """
+    global _order_search_pool
+    with _order_search_pool_lock:
+        if _order_search_pool is None:
+            _order_search_pool = ProcessPoolExecutor(
+                max_workers=ARIMA_SEARCH_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            atexit.register(_shutdown_order_search_pool)
+        return _order_search_pool
+
+
+def _shutdown_order_search_pool():
+    """Stop the order search workers (registered with atexit)."""
+    global _order_search_pool
+    with _order_search_pool_lock:
+        if _order_search_pool is not None:
+            _order_search_pool.shutdown(wait=False, cancel_futures=True)
+            _order_search_pool = None
+
+
+def _fit_arima_order(
+    values: np.ndarray,
+    order: Tuple[int, int, int],
+    warm_params: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    Fit one candidate ARIMA order (runs in a worker process).
+    
+    Warm starts are used only when the order nests the one the parameters
+    came from (it adds AR/MA lags): matching parameters are copied and the
+    new lags set to zero, so the start is the smaller model's optimum and is
+    stationary and invertible. Parameters from a larger order can start
+    outside the stationary region (statsmodels then returns NaN estimates
+    rather than raising) or in a poor local optimum, so such candidates, and
+    any warm fit that fails or has a non-finite AIC, start from defaults.
+    
+    Returns:
+        Dict with order, aic, params and seconds, or order, error and seconds
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+    
+    started = time.perf_counter()
+    try:
+        model = ARIMA(values, order=order)
+        fitted = None
+        if warm_params and set(warm_params) <= set(model.param_names):
+            start_params = np.array([warm_params.get(name, 0.0) for name in model.param_names])
+            try:
+                fitted = model.fit(start_params=start_params)
+            except Exception:
+                fitted = None
+            if fitted is not None and not np.isfinite(fitted.aic):
+                fitted = None
+        if fitted is None:
+            fitted = model.fit()
+        
+        aic = float(fitted.aic)
+        return {
+            'order': order,
+            'aic': aic if np.isfinite(aic) else np.inf,
+            'params': dict(zip(model.param_names, np.asarray(fitted.params, dtype=float).tolist())),
+            'seconds': time.perf_counter() - started,
+        }
+    except Exception as e:
+        return {
+            'order': order,
+            'aic': np.inf,
+            'error': str(e),
+            'seconds': time.perf_counter() - started,
+        }
+
 
 class ARIMAForecaster:
     """
@@ -38,7 +142,14 @@ class ARIMAForecaster:
     interest rates, unemployment, CPI changes.
     """
     
-    def __init__(self, max_p: int = 5, max_d: int = 2, max_q: int = 5):
+    def __init__(
+        self,
+        max_p: int = 5,
+        max_d: int = 2,
+        max_q: int = 5,
+        search: str = 'stepwise',
+        n_jobs: Optional[int] = None
+    ):
         """
         Initialize ARIMA forecaster.
         
@@ -46,12 +157,19 @@ class ARIMAForecaster:
             max_p: Maximum AR order
             max_d: Maximum differencing order
             max_q: Maximum MA order
+            search: Order search, 'stepwise' or 'grid' (all p, q)
+            n_jobs: Worker processes for candidate fits (default:
+                ARIMA_SEARCH_WORKERS; 1 fits in-process)
         """
         self.max_p = max_p
         self.max_d = max_d
         self.max_q = max_q
+        self.search = search
+        self.n_jobs = n_jobs or ARIMA_SEARCH_WORKERS
         self.model = None
         self.order = None
+        self.search_stats = None
+        self._search_params = None
         self._statsmodels_available = self._check_statsmodels()
     
     def _check_statsmodels(self) -> bool:
@@ -92,14 +210,21 @@ class ARIMAForecaster:
                 return {'error': 'Insufficient data (need 50+ observations)'}
             
             # Auto-select order if not provided
+            self.search_stats = None
+            self._search_params = None
             if order is None:
                 order = self._auto_select_order(series)
             
             self.order = order
             
-            # Fit model
+            # Fit model, starting from the search's estimates when available
             model = ARIMA(series, order=order)
-            self.model = model.fit()
+            start_params = None
+            if self._search_params:
+                start_params = np.array([
+                    self._search_params.get(name, 0.0) for name in model.param_names
+                ])
+            self.model = model.fit(start_params=start_params)
             
             # Get fit statistics
             aic = self.model.aic
@@ -115,6 +240,7 @@ class ARIMAForecaster:
                 'n_observations': len(series),
                 'residual_mean': float(residuals.mean()),
                 'residual_std': float(residuals.std()),
+                'order_search': self.search_stats,
             }
             
         except Exception as e:
@@ -122,30 +248,129 @@ class ARIMAForecaster:
             return {'error': str(e)}
     
     def _auto_select_order(self, series: pd.Series) -> Tuple[int, int, int]:
-        """Auto-select ARIMA order using AIC."""
-        from statsmodels.tsa.arima.model import ARIMA
+        """
+        Auto-select ARIMA order using AIC.
+        
+        d comes from an ADF test. (p, q) is chosen by a stepwise search
+        (Hyndman-Khandakar): fit a few seed orders, then repeatedly fit the
+        unvisited neighbours of the best order (p or q +/- 1, and both
+        together) until none improves the AIC. Each round's candidates are
+        fit in parallel and warm-started from the current best parameters.
+        search='grid' fits every (p, q) instead. AICs are cached per
+        (series, order), so refitting the same data skips known orders.
+        Fit counts and timings are kept in self.search_stats.
+        """
         from statsmodels.tsa.stattools import adfuller
         
+        started = time.perf_counter()
+        
         # Test for stationarity
         adf_result = adfuller(series.dropna())
         d = 0 if adf_result[1] < 0.05 else 1
         
-        # Grid search for p, q
-        best_aic = np.inf
-        best_order = (1, d, 1)
+        values = np.asarray(series.values, dtype=float)
+        series_key = hashlib.md5(values.tobytes()).hexdigest()
+        self.search_stats = {
+            'search': self.search,
+            'n_fits': 0,
+            'n_cached': 0,
+            'n_failed': 0,
+            'fit_seconds': {},
+        }
         
-        for p in range(self.max_p + 1):
-            for q in range(self.max_q + 1):
-                try:
-                    model = ARIMA(series, order=(p, d, q))
-                    fitted = model.fit()
-                    if fitted.aic < best_aic:
-                        best_aic = fitted.aic
-                        best_order = (p, d, q)
-                except:
-                    continue
+        def valid(p, q):
+            return 0 <= p <= self.max_p and 0 <= q <= self.max_q
+        
+        if self.search == 'grid':
+            candidates = [
+                (p, d, q) for p in range(self.max_p + 1) for q in range(self.max_q + 1)
+            ]
+            results = self._evaluate_orders(values, series_key, candidates)
+            best = min(results.values(), key=lambda r: r['aic'])
+        else:
+            seeds = [(p, d, q) for p, q in ((2, 2), (0, 0), (1, 0), (0, 1)) if valid(p, q)]
+            results = self._evaluate_orders(values, series_key, seeds)
+            best = min(results.values(), key=lambda r: r['aic'])
+            
+            while True:
+                p, _, q = best['order']
+                neighbours = [
+                    (p + dp, d, q + dq)
+                    for dp, dq in ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1))
+                    if valid(p + dp, q + dq) and (p + dp, d, q + dq) not in results
+                ]
+                if not neighbours:
+                    break
+                
+                step = self._evaluate_orders(
+                    values, series_key, neighbours, warm_params=best.get('params')
+                )
+                results.update(step)
+                step_best = min(step.values(), key=lambda r: r['aic'])
+                if step_best['aic'] >= best['aic']:
+                    break
+                best = step_best
+        
+        self.search_stats['n_candidates'] = len(results)
+        self.search_stats['elapsed_seconds'] = time.perf_counter() - started
+        
+        if not np.isfinite(best['aic']):
+            logger.warning("ARIMA order search: no candidate converged, using (1, d, 1)")
+            self._search_params = None
+            return (1, d, 1)
+        
+        self._search_params = best.get('params')
+        logger.info(
+            f"ARIMA {self.search} search: order {best['order']} (AIC {best['aic']:.2f}), "
+            f"{self.search_stats['n_fits']} fits, {self.search_stats['n_cached']} cached, "
+            f"{self.search_stats['elapsed_seconds']:.2f}s"
+        )
+        return tuple(best['order'])
+    
+    def _evaluate_orders(
+        self,
+        values: np.ndarray,
+        series_key: str,
+        orders: List[Tuple[int, int, int]],
+        warm_params: Optional[Dict[str, float]] = None
+    ) -> Dict[Tuple[int, int, int], Dict[str, Any]]:
+        """Fit candidate orders (cached AICs first, the rest in parallel)."""
+        results, pending = {}, []
         
-        return best_order
+        with _aic_cache_lock:
+            for order in orders:
+                cached = _aic_cache.get((series_key, order))
+                if cached is not None:
+                    results[order] = {'order': order, 'aic': cached[0], 'params': cached[1]}
+                    self.search_stats['n_cached'] += 1
+                else:
+                    pending.append(order)
+        
+        if len(pending) > 1 and self.n_jobs > 1:
+            pool = _get_order_search_pool()
+            fits = list(pool.map(
+                _fit_arima_order,
+                [values] * len(pending), pending, [warm_params] * len(pending)
+            ))
+        else:
+            fits = [_fit_arima_order(values, order, warm_params) for order in pending]
+        
+        for fit in fits:
+            order = fit['order']
+            results[order] = fit
+            self.search_stats['n_fits'] += 1
+            self.search_stats['fit_seconds'][','.join(map(str, order))] = round(fit['seconds'], 4)
+            if 'error' in fit:
+                self.search_stats['n_failed'] += 1
+                logger.debug(f"ARIMA{order} failed: {fit['error']}")
+                continue
+            
+            with _aic_cache_lock:
+                if len(_aic_cache) >= MAX_AIC_CACHE:
+                    _aic_cache.pop(next(iter(_aic_cache)))
+                _aic_cache[(series_key, order)] = (fit['aic'], fit['params'])
+        
+        return results
     
     def predict(
         self,
@@ -238,7 +463,8 @@ class GARCHForecaster:
     def fit(
         self,
         returns: pd.Series,
-        mean_model: str = 'Constant'
+        mean_model: str = 'Constant',
+        starting_values: Optional[Dict[str, float]] = None
     ) -> Dict[str, Any]:
         """
         Fit GARCH model to returns series.
@@ -246,6 +472,8 @@ class GARCHForecaster:
         Args:
             returns: Returns series (not prices!)
             mean_model: Mean model type ('Zero', 'Constant', 'AR')
+            starting_values: Optional parameters to start the optimizer
+                from (e.g. a previous fit's params), matched by name
             
         Returns:
             Dictionary with fit statistics
@@ -253,8 +481,6 @@ class GARCHForecaster:
         if not self._arch_available:
             return self._fallback_fit(returns)
         
-        from arch import arch_model
-        
         try:
             # Clean returns
             returns = returns.dropna() * 100  # Scale to percentage
@@ -262,24 +488,15 @@ class GARCHForecaster:
             if len(returns) < 100:
                 return {'error': 'Insufficient data (need 100+ observations)'}
             
-            # Create model based on type
-            if self.model_type == 'EGARCH':
-                vol_model = 'EGARCH'
-            elif self.model_type == 'GJR-GARCH':
-                vol_model = 'GARCH'
-                # GJR-GARCH uses o parameter
-            else:
-                vol_model = 'GARCH'
-            
-            model = arch_model(
-                returns,
-                mean=mean_model,
-                vol=vol_model,
-                p=self.p,
-                q=self.q
-            )
+            model = self._build_model(returns, mean_model)
             
-            self.model = model.fit(disp='off')
+            start = None
+            if starting_values:
+                names = self._parameter_names(model)
+                if all(name in starting_values for name in names):
+                    start = np.array([starting_values[name] for name in names])
+            
+            self.model = model.fit(disp='off', starting_values=start)
             
             return {
                 'model_type': self.model_type,
@@ -290,12 +507,84 @@ class GARCHForecaster:
                 'log_likelihood': float(self.model.loglikelihood),
                 'n_observations': len(returns),
                 'unconditional_volatility': float(np.sqrt(self.model.conditional_volatility.mean())) / 100,
+                'warm_start': start is not None,
             }
             
         except Exception as e:
             logger.error(f"GARCH fit failed: {e}")
             return {'error': str(e)}
     
+    def fix(
+        self,
+        returns: pd.Series,
+        params: Dict[str, float],
+        mean_model: str = 'Constant'
+    ) -> Dict[str, Any]:
+        """
+        Filter the conditional variance through returns with fixed parameters.
+        
+        No estimation is done: the result forecasts from the end of returns
+        using params, e.g. a previous fit's params after a few new days.
+        
+        Args:
+            returns: Returns series (not prices!)
+            params: Parameters by name, as in a fitted model's params
+            mean_model: Mean model type ('Zero', 'Constant', 'AR')
+            
+        Returns:
+            Dictionary with fit statistics
+        """
+        if not self._arch_available:
+            return self._fallback_fit(returns)
+        
+        try:
+            returns = returns.dropna() * 100  # Scale to percentage
+            model = self._build_model(returns, mean_model)
+            self.model = model.fix(np.array([params[name] for name in self._parameter_names(model)]))
+            
+            return {
+                'model_type': self.model_type,
+                'p': self.p,
+                'q': self.q,
+                'log_likelihood': float(self.model.loglikelihood),
+                'n_observations': len(returns),
+                'unconditional_volatility': float(np.sqrt(self.model.conditional_volatility.mean())) / 100,
+            }
+            
+        except Exception as e:
+            logger.error(f"GARCH filter failed: {e}")
+            return {'error': str(e)}
+    
+    def _build_model(self, returns: pd.Series, mean_model: str = 'Constant'):
+        """Create the arch model for percentage returns."""
+        from arch import arch_model
+        
+        # Create model based on type
+        if self.model_type == 'EGARCH':
+            vol_model = 'EGARCH'
+        else:
+            vol_model = 'GARCH'
+        # GJR-GARCH is GARCH with the asymmetric (o) term
+        o = 1 if self.model_type == 'GJR-GARCH' else 0
+        
+        return arch_model(
+            returns,
+            mean=mean_model,
+            vol=vol_model,
+            p=self.p,
+            o=o,
+            q=self.q
+        )
+    
+    @staticmethod
+    def _parameter_names(model) -> List[str]:
+        """All parameter names of an arch model in its order: mean, volatility, distribution."""
+        return (
+            list(model.parameter_names())
+            + list(model.volatility.parameter_names())
+            + list(model.distribution.parameter_names())
+        )
+    
     def predict(
         self,
         steps: int = 21,
@@ -334,6 +623,22 @@ class GARCHForecaster:
                 'method': 'ewma_fallback',
             }
         
+        # Simulated bands come from the native path simulator in one pass
+        if method == 'simulation':
+            params = self.get_params()
+            if params is not None:
+                sims = simulate_garch_paths([params], horizon=steps, n_simulations=n_simulations)
+                annualized_vol = sims['volatility'][0]
+                return {
+                    'volatility': annualized_vol,
+                    'variance': sims['variance'][0],
+                    'volatility_forecast': annualized_vol.tolist(),
+                    'ci_lower': sims['ci_lower'][0].tolist(),
+                    'ci_upper': sims['ci_upper'][0].tolist(),
+                    'steps': steps,
+                    'method': method,
+                }
+        
         try:
             # Get forecast
             forecast = self.model.forecast(horizon=steps, method=method)
@@ -345,31 +650,16 @@ class GARCHForecaster:
             # Annualize
             annualized_vol = volatility * np.sqrt(252)
             
-            # Simulation-based confidence intervals
-            if method == 'simulation':
-                simulations = self.model.forecast(
-                    horizon=steps, 
-                    method='simulation',
-                    simulations=n_simulations
-                )
-                
-                # Get variance paths
-                var_sims = simulations.simulations.variances
-                vol_sims = np.sqrt(var_sims) / 100  # Convert from percentage
-                
-                ci_lower = np.percentile(vol_sims, 2.5, axis=1).flatten() * np.sqrt(252)
-                ci_upper = np.percentile(vol_sims, 97.5, axis=1).flatten() * np.sqrt(252)
-            else:
-                # Rough CI based on historical estimation error
-                ci_lower = annualized_vol * 0.8
-                ci_upper = annualized_vol * 1.2
+            # Rough CI based on historical estimation error
+            ci_lower = annualized_vol * 0.8
+            ci_upper = annualized_vol * 1.2
             
             return {
                 'volatility': annualized_vol,
                 'variance': variance,
                 'volatility_forecast': annualized_vol.tolist(),
-                'ci_lower': ci_lower.tolist() if hasattr(ci_lower, 'tolist') else [ci_lower],
-                'ci_upper': ci_upper.tolist() if hasattr(ci_upper, 'tolist') else [ci_upper],
+                'ci_lower': ci_lower.tolist(),
+                'ci_upper': ci_upper.tolist(),
                 'steps': steps,
                 'method': method,
             }
@@ -378,6 +668,51 @@ class GARCHForecaster:
             logger.error(f"GARCH prediction failed: {e}")
             return {'error': str(e)}
     
+    def get_params(self) -> Optional[Dict[str, Any]]:
+        """
+        Fitted parameters and next-day variance for simulate_garch_paths.
+        
+        Supports GARCH(1,1), GJR-GARCH(1,1,1) and EGARCH(1,1) / (1,1,1) with
+        normal or Student's t innovations, in the percentage-return units
+        the model was fit in. Returns None for other specifications or when
+        the model is the EWMA fallback.
+        """
+        if self.model is None or isinstance(self.model, dict):
+            return None
+        
+        try:
+            volatility = self.model.model.volatility
+            vol_name = type(volatility).__name__
+            if vol_name not in ('GARCH', 'EGARCH') or volatility.p != 1 or volatility.q != 1 or volatility.o > 1:
+                return None
+            
+            dist_name = self.model.model.distribution.name
+            if dist_name not in ('Normal', "Standardized Student's t"):
+                return None
+            
+            params = self.model.params
+            if vol_name == 'EGARCH':
+                vol_type = 'EGARCH'
+            else:
+                vol_type = 'GJR-GARCH' if volatility.o else 'GARCH'
+            
+            # One-step-ahead variance h(T+1) starts every simulated path
+            next_variance = self.model.forecast(horizon=1, reindex=False).variance.values[-1, 0]
+            
+            return {
+                'vol_type': vol_type,
+                'omega': float(params['omega']),
+                'alpha': float(params['alpha[1]']),
+                'gamma': float(params.get('gamma[1]', 0.0)),
+                'beta': float(params['beta[1]']),
+                'nu': float(params['nu']) if 'nu' in params else None,
+                'next_variance': float(next_variance),
+                'scale': 100.0,
+            }
+        except Exception as e:
+            logger.warning(f"Could not extract GARCH parameters: {e}")
+            return None
+    
     def _fallback_fit(self, returns: pd.Series) -> Dict[str, Any]:
         """Fallback using EWMA volatility."""
         returns = returns.dropna()
@@ -401,6 +736,722 @@ class GARCHForecaster:
             self.model = data
 
 
+# ============================================
+# GARCH PATH SIMULATION
+# ============================================
+
+def simulate_garch_paths(
+    params: List[Dict[str, Any]],
+    horizon: int = 21,
+    n_simulations: int = 1000,
+    percentiles: Tuple[float, float] = (2.5, 97.5),
+    random_state: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Simulate conditional variance paths for many GARCH models at once.
+    
+    All models advance together through one (models x simulations) variance
+    recursion per step, so a fan chart for every sector costs horizon
+    vectorized updates. Each model may be GARCH, GJR-GARCH or EGARCH with
+    normal or standardized Student's t innovations (see
+    GARCHForecaster.get_params):
+    
+    - GARCH/GJR: h' = omega + (alpha + gamma * 1[e < 0]) * e^2 + beta * h
+    - EGARCH: ln h' = omega + alpha * (|z| - sqrt(2/pi)) + gamma * z + beta * ln h
+    
+    Args:
+        params: One parameter dict per model
+        horizon: Steps ahead
+        n_simulations: Paths per model
+        percentiles: Lower and upper band percentiles
+        random_state: Seed for the innovations
+        
+    Returns:
+        Dictionary of (models x horizon) arrays: 'variance' (mean daily
+        variance in decimal units) and annualized 'volatility', 'ci_lower'
+        and 'ci_upper'
+    """
+    def column(key, default=0.0):
+        return np.array([
+            default if p.get(key) is None else p[key] for p in params
+        ], dtype=float)[:, None]
+    
+    omega, alpha, gamma, beta = column('omega'), column('alpha'), column('gamma'), column('beta')
+    nu = column('nu', np.inf)
+    scale = column('scale', 1.0)
+    egarch = np.array([p['vol_type'] == 'EGARCH' for p in params])[:, None]
+    student = np.isfinite(nu)
+    
+    rng = np.random.default_rng(random_state)
+    n_models = len(params)
+    shape = (n_models, n_simulations)
+    
+    paths = np.empty((horizon, n_models, n_simulations))
+    h = np.broadcast_to(column('next_variance'), shape).copy()
+    t_scale = np.sqrt(np.where(student, (nu - 2) / np.where(student, nu, 1.0), 1.0))
+    
+    for step in range(horizon):
+        paths[step] = h
+        if step == horizon - 1:
+            break
+        
+        z = rng.standard_normal(shape)
+        if student.any():
+            t_draws = rng.standard_t(np.where(student, nu, 30.0), size=shape) * t_scale
+            z = np.where(student, t_draws, z)
+        
+        e2 = h * z * z
+        garch_h = omega + (alpha + gamma * (z < 0)) * e2 + beta * h
+        log_h = omega + alpha * (np.abs(z) - np.sqrt(2 / np.pi)) + gamma * z + beta * np.log(h)
+        h = np.where(egarch, np.exp(log_h), garch_h)
+    
+    # (models, horizon) summaries in decimal units
+    paths = paths.transpose(1, 2, 0) / (scale[:, :, None] ** 2)
+    vol_paths = np.sqrt(paths) * np.sqrt(252)
+    lower, upper = np.percentile(vol_paths, percentiles, axis=1)
+    variance = paths.mean(axis=1)
+    
+    return {
+        'variance': variance,
+        'volatility': np.sqrt(variance) * np.sqrt(252),
+        'ci_lower': lower,
+        'ci_upper': upper,
+    }
+
+
+# ============================================
+# GARCH BATCH TRAINING
+# ============================================
+
+# Worker processes for batch GARCH fitting
+GARCH_FIT_WORKERS = int(os.environ.get('GARCH_FIT_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+def _returns_hash(values: np.ndarray) -> str:
+    return hashlib.md5(np.asarray(values, dtype=float).tobytes()).hexdigest()
+
+
+def _garch_parameter_shift(
+    garch: GARCHForecaster,
+    returns: pd.Series,
+    params: Dict[str, float]
+) -> Optional[float]:
+    """
+    Predicted parameter change, in standard errors, from refitting on returns.
+    
+    One Newton step from params: the log-likelihood gradient on the new
+    sample times the inverse-Hessian covariance. At the old optimum only the
+    newly added days contribute to the gradient, so this is cheap relative
+    to a full fit.
+    """
+    try:
+        model = garch._build_model(returns.dropna() * 100)
+        names = garch._parameter_names(model)
+        theta = np.array([params[name] for name in names], dtype=float)
+        
+        gradient = np.empty(len(theta))
+        for i in range(len(theta)):
+            step = 1e-5 * max(abs(theta[i]), 1e-3)
+            up, down = theta.copy(), theta.copy()
+            up[i] += step
+            down[i] -= step
+            gradient[i] = (model.fix(up).loglikelihood - model.fix(down).loglikelihood) / (2 * step)
+        
+        cov = model.compute_param_cov(theta, robust=False)
+        shift = cov @ gradient
+        return float(np.max(np.abs(shift) / np.sqrt(np.diag(cov))))
+    except Exception as e:
+        logger.debug(f"GARCH parameter shift check failed: {e}")
+        return None
+
+
+def _fit_garch_job(
+    returns: pd.Series,
+    model_type: str = 'GARCH',
+    previous: Optional[Dict[str, Any]] = None,
+    max_extension_days: int = 5,
+    tolerance: float = 0.1
+) -> Dict[str, Any]:
+    """Fit, warm-start or filter forward one sector's GARCH (runs in a worker process)."""
+    started = time.perf_counter()
+    returns = returns.dropna()
+    values = returns.values.astype(float)
+    garch = GARCHForecaster(model_type=model_type)
+    
+    prior_params = None
+    if previous and previous.get('model_type', 'GARCH') == model_type:
+        prior_params = previous.get('params')
+    
+    fit, refit, shift = None, True, None
+    if prior_params:
+        n_old = int(previous.get('n_observations', 0))
+        n_new = len(values) - n_old
+        # Same history plus a few days: keep the parameters if a refit would barely move them
+        if 0 <= n_new <= max_extension_days and previous.get('data_hash') == _returns_hash(values[:n_old]):
+            shift = _garch_parameter_shift(garch, returns, prior_params)
+            if shift is not None and shift < tolerance:
+                fit = garch.fix(returns, prior_params)
+                refit = 'error' in fit
+    
+    if refit:
+        fit = garch.fit(returns, starting_values=prior_params)
+    
+    state = None
+    if 'error' not in fit and not isinstance(garch.model, dict):
+        state = {
+            'model_type': model_type,
+            'params': {k: float(v) for k, v in garch.model.params.items()},
+            'n_observations': len(values),
+            'data_hash': _returns_hash(values),
+            'last_date': str(returns.index[-1]),
+        }
+    
+    return {
+        'forecaster': garch,
+        'fit': fit,
+        'refit': refit,
+        'warm_start': bool(fit.get('warm_start', False)),
+        'parameter_shift': shift,
+        'seconds': time.perf_counter() - started,
+        'state': state,
+    }
+
+
+def fit_garch_batch(
+    returns: Dict[str, pd.Series],
+    model_type: str = 'GARCH',
+    previous: Optional[Dict[str, Dict[str, Any]]] = None,
+    n_jobs: Optional[int] = None,
+    max_extension_days: int = 5,
+    tolerance: float = 0.1
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fit GARCH models for many sectors in parallel.
+    
+    Each sector with a previous state (as returned in 'state', e.g. from the
+    model registry) is warm-started from its parameters. When the new
+    returns are the previous sample plus at most max_extension_days and a
+    one-step Newton estimate puts every parameter within tolerance standard
+    errors of the old value, the refit is skipped and the variance is
+    filtered forward with the old parameters.
+    
+    Args:
+        returns: Sector name -> returns series
+        model_type: 'GARCH', 'EGARCH', or 'GJR-GARCH'
+        previous: Sector name -> previous state
+        n_jobs: Worker processes (default: GARCH_FIT_WORKERS; 1 fits in-process)
+        max_extension_days: Most new days for which a refit may be skipped
+        tolerance: Largest predicted parameter change (in standard errors)
+            for which a refit is skipped
+        
+    Returns:
+        Sector name -> dict with the fitted 'forecaster', 'fit' statistics,
+        'refit', 'warm_start', 'seconds' and the 'state' to store
+    """
+    previous = previous or {}
+    n_jobs = n_jobs or GARCH_FIT_WORKERS
+    names = list(returns)
+    args = [
+        (returns[name], model_type, previous.get(name), max_extension_days, tolerance)
+        for name in names
+    ]
+    
+    started = time.perf_counter()
+    if n_jobs > 1 and len(names) > 1:
+        # Spawned, as for the order search pool: this may run in the web process
+        with ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(names)),
+            mp_context=multiprocessing.get_context('spawn')
+        ) as pool:
+            jobs = [pool.submit(_fit_garch_job, *a) for a in args]
+            fits = [job.result() for job in jobs]
+    else:
+        fits = [_fit_garch_job(*a) for a in args]
+    
+    results = dict(zip(names, fits))
+    n_skipped = sum(not r['refit'] for r in fits)
+    n_warm = sum(r['warm_start'] for r in fits)
+    logger.info(
+        f"GARCH batch: {len(names)} sectors in {time.perf_counter() - started:.2f}s "
+        f"({n_skipped} filtered forward, {n_warm} warm-started)"
+    )
+    return results
+
+
+# ============================================
+# ONLINE VOLATILITY NOWCASTING
+# ============================================
+
+class OnlineGARCHState:
+    """
+    GARCH parameters plus the current conditional variance.
+    
+    update() applies one day's return in O(1) and forecast() gives h-step
+    variances analytically, so a nowcast never touches the optimizer.
+    Variances are in the squared units the model was fit in (percentage
+    returns, scale=100); forecast() returns daily decimal variances.
+    """
+    
+    def __init__(
+        self,
+        vol_type: str,
+        omega: float,
+        alpha: float,
+        beta: float,
+        variance: float,
+        gamma: float = 0.0,
+        mu: float = 0.0,
+        nu: Optional[float] = None,
+        scale: float = 100.0,
+        last_date: Optional[str] = None,
+        n_updates: int = 0
+    ):
+        """
+        Args:
+            vol_type: 'GARCH', 'GJR-GARCH' or 'EGARCH'
+            omega, alpha, beta, gamma: Variance equation parameters
+            variance: Conditional variance of the next (unseen) day
+            mu: Constant mean of the scaled returns
+            nu: Student's t degrees of freedom (None for normal)
+            scale: Factor applied to returns before fitting
+            last_date: Date of the last return included
+            n_updates: Returns applied since the parameters were estimated
+        """
+        self.vol_type = vol_type
+        self.omega = omega
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.mu = mu
+        self.nu = nu
+        self.scale = scale
+        self.variance = variance
+        self.last_date = last_date
+        self.n_updates = n_updates
+    
+    def update(self, ret: float, date: Optional[str] = None) -> float:
+        """Fold one new return into the state; returns the next-day variance."""
+        e = ret * self.scale - self.mu
+        h = self.variance
+        if self.vol_type == 'EGARCH':
+            z = e / math.sqrt(h)
+            self.variance = math.exp(
+                self.omega + self.alpha * (abs(z) - math.sqrt(2 / math.pi))
+                + self.gamma * z + self.beta * math.log(h)
+            )
+        else:
+            self.variance = self.omega + (self.alpha + self.gamma * (e < 0)) * e * e + self.beta * h
+        
+        self.last_date = date
+        self.n_updates += 1
+        return self.variance
+    
+    def forecast(self, horizon: int = 21, variance: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Expected daily variance for the next horizon days (decimal units).
+        
+        variance replaces the state's next-day variance, e.g. an array of
+        next-day variances at many forecast origins; the result then has
+        shape (len(variance), horizon).
+        
+        GARCH/GJR use the exact recursion E[h'] = omega + (alpha + gamma/2 +
+        beta) E[h]. EGARCH has no closed form beyond one step; it uses
+        E[h'] ~= exp(omega) E[h]^beta E[exp(alpha(|z| - c) + gamma z)] with the
+        normal moment, which ignores the Jensen gap in E[h^beta].
+        """
+        h = self.variance if variance is None else np.asarray(variance, dtype=float)
+        path = np.empty((horizon,) + np.shape(h))
+        if self.vol_type == 'EGARCH':
+            c = math.sqrt(2 / math.pi)
+            a, g = self.alpha, self.gamma
+            norm_cdf = lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2)))
+            shock = math.exp(-a * c) * (
+                math.exp((a + g) ** 2 / 2) * norm_cdf(a + g)
+                + math.exp((a - g) ** 2 / 2) * norm_cdf(a - g)
+            )
+            step_constant = math.exp(self.omega) * shock
+            for k in range(horizon):
+                path[k] = h
+                h = step_constant * h ** self.beta
+        else:
+            persistence = self.alpha + self.gamma / 2 + self.beta
+            for k in range(horizon):
+                path[k] = h
+                h = self.omega + persistence * h
+        
+        return path.T / self.scale ** 2
+    
+    def as_params(self) -> Dict[str, Any]:
+        """Parameters in the simulate_garch_paths format."""
+        return {
+            'vol_type': self.vol_type,
+            'omega': self.omega,
+            'alpha': self.alpha,
+            'gamma': self.gamma,
+            'beta': self.beta,
+            'nu': self.nu,
+            'next_variance': self.variance,
+            'scale': self.scale,
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state."""
+        return {**self.as_params(), 'mu': self.mu, 'last_date': self.last_date, 'n_updates': self.n_updates}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'OnlineGARCHState':
+        """Restore a state saved with to_dict()."""
+        return cls(
+            vol_type=data['vol_type'],
+            omega=data['omega'],
+            alpha=data['alpha'],
+            beta=data['beta'],
+            variance=data['next_variance'],
+            gamma=data.get('gamma', 0.0),
+            mu=data.get('mu', 0.0),
+            nu=data.get('nu'),
+            scale=data.get('scale', 100.0),
+            last_date=data.get('last_date'),
+            n_updates=data.get('n_updates', 0)
+        )
+    
+    @classmethod
+    def from_forecaster(cls, garch: GARCHForecaster) -> Optional['OnlineGARCHState']:
+        """State at the end of a fitted (or fixed) GARCHForecaster's sample."""
+        params = garch.get_params()
+        if params is None:
+            return None
+        
+        fitted = garch.model.params
+        return cls(
+            vol_type=params['vol_type'],
+            omega=params['omega'],
+            alpha=params['alpha'],
+            beta=params['beta'],
+            variance=params['next_variance'],
+            gamma=params['gamma'],
+            mu=float(fitted.get('mu', 0.0)),
+            nu=params['nu'],
+            scale=params['scale'],
+            last_date=str(garch.model.resid.index[-1])
+        )
+
+
+class VolatilityNowcaster:
+    """
+    Per-sector OnlineGARCHState kept current with the feature store.
+    
+    States are initialized once per sector: from the GARCH state stored in
+    the model registry (parameters filtered through the full return
+    history), else from the newest pickled GARCH model, else by fitting the
+    last 500 returns. Afterwards new daily returns are folded into every
+    sector's state whenever the feature matrix file changes, so a request
+    is a dictionary lookup plus an analytic forecast. After refit_every
+    updates a warm-started refit runs in the background; the refit state
+    replays any returns that arrived meanwhile before it replaces the old
+    one. The update counter restarts when a refit is scheduled, so a
+    failed refit is retried only after another refit_every updates.
+    """
+    
+    def __init__(self, feature_path: str = FEATURE_MATRIX_PATH, refit_every: int = 21):
+        """
+        Args:
+            feature_path: Feature matrix parquet with *_Return_1d columns
+            refit_every: Daily updates between background refits
+        """
+        self.feature_path = feature_path
+        self.refit_every = refit_every
+        self.states = {}
+        self._features = None
+        self._features_mtime = None
+        self._refitting = set()
+        self._lock = threading.Lock()
+    
+    def get_state(self, sector: str) -> Optional[OnlineGARCHState]:
+        """Current state for a sector (e.g. 'Technology' or 'Real Estate')."""
+        sector = sector.replace(' ', '_')
+        self._refresh_features()
+        
+        state = self.states.get(sector)
+        if state is None:
+            returns = self._returns(sector)
+            if returns is None:
+                return None
+            
+            with self._lock:
+                state = self.states.get(sector)
+                if state is None:
+                    state = self._initialize(sector, returns)
+                    if state is None:
+                        return None
+                    self.states[sector] = state
+        
+        if state.n_updates >= self.refit_every:
+            self._schedule_refit(sector)
+        return state
+    
+    def reset(self):
+        """Drop all states so they are rebuilt from the active model version."""
+        with self._lock:
+            self.states = {}
+    
+    def _refresh_features(self) -> bool:
+        """Reload the feature matrix if the file changed; True when reloaded."""
+        try:
+            mtime = os.path.getmtime(self.feature_path)
+        except OSError:
+            return False
+        if mtime == self._features_mtime:
+            return False
+        
+        features = pd.read_parquet(self.feature_path)
+        with self._lock:
+            if mtime == self._features_mtime:
+                return False
+            self._features = features
+            self._features_mtime = mtime
+            # Fold the new returns into every sector, not just the one requested
+            for sector, state in self.states.items():
+                returns = self._returns(sector)
+                if returns is not None:
+                    self._catch_up(state, returns)
+        return True
+    
+    def _returns(self, sector: str) -> Optional[pd.Series]:
+        column = f'{sector}_Return_1d'
+        if self._features is None or column not in self._features.columns:
+            return None
+        return self._features[column].dropna()
+    
+    @staticmethod
+    def _catch_up(state: OnlineGARCHState, returns: pd.Series):
+        """Apply the returns dated after the state's last update."""
+        if state.last_date is None:
+            return
+        for date, value in returns[returns.index.astype(str) > state.last_date].items():
+            state.update(float(value), str(date))
+    
+    def _initialize(self, sector: str, returns: pd.Series) -> Optional[OnlineGARCHState]:
+        """Build a sector's state from the registry, a saved model, or a fresh fit."""
+        garch = GARCHForecaster()
+        
+        stored = _registry_garch_states().get(sector)
+        if stored and stored.get('params'):
+            garch = GARCHForecaster(model_type=stored.get('model_type', 'GARCH'))
+            if 'error' not in garch.fix(returns, stored['params']):
+                state = OnlineGARCHState.from_forecaster(garch)
+                if state is not None:
+                    # The stored n_observations is the training split, not the
+                    # full history fix() filtered through; counting the gap as
+                    # updates would refit every sector on its first request
+                    state.n_updates = 0
+                    return state
+        
+        import glob
+        model_files = sorted(glob.glob(os.path.join(MODELS_DIR, f'garch_{sector}_*.pkl')), reverse=True)
+        if model_files:
+            try:
+                garch.load(model_files[0])
+                state = OnlineGARCHState.from_forecaster(garch)
+                if state is not None:
+                    self._catch_up(state, returns)
+                    return state
+            except Exception as e:
+                logger.warning(f"Failed to load pre-trained GARCH for {sector}: {e}")
+        
+        garch = GARCHForecaster()
+        if 'error' in garch.fit(returns.tail(500)):
+            return None
+        return OnlineGARCHState.from_forecaster(garch)
+    
+    def _schedule_refit(self, sector: str):
+        """Refit a sector in a background thread, warm-started from its state."""
+        with self._lock:
+            if sector in self._refitting:
+                return
+            self._refitting.add(sector)
+            state = self.states[sector]
+            # Count towards the next refit from here, whether or not this one succeeds
+            state.n_updates = 0
+            returns = self._returns(sector)
+        
+        def refit():
+            try:
+                params = {
+                    'mu': state.mu, 'omega': state.omega, 'alpha[1]': state.alpha,
+                    'gamma[1]': state.gamma, 'beta[1]': state.beta, 'nu': state.nu,
+                }
+                previous = {
+                    'model_type': state.vol_type,
+                    'params': {name: value for name, value in params.items() if value is not None},
+                }
+                fitted = fit_garch_batch({sector: returns}, model_type=state.vol_type,
+                                         previous={sector: previous}, n_jobs=1)[sector]
+                new_state = OnlineGARCHState.from_forecaster(fitted['forecaster'])
+                if new_state is None:
+                    logger.warning(f"Volatility nowcaster refit for {sector} produced no state")
+                    return
+                
+                with self._lock:
+                    # Skip if reset() or a re-initialization replaced the state meanwhile
+                    if self.states.get(sector) is not state:
+                        return
+                    latest = self._returns(sector)
+                    if latest is not None:
+                        self._catch_up(new_state, latest)
+                    self.states[sector] = new_state
+                logger.info(f"Volatility nowcaster refit {sector} in {fitted['seconds']:.2f}s")
+            except Exception as e:
+                logger.warning(f"Volatility nowcaster refit failed for {sector}: {e}")
+            finally:
+                with self._lock:
+                    self._refitting.discard(sector)
+        
+        threading.Thread(target=refit, daemon=True).start()
+
+
+def _registry_garch_states() -> Dict[str, Dict[str, Any]]:
+    """GARCH states stored with the active forecast model in the registry."""
+    try:
+        from .ml_training_pipeline import ModelRegistry
+        active = ModelRegistry().get_active_model('forecast') or {}
+    except Exception as e:
+        logger.debug(f"Could not read model registry: {e}")
+        return {}
+    return {
+        sector: metrics['garch']['state']
+        for sector, metrics in active.get('metrics', {}).items()
+        if isinstance(metrics, dict) and (metrics.get('garch') or {}).get('state')
+    }
+
+
+# ============================================
+# LSTM FORECASTING
+# ============================================
+
+# Process-wide torch intra-op threads, set once at startup (0 = leave torch's default)
+LSTM_NUM_THREADS = int(os.environ.get('LSTM_NUM_THREADS', 0))
+
+# Rows per batched MC dropout forward pass
+LSTM_MC_MAX_BATCH = int(os.environ.get('LSTM_MC_MAX_BATCH', 4096))
+
+# Largest absolute difference allowed between exported and eager predictions
+LSTM_EXPORT_TOLERANCE = float(os.environ.get('LSTM_EXPORT_TOLERANCE', 1e-4))
+
+# Same for int8 exports: dynamic quantization rounds every weight, which moved
+# daily-return predictions by 0.7e-3 to 1.3e-3 on the sector models, so the
+# FP32 tolerance would reject every quantized artifact
+LSTM_EXPORT_QUANT_TOLERANCE = float(os.environ.get('LSTM_EXPORT_QUANT_TOLERANCE', 2e-3))
+
+
+_torch_threads_configured = False
+
+
+def configure_torch_threads(num_threads: Optional[int] = None):
+    """
+    Set torch's intra-op thread count for the process, once.
+    
+    torch.set_num_threads is process-global, so changing it per request
+    races between concurrent requests; call this at startup instead.
+    
+    Args:
+        num_threads: Thread count, always applied (e.g. by a training worker
+            process). By default LSTM_NUM_THREADS is applied on the first
+            call only; when it is 0 torch keeps its default and is not
+            imported.
+    """
+    global _torch_threads_configured
+    if num_threads is None:
+        if _torch_threads_configured or not LSTM_NUM_THREADS:
+            return
+        num_threads = LSTM_NUM_THREADS
+    
+    import torch
+    torch.set_num_threads(num_threads)
+    _torch_threads_configured = True
+    logger.info(f"torch intra-op threads set to {num_threads}")
+
+
+class SequenceDataset:
+    """
+    Lazy sliding-window sequences over a 2-D feature array.
+    
+    Sample i is features[i:i + sequence_length] with target
+    target[i + sequence_length + horizon - 1], as in prepare_sequences.
+    Windows are strided views of the source, so nothing is copied until a
+    batch is indexed. Indexing takes an int or an array of sample indices
+    and returns float32 torch tensors, so the dataset can be passed to a
+    DataLoader with a BatchSampler (batch_size=None) to materialize one
+    batch at a time.
+    """
+    
+    def __init__(
+        self,
+        features: np.ndarray,
+        target: Optional[np.ndarray] = None,
+        sequence_length: int = 60,
+        horizon: int = 21
+    ):
+        """
+        Args:
+            features: Feature array (n_rows, n_features)
+            target: Target values aligned with features rows (None for
+                prediction-only datasets)
+            sequence_length: Input sequence length
+            horizon: Prediction horizon
+        """
+        self.features = np.ascontiguousarray(features, dtype=np.float32)
+        self.target = None if target is None else np.asarray(target, dtype=np.float32)
+        self.sequence_length = sequence_length
+        self.horizon = horizon
+        
+        # (n_rows - sequence_length + 1, sequence_length, n_features) view
+        self.windows = np.lib.stride_tricks.sliding_window_view(
+            self.features, sequence_length, axis=0
+        ).transpose(0, 2, 1)
+        
+        if self.target is None:
+            self.n_samples = len(self.windows)
+        else:
+            self.n_samples = max(len(self.features) - sequence_length - horizon, 0)
+    
+    @classmethod
+    def from_frame(
+        cls,
+        data: pd.DataFrame,
+        target_col: str,
+        feature_cols: List[str],
+        sequence_length: int = 60,
+        horizon: int = 21
+    ) -> 'SequenceDataset':
+        """Dataset over DataFrame columns (same arguments as prepare_sequences)."""
+        return cls(data[feature_cols].values, data[target_col].values, sequence_length, horizon)
+    
+    @property
+    def n_features(self) -> int:
+        return self.features.shape[1]
+    
+    def scaled(self, scaler) -> 'SequenceDataset':
+        """Same windows over the scaler-transformed 2-D source."""
+        return SequenceDataset(scaler.transform(self.features), self.target, self.sequence_length, self.horizon)
+    
+    def targets(self, index=slice(None)) -> np.ndarray:
+        """Targets for the given sample indices."""
+        offset = self.sequence_length + self.horizon - 1
+        return self.target[offset:offset + self.n_samples][index]
+    
+    def __len__(self) -> int:
+        return self.n_samples
+    
+    def __getitem__(self, index):
+        import torch
+        
+        X = torch.from_numpy(np.ascontiguousarray(self.windows[:self.n_samples][index]))
+        if self.target is None:
+            return X
+        return X, torch.from_numpy(np.ascontiguousarray(self.targets(index))).unsqueeze(-1)
+
+
 class LSTMForecaster:
     """
     LSTM neural network for return prediction.
@@ -467,8 +1518,8 @@ class LSTMForecaster:
     
     def fit(
         self,
-        X: np.ndarray,
-        y: np.ndarray,
+        X: Union[np.ndarray, SequenceDataset],
+        y: Optional[np.ndarray] = None,
         epochs: int = 100,
         batch_size: int = 32,
         validation_split: float = 0.2,
@@ -478,7 +1529,8 @@ class LSTMForecaster:
         Train LSTM model.
         
         Args:
-            X: Input features (n_samples, sequence_length, n_features)
+            X: Input features (n_samples, sequence_length, n_features), or a
+                SequenceDataset (then y is taken from the dataset)
             y: Target values (n_samples,)
             epochs: Training epochs
             batch_size: Batch size
@@ -489,34 +1541,39 @@ class LSTMForecaster:
             Dictionary with training history
         """
         if not self._torch_available:
+            if isinstance(X, SequenceDataset):
+                X, y = X.windows[:len(X)], X.targets()
             return self._fallback_fit(X, y)
         
         import torch
         import torch.nn as nn
-        from torch.utils.data import DataLoader, TensorDataset
+        from torch.utils.data import DataLoader, BatchSampler, SubsetRandomSampler, TensorDataset
         from sklearn.preprocessing import StandardScaler
         
         try:
-            # Scale data
             self.scaler = StandardScaler()
-            n_samples, seq_len, n_features = X.shape
-            X_flat = X.reshape(-1, n_features)
-            X_scaled = self.scaler.fit_transform(X_flat).reshape(n_samples, seq_len, n_features)
+            if isinstance(X, SequenceDataset):
+                # Scale the 2-D source once; windows stay views over it
+                self.scaler.fit(X.features)
+                dataset = X.scaled(self.scaler)
+                n_samples, n_features = len(dataset), dataset.n_features
+            else:
+                n_samples, seq_len, n_features = X.shape
+                X_flat = X.reshape(-1, n_features)
+                X_scaled = self.scaler.fit_transform(X_flat).reshape(n_samples, seq_len, n_features)
+                dataset = TensorDataset(torch.FloatTensor(X_scaled), torch.FloatTensor(y).unsqueeze(1))
             
             # Split data
             val_size = int(n_samples * validation_split)
-            X_train, X_val = X_scaled[:-val_size], X_scaled[-val_size:]
-            y_train, y_val = y[:-val_size], y[-val_size:]
+            n_train = n_samples - val_size
+            X_val_t, y_val_t = dataset[np.arange(n_train, n_samples)]
             
-            # Convert to tensors
-            X_train_t = torch.FloatTensor(X_train)
-            y_train_t = torch.FloatTensor(y_train).unsqueeze(1)
-            X_val_t = torch.FloatTensor(X_val)
-            y_val_t = torch.FloatTensor(y_val).unsqueeze(1)
-            
-            # Create data loaders
-            train_dataset = TensorDataset(X_train_t, y_train_t)
-            train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
+            # Create data loaders; each batch is materialized on demand
+            train_loader = DataLoader(
+                dataset,
+                sampler=BatchSampler(SubsetRandomSampler(range(n_train)), batch_size, drop_last=False),
+                batch_size=None
+            )
             
             # Build model
             self.model = self._build_model(n_features)
@@ -587,6 +1644,13 @@ class LSTMForecaster:
         """
         Generate predictions with uncertainty estimates.
         
+        All Monte Carlo dropout passes run as one batched forward pass: the
+        input is tiled n_simulations times along the batch dimension, and
+        dropout draws an independent mask for every row, so each tile is an
+        independent MC sample. Batches above LSTM_MC_MAX_BATCH rows are
+        split into chunks of whole simulations. Thread count is the
+        process-wide setting (see configure_torch_threads).
+        
         Args:
             X: Input features
             n_simulations: Monte Carlo dropout simulations
@@ -601,29 +1665,36 @@ class LSTMForecaster:
         
         try:
             # Scale input
-            n_samples, seq_len, n_features = X.shape
-            X_flat = X.reshape(-1, n_features)
-            X_scaled = self.scaler.transform(X_flat).reshape(n_samples, seq_len, n_features)
-            X_t = torch.FloatTensor(X_scaled)
+            if isinstance(X, SequenceDataset):
+                dataset = X.scaled(self.scaler)
+                X_t = dataset[np.arange(len(dataset))]
+                X_t = X_t[0] if isinstance(X_t, tuple) else X_t
+            else:
+                n_samples, seq_len, n_features = X.shape
+                X_flat = X.reshape(-1, n_features)
+                X_scaled = self.scaler.transform(X_flat).reshape(n_samples, seq_len, n_features)
+                X_t = torch.as_tensor(X_scaled, dtype=torch.float32)
+            n_samples = X_t.shape[0]
             
-            # Standard prediction
-            self.model.eval()
-            with torch.no_grad():
+            with torch.inference_mode():
+                # Standard prediction
+                self.model.eval()
                 predictions = self.model(X_t).numpy().flatten()
+                
+                # Monte Carlo dropout for uncertainty
+                self.model.train()  # Enable dropout
+                try:
+                    sims_per_chunk = max(1, LSTM_MC_MAX_BATCH // n_samples)
+                    chunks = []
+                    for start in range(0, n_simulations, sims_per_chunk):
+                        n_chunk = min(sims_per_chunk, n_simulations - start)
+                        tiled = X_t.repeat(n_chunk, 1, 1)
+                        chunks.append(self.model(tiled).reshape(n_chunk, n_samples))
+                    mc_predictions = torch.cat(chunks).numpy()
+                finally:
+                    self.model.eval()
             
-            # Monte Carlo dropout for uncertainty
-            self.model.train()  # Enable dropout
-            mc_predictions = []
-            
-            for _ in range(n_simulations):
-                with torch.no_grad():
-                    mc_pred = self.model(X_t).numpy().flatten()
-                    mc_predictions.append(mc_pred)
-            
-            mc_predictions = np.array(mc_predictions)
-            
-            ci_lower = np.percentile(mc_predictions, 2.5, axis=0)
-            ci_upper = np.percentile(mc_predictions, 97.5, axis=0)
+            ci_lower, ci_upper = np.percentile(mc_predictions, [2.5, 97.5], axis=0)
             uncertainty = np.std(mc_predictions, axis=0)
             
             return {
@@ -637,6 +1708,145 @@ class LSTMForecaster:
             logger.error(f"LSTM prediction failed: {e}")
             return {'error': str(e)}
     
+    def benchmark(
+        self,
+        X: np.ndarray,
+        simulation_counts: Tuple[int, ...] = (100, 1000),
+        repeats: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Measure predict() latency for each MC dropout sample count.
+        
+        Args:
+            X: Input features, e.g. the latest single sequence
+            simulation_counts: n_simulations values to time
+            repeats: Timed calls per count (after one warm-up call)
+            
+        Returns:
+            Dictionary with median and best milliseconds per prediction
+            call for each sample count
+        """
+        if self.model is None or self.scaler is None:
+            return {'error': 'Model not fitted'}
+        
+        results = {}
+        for n_simulations in simulation_counts:
+            self.predict(X, n_simulations=n_simulations)
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                self.predict(X, n_simulations=n_simulations)
+                timings.append((time.perf_counter() - start) * 1000)
+            results[n_simulations] = {
+                'median_ms': float(np.median(timings)),
+                'min_ms': float(np.min(timings)),
+            }
+        
+        return {'n_samples': int(X.shape[0]), 'latency': results}
+    
+    def export(
+        self,
+        filepath: str,
+        X: Union[np.ndarray, SequenceDataset],
+        quantize: bool = False,
+        tolerance: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Export a TorchScript inference artifact for ExportedLSTM.
+        
+        The eval-mode model is traced (after dynamic int8 quantization of
+        the LSTM and Linear layers when quantize=True) and saved together
+        with the scaler statistics and config, so serving needs neither
+        sklearn nor the model class. The export is checked against the
+        eager model on X, and both are timed on a single sequence.
+        
+        Args:
+            filepath: Output path (.pt)
+            X: Validation inputs (unscaled), e.g. the test sequences
+            quantize: Apply dynamic int8 quantization before tracing. This
+                shrinks the artifact but is not faster for single-sequence
+                requests on this model size
+            tolerance: Largest absolute prediction difference accepted
+                (default: LSTM_EXPORT_QUANT_TOLERANCE when quantizing, else
+                LSTM_EXPORT_TOLERANCE)
+            
+        Returns:
+            Dictionary with parity error, latencies and 'valid'; the file
+            is removed again when parity fails
+        """
+        if self.model is None or self.scaler is None or not hasattr(self.model, 'lstm'):
+            return {'error': 'Model not fitted'}
+        
+        import json
+        import torch
+        import torch.nn as nn
+        
+        if tolerance is None:
+            tolerance = LSTM_EXPORT_QUANT_TOLERANCE if quantize else LSTM_EXPORT_TOLERANCE
+        
+        try:
+            if isinstance(X, SequenceDataset):
+                X = X.windows[:len(X)]
+            n_samples, seq_len, n_features = X.shape
+            X_scaled = self.scaler.transform(X.reshape(-1, n_features)).reshape(n_samples, seq_len, n_features)
+            X_t = torch.as_tensor(X_scaled, dtype=torch.float32)
+            
+            self.model.eval()
+            module = self.model
+            if quantize:
+                module = torch.ao.quantization.quantize_dynamic(module, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+            
+            with torch.inference_mode():
+                traced = torch.jit.trace(module, X_t[:1])
+                eager_out = self.model(X_t)
+                exported_out = traced(X_t)
+            
+            max_abs_error = float((exported_out - eager_out).abs().max())
+            
+            extra_files = {
+                'scaler.json': json.dumps({
+                    'mean': self.scaler.mean_.tolist(),
+                    'scale': self.scaler.scale_.tolist(),
+                }),
+                'config.json': json.dumps({
+                    'sequence_length': self.sequence_length,
+                    'n_features': n_features,
+                    'quantized': quantize,
+                }),
+            }
+            torch.jit.save(traced, filepath, _extra_files=extra_files)
+            
+            # Latency of one single-sequence forward pass, eager vs exported
+            exported = ExportedLSTM(filepath).module
+            latency = {}
+            with torch.inference_mode():
+                for name, module in (('eager_ms', self.model), ('exported_ms', exported)):
+                    module(X_t[-1:])
+                    timings = []
+                    for _ in range(20):
+                        start = time.perf_counter()
+                        module(X_t[-1:])
+                        timings.append((time.perf_counter() - start) * 1000)
+                    latency[name] = float(np.median(timings))
+            
+            valid = max_abs_error <= tolerance
+            if not valid:
+                os.remove(filepath)
+                logger.warning(f"LSTM export rejected: max error {max_abs_error:.2e} > {tolerance:.2e}")
+            
+            return {
+                'path': filepath if valid else None,
+                'quantized': quantize,
+                'max_abs_error': max_abs_error,
+                'tolerance': tolerance,
+                'valid': valid,
+                **latency,
+            }
+            
+        except Exception as e:
+            logger.error(f"LSTM export failed: {e}")
+            return {'error': str(e)}
+    
     def _fallback_fit(self, X: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
         """Fallback using linear regression."""
         from sklearn.linear_model import Ridge
@@ -693,6 +1903,84 @@ class LSTMForecaster:
         self.model.eval()
 
 
+class ExportedLSTM:
+    """
+    Runtime for LSTM artifacts written by LSTMForecaster.export.
+    
+    Loads the TorchScript module with its scaler statistics; predictions
+    are deterministic (no MC dropout intervals).
+    """
+    
+    def __init__(self, filepath: str):
+        """
+        Args:
+            filepath: Path of the exported .pt artifact
+        """
+        import json
+        import torch
+        
+        extra_files = {'scaler.json': '', 'config.json': ''}
+        self.module = torch.jit.load(filepath, map_location='cpu', _extra_files=extra_files)
+        self.module.eval()
+        
+        scaler = json.loads(extra_files['scaler.json'])
+        config = json.loads(extra_files['config.json'])
+        self.mean = np.array(scaler['mean'], dtype=np.float32)
+        self.scale = np.array(scaler['scale'], dtype=np.float32)
+        self.sequence_length = config['sequence_length']
+        self.quantized = config.get('quantized', False)
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Point predictions for unscaled sequences.
+        
+        Args:
+            X: (n_samples, sequence_length, n_features) array, or a single
+                (sequence_length, n_features) sequence
+            
+        Returns:
+            Array of predictions (n_samples,)
+        """
+        import torch
+        
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 2:
+            X = X[None]
+        
+        with torch.inference_mode():
+            return self.module(torch.from_numpy((X - self.mean) / self.scale)).numpy().ravel()
+    
+    def forecast(self, history: np.ndarray, steps: int = 21) -> np.ndarray:
+        """
+        Recursive multi-step forecast for a univariate model.
+        
+        Args:
+            history: Recent values, at least sequence_length of them
+            steps: Days to forecast
+            
+        Returns:
+            Array of forecasts (steps,)
+        """
+        window = list(np.asarray(history, dtype=np.float32)[-self.sequence_length:])
+        forecasts = np.empty(steps)
+        for k in range(steps):
+            forecasts[k] = self.predict(np.array(window)[:, None])[0]
+            window = window[1:] + [forecasts[k]]
+        return forecasts
+
+
+_exported_lstms = {}
+_exported_lstms_lock = threading.Lock()
+
+def load_exported_lstm(filepath: str) -> ExportedLSTM:
+    """Load an exported LSTM once per process and file version."""
+    key = (filepath, os.path.getmtime(filepath))
+    with _exported_lstms_lock:
+        if key not in _exported_lstms:
+            _exported_lstms[key] = ExportedLSTM(filepath)
+        return _exported_lstms[key]
+
+
 class EnsembleForecaster:
     """
     Ensemble combining multiple forecasting models.
@@ -761,6 +2049,225 @@ class EnsembleForecaster:
         }
 
 
+# ============================================
+# WALK-FORWARD EVALUATION
+# ============================================
+
+def walk_forward_backtest(
+    forecaster: Union[ARIMAForecaster, GARCHForecaster, LSTMForecaster],
+    series: pd.Series,
+    horizons: Tuple[int, ...] = (1, 5, 21),
+    initial_window: int = 504,
+    refit_every: Optional[int] = 63,
+    output_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Walk-forward forecast evaluation at every origin without refitting.
+    
+    Every day from initial_window on is a forecast origin. Parameters are
+    re-estimated only at every refit_every-th origin (on data up to that
+    origin); between refits the model state is advanced with fixed
+    parameters:
+    
+    - ARIMA: one Kalman filter pass per block; h-step forecasts for all
+      origins are propagated from the filtered states in one matrix
+      recursion per step. The order of the fitted forecaster is kept.
+    - GARCH: one fixed-parameter variance filter per block and the
+      analytic variance recursion; forecasts are daily variances scored
+      against squared returns (with QLIKE).
+    - LSTM: rolling windows over the series, all origins batched through
+      the network per step, feeding one-step predictions back recursively.
+    
+    Args:
+        forecaster: Fitted forecaster (supplies the order/specification and,
+            for the LSTM without refits, the weights)
+        series: Series evaluated (including the initial window)
+        horizons: Forecast horizons (days) scored
+        initial_window: Observations before the first origin
+        refit_every: Origins between parameter refits (None = fit once at
+            the first origin; for LSTM, None keeps the given weights)
+        output_path: Optional .npz path for the per-origin error matrix
+        
+    Returns:
+        Dictionary with origins, forecasts, actuals and errors matrices
+        (n_origins x len(horizons)), per-horizon metrics, n_refits and
+        seconds
+    """
+    started = time.perf_counter()
+    series = series.dropna()
+    values = series.values.astype(float)
+    n = len(values)
+    
+    if n <= initial_window + 1:
+        return {'error': f'Need more than {initial_window + 1} observations'}
+    
+    H = max(horizons)
+    origins = np.arange(initial_window - 1, n - 1)
+    step = refit_every or len(origins)
+    blocks = [origins[i:i + step] for i in range(0, len(origins), step)]
+    
+    if isinstance(forecaster, ARIMAForecaster):
+        kind, block_forecast = 'arima', _arima_block_forecasts(forecaster, values)
+    elif isinstance(forecaster, GARCHForecaster):
+        kind, block_forecast = 'garch', _garch_block_forecasts(forecaster, series)
+    elif isinstance(forecaster, LSTMForecaster):
+        kind, block_forecast = 'lstm', _lstm_block_forecasts(forecaster, values, refit=bool(refit_every))
+    else:
+        return {'error': f'Unsupported forecaster: {type(forecaster).__name__}'}
+    
+    try:
+        forecasts = np.vstack([block_forecast(block[0], block[-1], H) for block in blocks])
+    except Exception as e:
+        logger.error(f"Walk-forward {kind} evaluation failed: {e}")
+        return {'error': str(e)}
+    
+    # actuals[i, k] is the value k + 1 days after origin i (NaN past the end)
+    padded = np.concatenate([values, np.full(H, np.nan)])
+    actuals = padded[origins[:, None] + np.arange(1, H + 1)]
+    if kind == 'garch':
+        actuals = actuals ** 2
+    
+    columns = np.array(horizons) - 1
+    forecasts, actuals = forecasts[:, columns], actuals[:, columns]
+    errors = forecasts - actuals
+    
+    metrics = {}
+    for j, h in enumerate(horizons):
+        valid = ~np.isnan(errors[:, j])
+        e = errors[valid, j]
+        metrics[f'h{h}'] = {
+            'n': int(valid.sum()),
+            'rmse': float(np.sqrt(np.mean(e ** 2))) if len(e) else None,
+            'mae': float(np.mean(np.abs(e))) if len(e) else None,
+        }
+        if kind == 'garch' and len(e):
+            # QLIKE up to a constant: log h + r^2 / h
+            f = forecasts[valid, j]
+            metrics[f'h{h}']['qlike'] = float(np.mean(np.log(f) + actuals[valid, j] / f))
+    
+    result = {
+        'model': kind,
+        'horizons': list(horizons),
+        'origins': series.index[origins],
+        'forecasts': forecasts,
+        'actuals': actuals,
+        'errors': errors,
+        'metrics': metrics,
+        'n_origins': len(origins),
+        'n_refits': len(blocks) if (refit_every or kind != 'lstm') else 0,
+        'seconds': time.perf_counter() - started,
+    }
+    
+    if output_path:
+        np.savez_compressed(
+            output_path,
+            origins=np.array(result['origins'].astype(str), dtype=str),
+            horizons=np.array(horizons),
+            forecasts=forecasts.astype(np.float32),
+            errors=errors.astype(np.float32),
+        )
+    
+    logger.info(
+        f"Walk-forward {kind}: {len(origins)} origins, {result['n_refits']} refits "
+        f"in {result['seconds']:.1f}s"
+    )
+    return result
+
+
+def _arima_block_forecasts(forecaster: ARIMAForecaster, values: np.ndarray):
+    """Block forecaster for walk_forward_backtest: refit, then Kalman filter."""
+    from statsmodels.tsa.arima.model import ARIMA
+    
+    order = forecaster.order
+    if order is None:
+        raise ValueError('ARIMA forecaster is not fitted')
+    warm = {'params': None}
+    
+    def block_forecast(first: int, last: int, H: int) -> np.ndarray:
+        fitted = _fit_arima_order(values[:first + 1], order, warm['params'])
+        if 'error' in fitted:
+            raise ValueError(fitted['error'])
+        warm['params'] = fitted['params']
+        
+        model = ARIMA(values[:last + 1], order=order)
+        filtered = model.filter(np.array([fitted['params'][name] for name in model.param_names])).filter_results
+        
+        Z = filtered.design[0, :, 0]
+        T = filtered.transition[:, :, 0]
+        c = filtered.state_intercept[:, 0]
+        d = filtered.obs_intercept[0, -1]
+        
+        # a(t+1|t) for each origin t in the block
+        state = filtered.predicted_state[:, first + 1:last + 2].T
+        out = np.empty((len(state), H))
+        for k in range(H):
+            out[:, k] = state @ Z + d
+            state = state @ T.T + c
+        return out
+    
+    return block_forecast
+
+
+def _garch_block_forecasts(forecaster: GARCHForecaster, series: pd.Series):
+    """Block forecaster for walk_forward_backtest: refit, then variance filter."""
+    previous = {'params': None}
+    
+    def block_forecast(first: int, last: int, H: int) -> np.ndarray:
+        garch = GARCHForecaster(p=forecaster.p, q=forecaster.q, model_type=forecaster.model_type)
+        fit = garch.fit(series.iloc[:first + 1], starting_values=previous['params'])
+        if 'error' in fit or isinstance(garch.model, dict):
+            raise ValueError(fit.get('error', 'arch not available'))
+        params = garch.model.params.to_dict()
+        previous['params'] = params
+        
+        garch.fix(series.iloc[:last + 1], params)
+        next_variance = garch.model.forecast(horizon=1, start=first, reindex=False).variance.values[:, 0]
+        
+        state = OnlineGARCHState.from_forecaster(garch)
+        if state is None:
+            raise ValueError('Unsupported GARCH specification')
+        return state.forecast(H, variance=next_variance)
+    
+    return block_forecast
+
+
+def _lstm_block_forecasts(forecaster: LSTMForecaster, values: np.ndarray, refit: bool):
+    """Block forecaster for walk_forward_backtest: rolling windows, batched."""
+    import torch
+    
+    L = forecaster.sequence_length
+    
+    def block_forecast(first: int, last: int, H: int) -> np.ndarray:
+        if refit:
+            fit = forecaster.fit(SequenceDataset(values[:first + 1, None], values[:first + 1], L, 1))
+            if 'error' in fit:
+                raise ValueError(fit['error'])
+        if forecaster.model is None or not hasattr(forecaster.model, 'lstm'):
+            raise ValueError('LSTM forecaster is not fitted')
+        if forecaster.scaler.n_features_in_ != 1:
+            raise ValueError('Walk-forward LSTM evaluation needs a univariate model')
+        
+        mean, scale = forecaster.scaler.mean_[0], forecaster.scaler.scale_[0]
+        if first + 1 < L:
+            raise ValueError(f'initial_window must be at least sequence_length ({L})')
+        
+        # Windows ending at each origin, scaled once from the 1-D source
+        scaled = ((values[:last + 1] - mean) / scale).astype(np.float32)
+        windows = SequenceDataset(scaled[first + 1 - L:, None], None, L, 1)
+        X = torch.from_numpy(np.ascontiguousarray(windows.windows))
+        
+        out = np.empty((len(X), H))
+        forecaster.model.eval()
+        with torch.inference_mode():
+            for k in range(H):
+                pred = forecaster.model(X)
+                out[:, k] = pred[:, 0].numpy()
+                X = torch.cat([X[:, 1:], ((pred - mean) / scale).unsqueeze(1).float()], dim=1)
+        return out
+    
+    return block_forecast
+
+
 # ============================================
 # CONVENIENCE FUNCTIONS
 # ============================================
@@ -775,6 +2282,10 @@ def prepare_sequences(
     """
     Prepare sequences for LSTM training.
     
+    X and y are writable copies in the frame's dtype. To avoid materializing
+    every window, pass SequenceDataset.from_frame(...) to LSTMForecaster.fit
+    instead; it scales the 2-D source once and loads batches lazily.
+    
     Args:
         data: DataFrame with features
         target_col: Column to predict
@@ -787,14 +2298,14 @@ def prepare_sequences(
     """
     features = data[feature_cols].values
     target = data[target_col].values
+    n_samples = max(len(data) - sequence_length - horizon, 0)
+    offset = sequence_length + horizon - 1
     
-    X, y = [], []
+    if n_samples == 0:
+        return np.empty((0, sequence_length, len(feature_cols)), dtype=features.dtype), target[:0].copy()
     
-    for i in range(len(data) - sequence_length - horizon):
-        X.append(features[i:i+sequence_length])
-        y.append(target[i+sequence_length+horizon-1])
-    
-    return np.array(X), np.array(y)
+    windows = np.lib.stride_tricks.sliding_window_view(features, sequence_length, axis=0)
+    return np.array(windows[:n_samples].transpose(0, 2, 1)), target[offset:offset + n_samples].copy()
 
 
 def forecast_all_sectors(
@@ -816,25 +2327,35 @@ def forecast_all_sectors(
     if sectors is None:
         sectors = ['Technology', 'Healthcare', 'Energy', 'Financials', 'Industrials']
     
-    forecasts = {}
+    sector_returns = {
+        sector: feature_matrix[f'{sector}_Return_1d'].dropna()
+        for sector in sectors
+        if f'{sector}_Return_1d' in feature_matrix.columns
+    }
     
-    for sector in sectors:
-        return_col = f'{sector}_Return_1d'
-        
-        if return_col not in feature_matrix.columns:
-            continue
-        
-        returns = feature_matrix[return_col].dropna()
-        
-        # Volatility forecast with GARCH
-        garch = GARCHForecaster()
-        garch_fit = garch.fit(returns)
+    # Volatility forecast with GARCH, all sectors fit in parallel
+    fits = fit_garch_batch(sector_returns)
+    
+    forecasts = {}
+    for sector, fitted in fits.items():
+        garch_fit = fitted['fit']
         
         if 'error' not in garch_fit:
-            vol_forecast = garch.predict(steps=horizon)
+            vol_forecast = fitted['forecaster'].predict(steps=horizon)
             forecasts[sector] = {
                 'volatility': vol_forecast,
                 'garch_fit': garch_fit,
             }
     
     return forecasts
+
+
+# Singleton instance
+_nowcaster = None
+
+def get_volatility_nowcaster() -> VolatilityNowcaster:
+    """Get or create singleton volatility nowcaster."""
+    global _nowcaster
+    if _nowcaster is None:
+        _nowcaster = VolatilityNowcaster()
+    return _nowcaster
@@ -15,10 +15,13 @@ This is the central coordination point for all ML operations.
 
 import os
 import json
+import time
 import logging
+import multiprocessing
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import hashlib
 import numpy as np
 import pandas as pd
@@ -29,7 +32,9 @@ from .data_pipeline import DataPipeline
 from .causal_discovery import CausalDiscoveryEngine
 from .treatment_effects import TreatmentEffectEstimator
 from .forecasting_service import (
-    ARIMAForecaster, GARCHForecaster, LSTMForecaster, EnsembleForecaster
+    ARIMAForecaster, GARCHForecaster, LSTMForecaster, EnsembleForecaster, SequenceDataset,
+    configure_torch_threads, fit_garch_batch, get_volatility_nowcaster, load_exported_lstm,
+    walk_forward_backtest
 )
 from .regime_detection import MarketRegimeDetector
 
@@ -44,6 +49,34 @@ REGISTRY_PATH = os.path.join(MODELS_DIR, 'model_registry.json')
 
 os.makedirs(MODELS_DIR, exist_ok=True)
 
+# Lag order used for the persisted Granger results (matches the API default)
+GRANGER_MAX_LAG = 5
+
+# Lagged cross-correlation screening before the training Granger tests. Off by
+# default: pairs it prunes are not persisted, so the API computes them live
+# instead of reading them from the database
+CAUSAL_SCREEN = os.environ.get('CAUSAL_SCREEN', '0') == '1'
+CAUSAL_SCREEN_TOP_K = int(os.environ.get('CAUSAL_SCREEN_TOP_K', 5))
+
+# Window (trading days) for the persisted time-varying treatment effects
+ROLLING_ATE_WINDOW = 252
+
+# Effect modifiers and points per axis for the persisted CATE surface
+CATE_EFFECT_MODIFIERS = ['VIX', 'Yield_Curve_Spread']
+CATE_GRID_SIZE = int(os.environ.get('CATE_GRID_SIZE', 25))
+
+# Quantize exported LSTM artifacts to int8; parity is checked against
+# LSTM_EXPORT_QUANT_TOLERANCE and a failing export falls back to FP32
+LSTM_EXPORT_QUANTIZE = os.environ.get('LSTM_EXPORT_QUANTIZE', '0') == '1'
+
+# Worker processes and per-job time limit (seconds) for forecasting training
+FORECAST_TRAIN_WORKERS = int(os.environ.get('FORECAST_TRAIN_WORKERS', os.cpu_count() or 1))
+FORECAST_JOB_TIMEOUT = int(os.environ.get('FORECAST_JOB_TIMEOUT', 900))
+
+# Walk-forward evaluation: days before the first origin and origins between refits
+WALK_FORWARD_INITIAL_WINDOW = int(os.environ.get('WALK_FORWARD_INITIAL_WINDOW', 504))
+WALK_FORWARD_REFIT_EVERY = int(os.environ.get('WALK_FORWARD_REFIT_EVERY', 63))
+
 
 class ModelRegistry:
     """
@@ -187,6 +220,230 @@ class ModelRegistry:
         return self.models['models']
 
 
+# ============================================
+# FORECAST TRAINING JOBS
+# ============================================
+
+class JobTimeoutError(BaseException):
+    """
+    Raised inside a training job that exceeds its time limit.
+    
+    Derives from BaseException so the forecasters' own broad exception
+    handlers cannot swallow it.
+    """
+
+
+def _raise_job_timeout(signum, frame):
+    raise JobTimeoutError()
+
+
+def _walk_forward_summary(
+    forecaster: Any,
+    model_type: str,
+    sector_name: str,
+    series: pd.Series,
+    version: str,
+    models_dir: str,
+    initial_window: int = None,
+    refit_every: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Walk-forward backtest saved to disk; returns the registry summary.
+    
+    Runs last in each job, after the model is saved. A failure or a job
+    timeout during the backtest is recorded in the summary ('status' and
+    'error') instead of failing the job, so the trained model is kept.
+    """
+    path = walk_forward_path(sector_name, model_type, version, models_dir)
+    try:
+        result = walk_forward_backtest(
+            forecaster,
+            series,
+            initial_window=initial_window or WALK_FORWARD_INITIAL_WINDOW,
+            refit_every=refit_every,
+            output_path=path
+        )
+    except JobTimeoutError:
+        logger.warning(f"Walk-forward {model_type} backtest for {sector_name} hit the job time limit")
+        return {'status': 'timeout', 'error': 'Job time limit reached during the backtest'}
+    except Exception as e:
+        result = {'error': str(e)}
+    
+    if 'error' in result:
+        logger.warning(f"Walk-forward {model_type} backtest for {sector_name} failed: {result['error']}")
+        return {'status': 'failed', 'error': result['error']}
+    
+    return {
+        'status': 'completed',
+        'metrics': result['metrics'],
+        'n_origins': result['n_origins'],
+        'n_refits': result['n_refits'],
+        'seconds': round(result['seconds'], 3),
+        'path': path,
+    }
+
+
+def _train_arima_job(
+    sector_name: str,
+    train_series: pd.Series,
+    test_series: pd.Series,
+    version: str,
+    previous: Optional[Dict[str, Any]],
+    models_dir: str
+) -> Dict[str, Any]:
+    """Fit, evaluate and save one sector's ARIMA model."""
+    arima = ARIMAForecaster(n_jobs=1)
+    fit = arima.fit(train_series)
+    if 'error' in fit:
+        raise ValueError(fit['error'])
+    
+    arima_preds = arima.predict(steps=len(test_series))
+    arima_rmse = np.sqrt(np.mean((test_series.values - np.array(arima_preds['forecast'][:len(test_series)]))**2))
+    
+    evaluation = {'rmse': float(arima_rmse)}
+    
+    arima_path = os.path.join(models_dir, f'arima_{sector_name}_{version}.pkl')
+    arima.save(arima_path)
+    
+    evaluation['walk_forward'] = _walk_forward_summary(
+        arima, 'arima', sector_name, pd.concat([train_series, test_series]), version, models_dir,
+        refit_every=WALK_FORWARD_REFIT_EVERY
+    )
+    return {'evaluation': evaluation, 'models': {'arima': arima_path}}
+
+
+def _train_lstm_job(
+    sector_name: str,
+    train_series: pd.Series,
+    test_series: pd.Series,
+    version: str,
+    previous: Optional[Dict[str, Any]],
+    models_dir: str
+) -> Dict[str, Any]:
+    """Fit, evaluate, save and export one sector's LSTM model."""
+    configure_torch_threads(max(1, (os.cpu_count() or 1) // FORECAST_TRAIN_WORKERS))
+    
+    lstm = LSTMForecaster(sequence_length=60, hidden_size=64)
+    lstm_fit = lstm.fit(SequenceDataset(train_series.values[:, None], train_series.values, 60, 1), epochs=50)
+    if 'error' in lstm_fit:
+        raise ValueError(lstm_fit['error'])
+    
+    # One-step-ahead predictions over the test period
+    history = np.concatenate([train_series.values[-60:], test_series.values])
+    test_windows = SequenceDataset(history[:-1, None], None, 60, 1)
+    lstm_preds = lstm.predict(test_windows, n_simulations=1)
+    
+    lstm_rmse = np.sqrt(np.mean((test_series.values - np.array(lstm_preds['predictions']))**2))
+    evaluation = {'rmse': float(lstm_rmse)}
+    
+    lstm_path = os.path.join(models_dir, f'lstm_{sector_name}_{version}.pkl')
+    lstm.save(lstm_path)
+    models = {'lstm': lstm_path}
+    
+    # TorchScript artifact for serving, checked against the eager model
+    export_path = os.path.join(models_dir, f'lstm_{sector_name}_{version}.pt')
+    export = lstm.export(export_path, test_windows, quantize=LSTM_EXPORT_QUANTIZE)
+    if LSTM_EXPORT_QUANTIZE and not export.get('valid'):
+        export = lstm.export(export_path, test_windows, quantize=False)
+    evaluation['export'] = export
+    if export.get('valid'):
+        models['lstm_export'] = export_path
+    
+    # Origins over the test period only, with the trained weights (no refits)
+    evaluation['walk_forward'] = _walk_forward_summary(
+        lstm, 'lstm', sector_name, pd.concat([train_series, test_series]), version, models_dir,
+        initial_window=len(train_series)
+    )
+    return {'evaluation': evaluation, 'models': models}
+
+
+def _train_garch_job(
+    sector_name: str,
+    train_series: pd.Series,
+    test_series: pd.Series,
+    version: str,
+    previous: Optional[Dict[str, Any]],
+    models_dir: str
+) -> Dict[str, Any]:
+    """Fit (or filter forward), evaluate and save one sector's GARCH model."""
+    fitted = fit_garch_batch({sector_name: train_series}, previous={sector_name: previous} if previous else None, n_jobs=1)[sector_name]
+    if 'error' in fitted['fit']:
+        raise ValueError(fitted['fit']['error'])
+    
+    garch = fitted['forecaster']
+    garch_preds = garch.predict(steps=max(len(test_series), 1))
+    
+    garch_path = os.path.join(models_dir, f'garch_{sector_name}_{version}.pkl')
+    garch.save(garch_path)
+    
+    walk_forward = _walk_forward_summary(
+        garch, 'garch', sector_name, pd.concat([train_series, test_series]), version, models_dir,
+        refit_every=WALK_FORWARD_REFIT_EVERY
+    )
+    return {
+        'evaluation': {
+            'mean_volatility': float(np.mean(garch_preds['volatility'])),
+            'refit': fitted['refit'],
+            'warm_start': fitted['warm_start'],
+            'fit_seconds': round(fitted['seconds'], 3),
+            'state': fitted['state'],
+            'walk_forward': walk_forward,
+        },
+        'models': {'garch': garch_path},
+    }
+
+
+# Job functions by model type, in submission order (longest first)
+FORECAST_JOBS = {
+    'lstm': _train_lstm_job,
+    'arima': _train_arima_job,
+    'garch': _train_garch_job,
+}
+
+
+def _run_forecast_job(
+    model_type: str,
+    sector_name: str,
+    train_series: pd.Series,
+    test_series: pd.Series,
+    version: str,
+    previous: Optional[Dict[str, Any]] = None,
+    models_dir: Optional[str] = None,
+    timeout: int = FORECAST_JOB_TIMEOUT
+) -> Dict[str, Any]:
+    """
+    Run one (sector, model type) job in a worker process.
+    
+    The time limit is enforced with SIGALRM where available. Errors are
+    returned rather than raised so one failed job does not stop the rest.
+    Workers are spawned and re-import this module, so the output directory
+    is passed in rather than read from MODELS_DIR in the worker.
+    """
+    import signal
+    
+    started = time.perf_counter()
+    use_alarm = timeout and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_job_timeout)
+        signal.alarm(timeout)
+    
+    try:
+        result = FORECAST_JOBS[model_type](
+            sector_name, train_series, test_series, version, previous, models_dir or MODELS_DIR
+        )
+        result['status'] = 'completed'
+    except JobTimeoutError:
+        result = {'status': 'timeout', 'error': f'Timed out after {timeout}s'}
+    except Exception as e:
+        result = {'status': 'failed', 'error': str(e)}
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+    
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+
 class MLTrainingPipeline:
     """
     Orchestrates the complete ML training workflow.
@@ -304,7 +561,8 @@ class MLTrainingPipeline:
             # Step 4: Train forecasting models
             logger.info("Step 4: Training forecasting models...")
             results['forecasting'] = self._train_forecasting_models(
-                train_data, test_data, version, data_hash
+                train_data, test_data, version, data_hash,
+                status=self.training_status[pipeline_id]
             )
             self.training_status[pipeline_id]['steps_completed'].append('forecasting')
             
@@ -345,27 +603,90 @@ class MLTrainingPipeline:
         
         sector_returns = train_data[sector_cols]
         
+        # Macro drivers are tested against sectors too so driver lookups cover them
+        macro_cols = [c for c in ['Fed_Funds_Rate', 'CPI_Change', 'GDP_Change'] if c in train_data.columns]
+        variables = sector_cols + macro_cols
+        
         # Causal discovery engine
         causal_engine = CausalDiscoveryEngine()
         
-        # Granger causality matrix
-        granger_matrix = causal_engine.granger_causality_matrix(sector_returns)
+        # Granger tests for every ordered pair. Non-significant results are
+        # kept as well so any pair can later be served from the database.
+        pairs = [(cause, effect) for cause in variables for effect in variables if cause != effect]
+        if CAUSAL_SCREEN:
+            screening = causal_engine.screen_candidate_pairs(
+                train_data, variables, max_lag=GRANGER_MAX_LAG, top_k=CAUSAL_SCREEN_TOP_K
+            )
+            if 'error' in screening:
+                logger.warning(f"Causal screening skipped: {screening['error']}")
+            else:
+                logger.info(f"Causal screening kept {screening['pairs_kept']} of {len(pairs)} pairs")
+                pairs = screening['pairs']
+                results['screening'] = {
+                    key: screening[key] for key in ('pairs_total', 'pairs_kept', 'top_k', 'threshold')
+                }
+        
+        granger_results = []
+        for cause, effect in pairs:
+            result = causal_engine.granger_causality_test(
+                train_data, cause, effect, max_lag=GRANGER_MAX_LAG
+            )
+            if 'error' not in result:
+                granger_results.append(result)
+        
+        # Granger causality matrix (sector returns)
+        granger_matrix = (
+            pd.DataFrame(0.0, index=sector_cols, columns=sector_cols),
+            pd.DataFrame(1.0, index=sector_cols, columns=sector_cols),
+        )
+        for result in granger_results:
+            if result['cause'] in sector_cols and result['effect'] in sector_cols:
+                if result['is_causal']:
+                    granger_matrix[0].loc[result['cause'], result['effect']] = 1
+                granger_matrix[1].loc[result['cause'], result['effect']] = result['p_value']
         results['granger_matrix'] = granger_matrix
         
         # PC algorithm
         pc_result = causal_engine.pc_algorithm(sector_returns.dropna())
         results['pc_algorithm'] = pc_result
         
-        # Build DAG
-        dag = causal_engine.build_causal_dag(sector_returns)
+        # Build consensus DAG over the sector returns
+        relationships = [
+            r for r in granger_results
+            if r['is_causal'] and r['cause'] in sector_cols and r['effect'] in sector_cols
+        ]
+        for edge in pc_result.get('edges', []):
+            relationships.append({
+                'cause': edge['from'],
+                'effect': edge['to'],
+                'method': 'pc_algorithm',
+                'is_causal': True,
+            })
+        dag = causal_engine.build_causal_dag(relationships)
         results['causal_dag'] = dag
         
+        # Persist everything so the API serves graphs with indexed reads
+        results['persisted_relationships'] = self._persist_causal_relationships(
+            train_data, granger_results, pc_result, dag, version, data_hash
+        )
+        
+        # Rolling-window Granger graphs to track drift over time
+        rolling_path = os.path.join(MODELS_DIR, f'causal_rolling_{version}.npz')
+        rolling = causal_engine.rolling_granger_causality(
+            sector_returns, step=5, output_path=rolling_path
+        )
+        if 'error' in rolling:
+            logger.warning(f"Rolling Granger skipped: {rolling['error']}")
+            rolling_path = None
+        results['rolling_granger_path'] = rolling_path
+        
         # Save results
         causal_path = os.path.join(MODELS_DIR, f'causal_discovery_{version}.pkl')
         joblib.dump({
             'granger_matrix': granger_matrix,
             'pc_result': pc_result,
             'dag': dag,
+            'rolling_granger_path': rolling_path,
         }, causal_path)
         
         # Register model
@@ -377,7 +698,11 @@ class MLTrainingPipeline:
                 'n_relationships': len(dag.get('edges', [])),
                 'n_nodes': len(dag.get('nodes', [])),
             },
-            hyperparameters={'max_lag': 5, 'significance': 0.05},
+            hyperparameters={
+                'max_lag': GRANGER_MAX_LAG,
+                'significance': causal_engine.significance_level,
+                'screened': 'screening' in results,
+            },
             filepath=causal_path,
             training_data_hash=data_hash
         )
@@ -388,6 +713,93 @@ class MLTrainingPipeline:
         
         return results
     
+    def _persist_causal_relationships(
+        self,
+        train_data: pd.DataFrame,
+        granger_results: List[Dict[str, Any]],
+        pc_result: Dict[str, Any],
+        dag: Dict[str, Any],
+        version: str,
+        data_hash: str
+    ) -> int:
+        """
+        Bulk-insert discovered relationships into the causal_relationships table.
+        
+        Writes one granger_causality row per tested pair, one pc_algorithm row
+        per PC edge and one consensus_dag row per DAG edge, all tagged with the
+        model version and data hash. Needs a Flask app context; without one
+        (e.g. a standalone script) the results are only kept in the pickle.
+        
+        Returns:
+            Number of rows written
+        """
+        try:
+            from flask import has_app_context
+            if not has_app_context():
+                logger.warning("No app context - causal relationships not persisted")
+                return 0
+            from app import db
+            from app.models.ml_models import CausalRelationship
+        except ImportError as e:
+            logger.warning(f"Database unavailable, causal relationships not persisted: {e}")
+            return 0
+        
+        start_date, end_date = None, None
+        if isinstance(train_data.index, pd.DatetimeIndex) and len(train_data) > 0:
+            start_date = train_data.index.min().to_pydatetime()
+            end_date = train_data.index.max().to_pydatetime()
+        
+        def _clean(value):
+            return None if value is None or not np.isfinite(value) else float(value)
+        
+        rows = []
+        for r in granger_results:
+            rows.append({
+                'cause_variable': r['cause'],
+                'effect_variable': r['effect'],
+                'discovery_method': 'granger_causality',
+                'p_value': _clean(r['p_value']),
+                'granger_f_statistic': _clean(r['f_statistic']),
+                'optimal_lag': int(r['optimal_lag']),
+                'edge_strength': _clean(1.0 - r['p_value']),
+                'sample_size': r.get('sample_size'),
+                'data_start_date': start_date,
+                'data_end_date': end_date,
+            })
+        
+        for edge in pc_result.get('edges', []):
+            rows.append({
+                'cause_variable': edge['from'],
+                'effect_variable': edge['to'],
+                'discovery_method': 'pc_algorithm',
+                'sample_size': len(train_data),
+                'data_start_date': start_date,
+                'data_end_date': end_date,
+            })
+        
+        n_methods = 2  # Granger + PC
+        for edge in dag.get('edges', []):
+            rows.append({
+                'cause_variable': edge['from'],
+                'effect_variable': edge['to'],
+                'discovery_method': 'consensus_dag',
+                'p_value': _clean(edge.get('avg_p_value')),
+                'edge_strength': _clean(edge.get('strength')),
+                'confidence_score': edge['agreement_count'] / n_methods,
+                'sample_size': len(train_data),
+                'data_start_date': start_date,
+                'data_end_date': end_date,
+            })
+        
+        try:
+            n_rows = CausalRelationship.bulk_save(rows, version, data_hash)
+            logger.info(f"Persisted {n_rows} causal relationships for version {version}")
+            return n_rows
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to persist causal relationships: {e}")
+            return 0
+    
     def _train_treatment_models(
         self,
         train_data: pd.DataFrame,
@@ -423,11 +835,47 @@ class MLTrainingPipeline:
             )
             results['sensitivity_matrix'] = sensitivity_matrix
             
+            # Time-varying effects over the full history, one pass per treatment
+            rolling_path = rolling_ate_path(version)
+            rolling = estimator.estimate_rolling_ate(
+                pd.concat([train_data, test_data]),
+                treatments=[f'{m}_Change' if not m.endswith('_Change') else m for m in available_macro],
+                outcomes=sector_cols,
+                confounders=['SP500_Return', 'SP500_Volatility_21d'],
+                window=ROLLING_ATE_WINDOW,
+                output_path=rolling_path
+            )
+            if 'error' in rolling:
+                logger.warning(f"Rolling ATE failed: {rolling['error']}")
+                rolling_path = None
+            results['rolling_ate'] = rolling_path
+            
+            # CATE surface over market conditions for interpolated serving
+            surface_path = None
+            modifiers = [c for c in CATE_EFFECT_MODIFIERS if c in train_data.columns]
+            if modifiers:
+                surface_path = cate_surface_path(version)
+                surface = estimator.estimate_cate_surface(
+                    train_data,
+                    treatments=[f'{m}_Change' if not m.endswith('_Change') else m for m in available_macro],
+                    outcomes=sector_cols,
+                    confounders=['SP500_Return', 'SP500_Volatility_21d'],
+                    effect_modifiers=modifiers,
+                    grid_size=CATE_GRID_SIZE,
+                    output_path=surface_path
+                )
+                if isinstance(surface, dict):
+                    logger.warning(f"CATE surface failed: {surface['error']}")
+                    surface_path = None
+            results['cate_surface'] = surface_path
+            
             # Save
             treatment_path = os.path.join(MODELS_DIR, f'treatment_effects_{version}.pkl')
             joblib.dump({
                 'effects_matrix': effects_matrix,
                 'sensitivity_matrix': sensitivity_matrix,
+                'rolling_ate_path': rolling_path,
+                'cate_surface_path': surface_path,
             }, treatment_path)
             
             # Register
@@ -443,6 +891,12 @@ class MLTrainingPipeline:
             
             model_id = f"treatment_effect_estimator_{version}"
             self.registry.set_active_model('treatment', model_id)
+            
+            # Drop the previous version's CATE surface (or a cached miss) and
+            # precompute the served effect table for the new version
+            from .causal_service import invalidate_cate_surface, refresh_effect_table
+            invalidate_cate_surface()
+            refresh_effect_table(version=version, background=False)
         
         return results
     
@@ -451,70 +905,78 @@ class MLTrainingPipeline:
         train_data: pd.DataFrame,
         test_data: pd.DataFrame,
         version: str,
-        data_hash: str
+        data_hash: str,
+        status: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Train forecasting models for each sector."""
-        results = {'models': {}, 'evaluations': {}}
+        """
+        Train forecasting models for each sector.
+        
+        Every (sector, model type) pair is an independent job on a spawned
+        process pool of FORECAST_TRAIN_WORKERS workers, each limited to
+        FORECAST_JOB_TIMEOUT seconds. Spawned rather than forked workers
+        do not inherit the Flask app's threads, locks or torch state.
+        Per-job status, timing and errors are recorded in
+        status['forecasting_jobs'] as jobs finish.
+        """
+        results = {'models': {}, 'evaluations': {}, 'jobs': {}}
+        jobs_status = results['jobs']
+        if status is not None:
+            status['forecasting_jobs'] = jobs_status
         
         sector_cols = [c for c in train_data.columns if c.endswith('_Return_1d')]
-        
-        for sector_col in sector_cols[:5]:  # Limit to 5 sectors for speed
-            sector_name = sector_col.replace('_Return_1d', '')
-            results['models'][sector_name] = {}
-            results['evaluations'][sector_name] = {}
-            
-            train_series = train_data[sector_col].dropna()
-            test_series = test_data[sector_col].dropna()
-            
-            if len(train_series) < 252:
-                continue
-            
-            # ARIMA
-            try:
-                arima = ARIMAForecaster()
-                arima.fit(train_series)
-                arima_preds = arima.predict(steps=len(test_series))
+        previous_garch = self._previous_garch_states()
+        
+        job_specs = []
+        for model_type in FORECAST_JOBS:
+            for sector_col in sector_cols:
+                sector_name = sector_col.replace('_Return_1d', '')
+                train_series = train_data[sector_col].dropna()
+                test_series = test_data[sector_col].dropna()
                 
-                arima_rmse = np.sqrt(np.mean((test_series.values - arima_preds['mean'][:len(test_series)])**2))
-                results['evaluations'][sector_name]['arima'] = {'rmse': float(arima_rmse)}
+                if len(train_series) < 252 or (model_type == 'lstm' and len(train_series) < 500):
+                    continue
                 
-                arima_path = os.path.join(MODELS_DIR, f'arima_{sector_name}_{version}.pkl')
-                arima.save(arima_path)
-                results['models'][sector_name]['arima'] = arima_path
-            except Exception as e:
-                logger.warning(f"ARIMA failed for {sector_name}: {e}")
+                previous = previous_garch.get(sector_name) if model_type == 'garch' else None
+                job_specs.append((model_type, sector_name, train_series, test_series, version, previous))
+                jobs_status[f'{sector_name}/{model_type}'] = {'status': 'pending'}
+        
+        started = time.perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(FORECAST_TRAIN_WORKERS, len(job_specs))),
+            mp_context=multiprocessing.get_context('spawn')
+        ) as pool:
+            futures = {
+                pool.submit(_run_forecast_job, *spec, models_dir=MODELS_DIR, timeout=FORECAST_JOB_TIMEOUT): spec
+                for spec in job_specs
+            }
             
-            # GARCH
-            try:
-                garch = GARCHForecaster()
-                garch.fit(train_series)
-                garch_preds = garch.predict(steps=len(test_series))
+            for future in as_completed(futures):
+                model_type, sector_name = futures[future][:2]
+                try:
+                    outcome = future.result()
+                except JobTimeoutError:
+                    # Alarm fired after the job returned, before it was cancelled
+                    outcome = {'status': 'timeout', 'error': f'Timed out after {FORECAST_JOB_TIMEOUT}s', 'seconds': None}
+                except (KeyboardInterrupt, SystemExit):
+                    raise
+                except BaseException as e:
+                    # Worker process died (e.g. out of memory) or the job was cancelled
+                    outcome = {'status': 'failed', 'error': str(e) or type(e).__name__, 'seconds': None}
                 
-                results['evaluations'][sector_name]['garch'] = {
-                    'mean_volatility': float(np.mean(garch_preds['volatility']))
+                jobs_status[f'{sector_name}/{model_type}'] = {
+                    key: outcome.get(key) for key in ('status', 'seconds', 'error') if key in outcome
                 }
+                if outcome['status'] != 'completed':
+                    logger.warning(f"{model_type.upper()} failed for {sector_name}: {outcome['error']}")
+                    if status is not None:
+                        status['errors'].append(f"{sector_name}/{model_type}: {outcome['error']}")
+                    continue
                 
-                garch_path = os.path.join(MODELS_DIR, f'garch_{sector_name}_{version}.pkl')
-                garch.save(garch_path)
-                results['models'][sector_name]['garch'] = garch_path
-            except Exception as e:
-                logger.warning(f"GARCH failed for {sector_name}: {e}")
-            
-            # LSTM (if enough data)
-            if len(train_series) >= 500:
-                try:
-                    lstm = LSTMForecaster(sequence_length=60, hidden_size=64)
-                    lstm.fit(train_series, epochs=50, verbose=False)
-                    lstm_preds = lstm.predict(train_series.values[-60:], steps=len(test_series))
-                    
-                    lstm_rmse = np.sqrt(np.mean((test_series.values - lstm_preds['mean'][:len(test_series)])**2))
-                    results['evaluations'][sector_name]['lstm'] = {'rmse': float(lstm_rmse)}
-                    
-                    lstm_path = os.path.join(MODELS_DIR, f'lstm_{sector_name}_{version}.pkl')
-                    lstm.save(lstm_path)
-                    results['models'][sector_name]['lstm'] = lstm_path
-                except Exception as e:
-                    logger.warning(f"LSTM failed for {sector_name}: {e}")
+                results['evaluations'].setdefault(sector_name, {})[model_type] = outcome['evaluation']
+                results['models'].setdefault(sector_name, {}).update(outcome['models'])
+        
+        results['wall_seconds'] = round(time.perf_counter() - started, 3)
+        logger.info(f"Forecasting: {len(job_specs)} jobs in {results['wall_seconds']:.1f}s")
         
         # Register ensemble
         self.registry.register_model(
@@ -530,8 +992,23 @@ class MLTrainingPipeline:
         model_id = f"forecast_ensemble_{version}"
         self.registry.set_active_model('forecast', model_id)
         
+        # Nowcaster states were filtered with the previous version's GARCH parameters
+        get_volatility_nowcaster().reset()
+        
+        # Precompute the served sector forecasts for the new version
+        refresh_forecast_cache(version, feature_data=pd.concat([train_data, test_data]), background=False)
+        
         return results
     
+    def _previous_garch_states(self) -> Dict[str, Dict[str, Any]]:
+        """GARCH states stored with the active forecast model, by sector."""
+        active = self.registry.get_active_model('forecast') or {}
+        return {
+            sector: metrics['garch']['state']
+            for sector, metrics in active.get('metrics', {}).items()
+            if isinstance(metrics, dict) and (metrics.get('garch') or {}).get('state')
+        }
+    
     def _train_regime_model(
         self,
         train_data: pd.DataFrame,
@@ -673,6 +1150,10 @@ class PredictionService:
         """
         Predict sector returns.
         
+        Served from the precomputed forecast cache of the active version
+        when it covers the horizon; otherwise the models are loaded and
+        run for this request.
+        
         Args:
             sector: Sector name
             recent_data: Recent return series
@@ -681,19 +1162,52 @@ class PredictionService:
         Returns:
             Dictionary with predictions
         """
+        cache = get_forecast_cache()
+        if cache is not None:
+            cached = cache.lookup(sector, horizon)
+            if cached is not None:
+                return cached
+        
+        return self._compute_sector_forecast(sector, recent_data, horizon)
+    
+    def _compute_sector_forecast(
+        self,
+        sector: str,
+        recent_data: pd.Series,
+        horizon: int = 21,
+        version: str = None
+    ) -> Dict[str, Any]:
+        """
+        Run the saved ARIMA, GARCH and LSTM models for one sector.
+        
+        Args:
+            sector: Sector name
+            recent_data: Recent return series
+            horizon: Forecast horizon in days
+            version: Model version to use (default: the active forecast
+                version, else the newest files found)
+            
+        Returns:
+            Dictionary with ensemble mean, std, 95% interval and the
+            individual model predictions
+        """
         # Try to load sector-specific model
         forecast_info = self.registry.get_active_model('forecast')
-        if not forecast_info:
+        if not forecast_info and version is None:
             return self._fallback_prediction(recent_data, horizon)
+        version = version or (forecast_info or {}).get('version')
         
         # Always use MODELS_DIR for glob — registry path may be stale or from another machine
         models_dir = MODELS_DIR
-        raw_path = forecast_info.get('filepath', '')
+        raw_path = (forecast_info or {}).get('filepath', '')
         if os.path.isdir(raw_path):
             models_dir = raw_path
         
+        sector = sector.replace(' ', '_')
+        file_version = version or '*'
+        
         # Try ARIMA first
-        arima_path = os.path.join(models_dir, f'arima_{sector}_*.pkl')
+        arima_path = os.path.join(models_dir, f'arima_{sector}_{file_version}.pkl')
         import glob
         arima_files = glob.glob(arima_path)
         
@@ -701,16 +1215,18 @@ class PredictionService:
         
         if arima_files:
             try:
-                arima = ARIMAForecaster()
+                arima = ARIMAForecaster(n_jobs=1)
                 arima.load(sorted(arima_files)[-1])
                 pred = arima.predict(steps=horizon)
+                if 'error' in pred:
+                    raise ValueError(pred['error'])
                 predictions['models']['arima'] = pred
-                predictions['ensemble'].append(pred['mean'])
+                predictions['ensemble'].append(pred['forecast'])
             except Exception as e:
                 logger.warning(f"ARIMA prediction failed: {e}")
         
         # Try GARCH
-        garch_path = os.path.join(models_dir, f'garch_{sector}_*.pkl')
+        garch_path = os.path.join(models_dir, f'garch_{sector}_{file_version}.pkl')
         garch_files = glob.glob(garch_path)
         
         if garch_files:
@@ -718,15 +1234,39 @@ class PredictionService:
                 garch = GARCHForecaster()
                 garch.load(sorted(garch_files)[-1])
                 pred = garch.predict(steps=horizon)
-                predictions['models']['garch'] = pred
+                predictions['models']['garch'] = {
+                    key: value.tolist() if isinstance(value, np.ndarray) else value
+                    for key, value in pred.items()
+                }
             except Exception as e:
                 logger.warning(f"GARCH prediction failed: {e}")
         
+        # Try exported LSTM (one-step model, forecast recursively)
+        lstm_files = glob.glob(os.path.join(models_dir, f'lstm_{sector}_{file_version}.pt'))
+        
+        if lstm_files and len(recent_data.dropna()) >= 60:
+            try:
+                lstm = load_exported_lstm(sorted(lstm_files)[-1])
+                forecast = lstm.forecast(recent_data.dropna().values, steps=horizon)
+                predictions['models']['lstm'] = {'mean': forecast.tolist()}
+                predictions['ensemble'].append(forecast.tolist())
+            except Exception as e:
+                logger.warning(f"LSTM prediction failed: {e}")
+        
         # Ensemble
         if predictions['ensemble']:
             ensemble_mean = np.mean(predictions['ensemble'], axis=0)
             predictions['mean'] = ensemble_mean.tolist()
             predictions['std'] = np.std(predictions['ensemble'], axis=0).tolist()
+            
+            # 95% band: ARIMA's predictive half-width around the ensemble mean
+            if 'arima' in predictions['models']:
+                arima_pred = predictions['models']['arima']
+                half_width = (np.array(arima_pred['ci_upper']) - np.array(arima_pred['ci_lower'])) / 2
+            else:
+                half_width = np.full(horizon, 1.96 * recent_data.std())
+            predictions['ci_lower'] = (ensemble_mean - half_width).tolist()
+            predictions['ci_upper'] = (ensemble_mean + half_width).tolist()
         else:
             return self._fallback_prediction(recent_data, horizon)
         
@@ -744,6 +1284,8 @@ class PredictionService:
         return {
             'mean': [float(mean_return)] * horizon,
             'std': [float(std_return)] * horizon,
+            'ci_lower': [float(mean_return - 1.96 * std_return)] * horizon,
+            'ci_upper': [float(mean_return + 1.96 * std_return)] * horizon,
             'method': 'historical_mean'
         }
     
@@ -809,6 +1351,229 @@ class PredictionService:
         return None
 
 
+# ============================================
+# FORECAST CACHE
+# ============================================
+# Sector forecasts of the active forecast version are computed once after
+# training (daily paths up to the longest standard horizon) and served from
+# memory; any horizon up to that length is a slice of the stored paths.
+
+FORECAST_CACHE_HORIZONS = (1, 5, 21, 63)
+FORECAST_CACHE_FIELDS = ('mean', 'std', 'ci_lower', 'ci_upper', 'volatility', 'arima', 'lstm')
+
+_forecast_cache = None
+_forecast_cache_loaded = False
+_forecast_cache_registry_mtime = None
+_forecast_cache_lock = threading.Lock()
+_forecast_cache_building = set()
+
+
+class ForecastCache:
+    """Forecast paths for all sectors in one (fields, sectors, days) array."""
+    
+    def __init__(
+        self,
+        sectors: List[str],
+        values: np.ndarray,
+        version: str,
+        computed_at: str
+    ):
+        self.sectors = list(sectors)
+        self.values = values
+        self.version = version
+        self.computed_at = computed_at
+        self._sector_index = {name: j for j, name in enumerate(self.sectors)}
+    
+    @property
+    def max_horizon(self) -> int:
+        return self.values.shape[2]
+    
+    def lookup(self, sector: str, horizon: int) -> Optional[Dict[str, Any]]:
+        """Cached prediction for a sector, or None if it is not covered."""
+        j = self._sector_index.get(sector.replace(' ', '_'))
+        if j is None or not 1 <= horizon <= self.max_horizon or np.isnan(self.values[0, j, 0]):
+            return None
+        
+        fields = dict(zip(FORECAST_CACHE_FIELDS, self.values[:, j, :horizon]))
+        models = {}
+        for name in ('arima', 'lstm'):
+            if np.isfinite(fields[name][0]):
+                models[name] = {'mean': fields[name].tolist()}
+        if np.isfinite(fields['volatility'][0]):
+            models['garch'] = {'volatility': fields['volatility'].tolist()}
+        
+        return {
+            'mean': fields['mean'].tolist(),
+            'std': fields['std'].tolist(),
+            'ci_lower': fields['ci_lower'].tolist(),
+            'ci_upper': fields['ci_upper'].tolist(),
+            'models': models,
+            'version': self.version,
+            'computed_at': self.computed_at,
+            'cached': True,
+        }
+    
+    def save(self, filepath: str):
+        """Save the cache as a compressed npz archive."""
+        np.savez_compressed(
+            filepath,
+            sectors=np.array(self.sectors, dtype=str),
+            values=self.values,
+            meta=np.array([self.version, self.computed_at], dtype=str)
+        )
+    
+    @classmethod
+    def load(cls, filepath: str) -> 'ForecastCache':
+        """Load a cache saved with save()."""
+        with np.load(filepath) as archive:
+            version, computed_at = archive['meta'].tolist()
+            return cls(archive['sectors'].tolist(), archive['values'], version, computed_at)
+
+
+def build_forecast_cache(feature_data: pd.DataFrame, version: str) -> ForecastCache:
+    """
+    Run every sector's models of a version over the longest standard horizon.
+    
+    Sectors without any usable model of the version are left out (NaN), so
+    requests for them fall through to the live path and its historical-mean
+    fallback rather than being served as a cached model forecast.
+    
+    Args:
+        feature_data: Feature matrix with *_Return_1d columns
+        version: Forecast model version whose files are used
+        
+    Returns:
+        ForecastCache
+    """
+    service = PredictionService()
+    columns = [c for c in feature_data.columns if c.endswith('_Return_1d')]
+    sectors = [c.replace('_Return_1d', '') for c in columns]
+    horizon = max(FORECAST_CACHE_HORIZONS)
+    values = np.full((len(FORECAST_CACHE_FIELDS), len(sectors), horizon), np.nan)
+    
+    for j, (sector, column) in enumerate(zip(sectors, columns)):
+        recent_data = feature_data[column].dropna().tail(252)
+        pred = service._compute_sector_forecast(sector, recent_data, horizon, version=version)
+        if pred.get('method') == 'historical_mean':
+            logger.info(f"Forecast cache {version}: no models for {sector}, left uncached")
+            continue
+        models = pred.get('models', {})
+        paths = {
+            'mean': pred.get('mean'),
+            'std': pred.get('std'),
+            'ci_lower': pred.get('ci_lower'),
+            'ci_upper': pred.get('ci_upper'),
+            'volatility': models.get('garch', {}).get('volatility'),
+            'arima': models.get('arima', {}).get('forecast'),
+            'lstm': models.get('lstm', {}).get('mean'),
+        }
+        for i, field in enumerate(FORECAST_CACHE_FIELDS):
+            if paths[field] is not None:
+                values[i, j] = np.asarray(paths[field], dtype=float)[:horizon]
+    
+    return ForecastCache(sectors, values, version, datetime.now().isoformat())
+
+
+def refresh_forecast_cache(
+    version: str,
+    feature_data: pd.DataFrame = None,
+    background: bool = True
+) -> Optional[ForecastCache]:
+    """
+    Rebuild, save and activate the forecast cache for a version.
+    
+    Args:
+        version: Forecast model version
+        feature_data: Feature matrix (default: load from disk)
+        background: Build in a daemon thread and return immediately
+        
+    Returns:
+        The new cache when built synchronously, else None
+    """
+    def build():
+        global _forecast_cache, _forecast_cache_loaded
+        try:
+            data = feature_data
+            if data is None:
+                feature_path = os.path.join(DATA_DIR, 'processed', 'feature_matrix.parquet')
+                if not os.path.exists(feature_path):
+                    logger.warning("Feature matrix not found, forecast cache not built")
+                    return None
+                data = pd.read_parquet(feature_path)
+            
+            cache = build_forecast_cache(data, version)
+            cache.save(forecast_cache_path(version))
+            
+            with _forecast_cache_lock:
+                _forecast_cache = cache
+                _forecast_cache_loaded = True
+            logger.info(f"Forecast cache {version} built ({len(cache.sectors)} sectors)")
+            return cache
+        except Exception as e:
+            logger.error(f"Forecast cache build failed: {e}")
+            return None
+        finally:
+            with _forecast_cache_lock:
+                _forecast_cache_building.discard(version)
+    
+    with _forecast_cache_lock:
+        if background and version in _forecast_cache_building:
+            return None
+        _forecast_cache_building.add(version)
+    
+    if background:
+        threading.Thread(target=build, daemon=True).start()
+        return None
+    return build()
+
+
+def invalidate_forecast_cache():
+    """Drop the in-memory forecast cache (e.g. after activating another model version)."""
+    global _forecast_cache, _forecast_cache_loaded
+    with _forecast_cache_lock:
+        _forecast_cache = None
+        _forecast_cache_loaded = False
+
+
+def get_forecast_cache() -> Optional[ForecastCache]:
+    """
+    Get the forecast cache of the active forecast version.
+    
+    The registry file's mtime is checked on every call, so activating a
+    version in any process invalidates the cache here too. After that the
+    cache is loaded from disk, or built in the background if missing; None
+    is returned until it is available.
+    """
+    global _forecast_cache, _forecast_cache_loaded, _forecast_cache_registry_mtime
+    try:
+        mtime = os.path.getmtime(REGISTRY_PATH)
+    except OSError:
+        mtime = None
+    
+    if _forecast_cache_loaded and mtime == _forecast_cache_registry_mtime:
+        return _forecast_cache
+    
+    active = ModelRegistry().get_active_model('forecast')
+    version = (active or {}).get('version')
+    
+    cache = _forecast_cache if _forecast_cache is not None and _forecast_cache.version == version else None
+    filepath = forecast_cache_path(version) if version else None
+    if cache is None and filepath and os.path.exists(filepath):
+        try:
+            cache = ForecastCache.load(filepath)
+        except Exception as e:
+            logger.warning(f"Could not load forecast cache {filepath}: {e}")
+    
+    with _forecast_cache_lock:
+        _forecast_cache = cache
+        _forecast_cache_loaded = True
+        _forecast_cache_registry_mtime = mtime
+    
+    if cache is None and version:
+        refresh_forecast_cache(version, background=True)
+    return cache
+
+
 # ============================================
 # CONVENIENCE FUNCTIONS
 # ============================================
@@ -853,6 +1618,26 @@ def get_predictions(
     return service.predict_sector_returns(sector, recent_data, horizon)
 
 
+def rolling_ate_path(version: str) -> str:
+    """Path of the rolling ATE series stored with a treatment model version."""
+    return os.path.join(MODELS_DIR, f'rolling_ate_{version}.npz')
+
+
+def cate_surface_path(version: str) -> str:
+    """Path of the CATE surface stored with a treatment model version."""
+    return os.path.join(MODELS_DIR, f'cate_surface_{version}.npz')
+
+
+def forecast_cache_path(version: str) -> str:
+    """Path of the precomputed sector forecasts stored with a forecast version."""
+    return os.path.join(MODELS_DIR, f'forecast_cache_{version}.npz')
+
+
+def walk_forward_path(sector: str, model_type: str, version: str, models_dir: Optional[str] = None) -> str:
+    """Path of the per-origin walk-forward errors stored with a forecast version."""
+    return os.path.join(models_dir or MODELS_DIR, f'walk_forward_{sector}_{model_type}_{version}.npz')
+
+
 # Singleton instances
 _pipeline = None
 _prediction_service = None
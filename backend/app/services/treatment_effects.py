@@ -14,7 +14,12 @@ Replaces hardcoded effect sizes with data-driven estimates.
 """
 
 import os
+import bisect
+import itertools
 import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any, Union
 import numpy as np
@@ -36,14 +41,16 @@ class TreatmentEffectEstimator:
     3. Statistical methods - OLS, IV, matching as fallback
     """
     
-    def __init__(self, random_state: int = 42):
+    def __init__(self, random_state: int = 42, n_jobs: int = -1):
         """
         Initialize the treatment effect estimator.
         
         Args:
             random_state: Random seed for reproducibility
+            n_jobs: Parallel jobs for forest nuisance and CATE models
         """
         self.random_state = random_state
+        self.n_jobs = n_jobs
         self._dowhy_available = False
         self._econml_available = False
         self._sklearn_available = False
@@ -81,7 +88,9 @@ class TreatmentEffectEstimator:
         treatment: str,
         outcome: str,
         confounders: List[str],
-        method: str = 'auto'
+        method: str = 'auto',
+        inference: str = 'bootstrap',
+        instruments: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """
         Estimate Average Treatment Effect (ATE).
@@ -91,38 +100,70 @@ class TreatmentEffectEstimator:
             treatment: Treatment variable name
             outcome: Outcome variable name
             confounders: List of confounder variable names
-            method: Estimation method ('auto', 'ols', 'ipw', 'dml', 'dowhy')
-            
+            method: Estimation method ('auto', 'ols', 'ipw', 'dml', 'dowhy', 'iv')
+            inference: OLS inference mode ('hac', 'bootstrap', 'bayesian_bootstrap');
+                for 'iv', 'hac' selects Newey-West and anything else HC1
+            instruments: Instrument columns for 'iv' (default: treatment lags)
+        
         Returns:
             Dictionary with ATE estimate, CI, and diagnostics
         """
-        if method == 'auto':
-            if self._dowhy_available:
-                method = 'dowhy'
-            elif self._econml_available:
-                method = 'dml'
-            else:
-                method = 'ols'
+        method = self._resolve_method(method)
         
         logger.info(f"Estimating ATE using method: {method}")
         
-        if method == 'dowhy':
+        if method == 'iv':
+            return self._estimate_ate_iv(
+                data, treatment, outcome, confounders, instruments=instruments,
+                cov_type='hac' if inference == 'hac' else 'robust'
+            )
+        elif method == 'dowhy':
             return self._estimate_ate_dowhy(data, treatment, outcome, confounders)
         elif method == 'dml':
             return self._estimate_ate_dml(data, treatment, outcome, confounders)
         elif method == 'ipw':
             return self._estimate_ate_ipw(data, treatment, outcome, confounders)
         else:  # OLS fallback
-            return self._estimate_ate_ols(data, treatment, outcome, confounders)
+            return self._estimate_ate_ols(
+                data, treatment, outcome, confounders, inference=inference
+            )
+    
+    def _resolve_method(self, method: str) -> str:
+        """Map 'auto' to the best available estimation method."""
+        if method == 'auto':
+            if self._dowhy_available:
+                return 'dowhy'
+            elif self._econml_available:
+                return 'dml'
+            return 'ols'
+        return method
     
     def _estimate_ate_dowhy(
         self,
         data: pd.DataFrame,
         treatment: str,
         outcome: str,
-        confounders: List[str]
+        confounders: List[str],
+        refute: bool = True,
+        refuters: Optional[List[str]] = None,
+        num_simulations: int = 100
     ) -> Dict[str, Any]:
-        """Estimate ATE using DoWhy framework."""
+        """
+        Estimate ATE using DoWhy framework.
+        
+        Refutation tests are not run inline. When refute is True they are
+        submitted to the background refutation pool and the result carries a
+        refutation_job_id; fetch the outcome with get_refutation_job.
+        
+        Args:
+            data: DataFrame with treatment, outcome, and confounders
+            treatment: Treatment variable name
+            outcome: Outcome variable name
+            confounders: List of confounder variable names
+            refute: Submit refutation tests for the estimate
+            refuters: Refuters to run (default: all of REFUTERS)
+            num_simulations: Simulations per refuter
+        """
         try:
             import dowhy
             from dowhy import CausalModel
@@ -159,37 +200,35 @@ class TreatmentEffectEstimator:
                 test_significance=True
             )
             
-            # Refutation tests
-            refutation_results = []
-            
-            # Placebo treatment test
-            try:
-                placebo_refute = model.refute_estimate(
-                    identified_estimand,
-                    estimate,
-                    method_name="placebo_treatment_refuter",
-                    placebo_type="permute"
+            # Refutation tests run in the background
+            refutation_job_id = None
+            if refute:
+                refutation_job_id = submit_refutation_job(
+                    model, identified_estimand, estimate,
+                    treatment=treatment, outcome=outcome,
+                    refuters=refuters, num_simulations=num_simulations
                 )
-                refutation_results.append({
-                    'test': 'placebo_treatment',
-                    'p_value': getattr(placebo_refute, 'refutation_result', {}).get('p_value', None),
-                    'passed': getattr(placebo_refute, 'refutation_result', {}).get('is_statistically_significant', True)
-                })
-            except:
-                pass
+            
+            # Interval, significance and SE come back as arrays
+            ci = estimate.get_confidence_intervals()
+            ci = np.ravel(ci) if ci is not None else None
+            significance = estimate.test_stat_significance() or {}
+            p_value = significance.get('p_value')
+            std_error = estimate.get_standard_error()
             
             return {
                 'method': 'dowhy_backdoor',
                 'ate': float(estimate.value),
-                'ci_lower': float(estimate.get_confidence_intervals()[0]) if estimate.get_confidence_intervals() else None,
-                'ci_upper': float(estimate.get_confidence_intervals()[1]) if estimate.get_confidence_intervals() else None,
-                'p_value': float(estimate.test_stat_significance().get('p_value', 0.5)) if estimate.test_stat_significance() else None,
-                'standard_error': float(estimate.get_standard_error()) if estimate.get_standard_error() else None,
+                'ci_lower': float(ci[0]) if ci is not None and len(ci) >= 2 else None,
+                'ci_upper': float(ci[1]) if ci is not None and len(ci) >= 2 else None,
+                'p_value': float(np.ravel(p_value)[0]) if p_value is not None else None,
+                'standard_error': float(np.ravel(std_error)[0]) if std_error is not None else None,
                 'sample_size': len(analysis_data),
                 'treatment': treatment,
                 'outcome': outcome,
                 'confounders': confounders,
-                'refutation_tests': refutation_results,
+                'refutation_job_id': refutation_job_id,
+                'refutation_status': 'pending' if refutation_job_id else None,
             }
             
         except Exception as e:
@@ -201,7 +240,8 @@ class TreatmentEffectEstimator:
         data: pd.DataFrame,
         treatment: str,
         outcome: str,
-        confounders: List[str]
+        confounders: List[str],
+        nuisance: Optional['NuisanceCache'] = None
     ) -> Dict[str, Any]:
         """
         Estimate ATE using Double Machine Learning.
@@ -210,40 +250,52 @@ class TreatmentEffectEstimator:
         1. Predicting treatment from confounders
         2. Predicting outcome from confounders
         Then estimates treatment effect from residuals.
+        
+        The cross-fitted residuals come from a NuisanceCache, so passing one
+        cache across a treatment/outcome grid fits each nuisance model once.
+        The final stage matches LinearDML with X=confounders: the outcome
+        residual is regressed on the treatment residual interacted with
+        [1, centered confounders], so the first coefficient is the ATE, with
+        heteroskedasticity-robust (HC1) inference.
+        
+        Args:
+            data: DataFrame with treatment, outcome, and confounders
+            treatment: Treatment variable name
+            outcome: Outcome variable name
+            confounders: List of confounder variable names
+            nuisance: Cache built on the same data and confounders
         """
         try:
-            from econml.dml import LinearDML
-            from sklearn.ensemble import RandomForestRegressor
-            from sklearn.linear_model import LassoCV
+            if nuisance is None:
+                nuisance = NuisanceCache(
+                    data, confounders, random_state=self.random_state, n_jobs=self.n_jobs
+                )
             
-            # Prepare data
-            analysis_data = data[[treatment, outcome] + confounders].dropna()
+            t_res, y_res, rows = nuisance.pair(treatment, outcome)
+            n = len(rows)
             
-            Y = analysis_data[outcome].values
-            T = analysis_data[treatment].values
-            X = analysis_data[confounders].values
+            # Final stage on residuals
+            X = data[confounders].values[rows].astype(float)
+            Z = t_res[:, None] * np.column_stack([np.ones(n), X - X.mean(axis=0)])
+            k = Z.shape[1]
             
-            # Create DML estimator
-            dml = LinearDML(
-                model_y=RandomForestRegressor(n_estimators=100, max_depth=5, random_state=self.random_state),
-                model_t=RandomForestRegressor(n_estimators=100, max_depth=5, random_state=self.random_state),
-                random_state=self.random_state,
-                cv=5
-            )
-            
-            # Fit
-            dml.fit(Y, T, X=X)
+            coef, _, _, _ = np.linalg.lstsq(Z, y_res, rcond=None)
+            scores = Z * (y_res - Z @ coef)[:, None]
+            bread = np.linalg.pinv(Z.T @ Z)
+            cov = bread @ (scores.T @ scores) @ bread * n / (n - k)
             
-            # Get ATE
-            ate = dml.ate()
-            ate_interval = dml.ate_interval(alpha=0.05)
+            ate = coef[0]
+            std_error = np.sqrt(cov[0, 0])
+            z_crit = stats.norm.ppf(0.975)
             
             return {
                 'method': 'double_ml',
                 'ate': float(ate),
-                'ci_lower': float(ate_interval[0]),
-                'ci_upper': float(ate_interval[1]),
-                'sample_size': len(analysis_data),
+                'ci_lower': float(ate - z_crit * std_error),
+                'ci_upper': float(ate + z_crit * std_error),
+                'standard_error': float(std_error),
+                'p_value': float(2 * (1 - stats.norm.cdf(abs(ate / std_error)))),
+                'sample_size': n,
                 'treatment': treatment,
                 'outcome': outcome,
                 'confounders': confounders,
@@ -258,13 +310,30 @@ class TreatmentEffectEstimator:
         data: pd.DataFrame,
         treatment: str,
         outcome: str,
-        confounders: List[str]
+        confounders: List[str],
+        n_bootstrap: int = 500,
+        bootstrap: str = 'multinomial',
+        max_chunk_cells: int = 2_000_000
     ) -> Dict[str, Any]:
         """
         Estimate ATE using Inverse Probability Weighting.
         
         IPW reweights observations to create pseudo-populations
         where treatment is independent of confounders.
+        
+        The bootstrap CI is computed without a per-replicate loop: each chunk
+        of replicates is a (B x n) weight matrix (resample counts or Poisson
+        weights) and all weighted treated and control sums come out of one
+        matrix product with the per-observation IPW terms.
+        
+        Args:
+            data: DataFrame with treatment, outcome, and confounders
+            treatment: Treatment variable name
+            outcome: Outcome variable name
+            confounders: List of confounder variable names
+            n_bootstrap: Number of bootstrap replicates
+            bootstrap: 'multinomial' (resample counts) or 'poisson'
+            max_chunk_cells: Maximum B x n weights held in memory at once
         """
         try:
             from sklearn.linear_model import LogisticRegression
@@ -291,29 +360,33 @@ class TreatmentEffectEstimator:
             weights_treated = T_binary / propensity_scores
             weights_control = (1 - T_binary) / (1 - propensity_scores)
             
-            # Weighted means
-            y_treated_weighted = np.sum(Y * T_binary * weights_treated) / np.sum(T_binary * weights_treated)
-            y_control_weighted = np.sum(Y * (1 - T_binary) * weights_control) / np.sum((1 - T_binary) * weights_control)
+            # Per-observation terms: weighted outcome and weight, treated and control
+            terms = np.column_stack([
+                Y * T_binary * weights_treated,
+                T_binary * weights_treated,
+                Y * (1 - T_binary) * weights_control,
+                (1 - T_binary) * weights_control,
+            ])
             
-            ate = y_treated_weighted - y_control_weighted
+            # Weighted means
+            totals = terms.sum(axis=0)
+            ate = totals[0] / totals[1] - totals[2] / totals[3]
             
             # Bootstrap for CI
-            bootstrap_ates = []
+            rng = np.random.default_rng(self.random_state)
             n = len(Y)
-            
-            for _ in range(500):
-                idx = np.random.choice(n, size=n, replace=True)
-                Y_b = Y[idx]
-                T_b = T_binary[idx]
-                ps_b = propensity_scores[idx]
-                
-                w_t = T_b / ps_b
-                w_c = (1 - T_b) / (1 - ps_b)
-                
-                if np.sum(T_b * w_t) > 0 and np.sum((1 - T_b) * w_c) > 0:
-                    y_t = np.sum(Y_b * T_b * w_t) / np.sum(T_b * w_t)
-                    y_c = np.sum(Y_b * (1 - T_b) * w_c) / np.sum((1 - T_b) * w_c)
-                    bootstrap_ates.append(y_t - y_c)
+            bootstrap_sums = np.concatenate([
+                weights @ terms
+                for weights in _bootstrap_weight_chunks(
+                    rng, n, n_bootstrap, scheme=bootstrap, max_cells=max_chunk_cells
+                )
+            ])
+            valid = (bootstrap_sums[:, 1] > 0) & (bootstrap_sums[:, 3] > 0)
+            bootstrap_sums = bootstrap_sums[valid]
+            bootstrap_ates = (
+                bootstrap_sums[:, 0] / bootstrap_sums[:, 1]
+                - bootstrap_sums[:, 2] / bootstrap_sums[:, 3]
+            )
             
             ci_lower, ci_upper = np.percentile(bootstrap_ates, [2.5, 97.5])
             
@@ -322,6 +395,8 @@ class TreatmentEffectEstimator:
                 'ate': float(ate),
                 'ci_lower': float(ci_lower),
                 'ci_upper': float(ci_upper),
+                'standard_error': float(np.std(bootstrap_ates)),
+                'n_bootstrap': int(valid.sum()),
                 'sample_size': len(analysis_data),
                 'treatment': treatment,
                 'outcome': outcome,
@@ -337,66 +412,332 @@ class TreatmentEffectEstimator:
         data: pd.DataFrame,
         treatment: str,
         outcome: str,
-        confounders: List[str]
+        confounders: List[str],
+        inference: str = 'bootstrap',
+        n_bootstrap: int = 1000,
+        max_lags: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Estimate ATE using OLS regression (basic backdoor adjustment).
         
         This is the simplest approach: regress outcome on treatment
-        and confounders, treatment coefficient is ATE.
+        and confounders, treatment coefficient is ATE. See estimate_ate_grid
+        for the inference modes.
+        """
+        return self.estimate_ate_grid(
+            data, treatment, [outcome], confounders,
+            inference=inference, n_bootstrap=n_bootstrap, max_lags=max_lags
+        )[outcome]
+    
+    def estimate_ate_grid(
+        self,
+        data: pd.DataFrame,
+        treatment: str,
+        outcomes: List[str],
+        confounders: List[str],
+        inference: str = 'bootstrap',
+        n_bootstrap: int = 1000,
+        max_lags: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Estimate the OLS ATE of one treatment on many outcomes at once.
+        
+        The treatment + confounder design is built once and every outcome is
+        solved as one multi-output regression. Outcomes with the same missing
+        rows share a single solve (and a single set of bootstrap replicates);
+        each outcome still uses only its own complete rows, exactly as a
+        per-outcome dropna would.
+        
+        Inference modes:
+        - 'hac': Newey-West (Bartlett kernel) standard errors from the single
+          fit, robust to heteroskedasticity and autocorrelation
+        - 'bootstrap': pairs bootstrap with all replicates solved at once from
+          stacked weighted normal equations (resample-count weights)
+        - 'bayesian_bootstrap': same, with Dirichlet (Bayesian bootstrap) weights
+        
+        Args:
+            data: DataFrame with treatment, outcomes, and confounders
+            treatment: Treatment variable name
+            outcomes: Outcome variable names
+            confounders: List of confounder variable names
+            inference: 'hac', 'bootstrap' or 'bayesian_bootstrap'
+            n_bootstrap: Number of bootstrap replicates
+            max_lags: Newey-West bandwidth (default: floor(4 * (n/100)^(2/9)))
+            
+        Returns:
+            Dict of outcome -> ATE result (same format as estimate_ate)
         """
         try:
-            from sklearn.linear_model import LinearRegression
+            if inference not in ('hac', 'bootstrap', 'bayesian_bootstrap'):
+                raise ValueError(f"Unknown inference mode: {inference}")
             
-            # Prepare data
-            analysis_data = data[[treatment, outcome] + confounders].dropna()
+            # Shared design
+            design = data[[treatment] + confounders].dropna()
+            X_all = np.column_stack([design.values.astype(float), np.ones(len(design))])
+            Y_all = data.loc[design.index, outcomes].values.astype(float)
+            observed = np.isfinite(Y_all)
             
-            Y = analysis_data[outcome].values
-            X = analysis_data[[treatment] + confounders].values
+            # Outcomes with identical missing rows are solved together
+            groups = {}
+            for j in range(len(outcomes)):
+                groups.setdefault(observed[:, j].tobytes(), []).append(j)
             
-            # Fit OLS
-            model = LinearRegression()
-            model.fit(X, Y)
+            rng = np.random.default_rng(self.random_state)
+            results = {}
             
-            ate = model.coef_[0]  # Treatment coefficient
+            for cols in groups.values():
+                mask = observed[:, cols[0]]
+                X = X_all[mask]
+                Y = Y_all[mask][:, cols]
+                n, k = X.shape
+                
+                # Fit OLS for every outcome in the group
+                beta, _, _, _ = np.linalg.lstsq(X, Y, rcond=None)
+                ate = beta[0]  # Treatment coefficients
+                
+                if inference == 'hac':
+                    lags = max_lags
+                    if lags is None:
+                        lags = int(np.floor(4 * (n / 100.0) ** (2.0 / 9.0)))
+                    resid = Y - X @ beta
+                    std_error = np.sqrt([
+                        _newey_west_cov(X, resid[:, j], lags)[0, 0]
+                        for j in range(len(cols))
+                    ])
+                    t_crit = stats.t.ppf(0.975, df=n - k)
+                    ci_lower, ci_upper = ate - t_crit * std_error, ate + t_crit * std_error
+                    n_draws = [None] * len(cols)
+                else:
+                    draws = np.concatenate([
+                        _weighted_ols_coefficients(X, Y, weights)[:, 0, :]
+                        for weights in _bootstrap_weight_chunks(
+                            rng, n, n_bootstrap,
+                            scheme='bayesian' if inference == 'bayesian_bootstrap' else 'multinomial'
+                        )
+                    ])
+                    std_error, ci_lower, ci_upper, n_draws = [], [], [], []
+                    for j in range(len(cols)):
+                        column = draws[:, j][np.isfinite(draws[:, j])]
+                        std_error.append(np.std(column))
+                        lower, upper = np.percentile(column, [2.5, 97.5])
+                        ci_lower.append(lower)
+                        ci_upper.append(upper)
+                        n_draws.append(len(column))
+                    std_error = np.array(std_error)
+                
+                # Calculate p-values
+                t_stat = ate / std_error
+                p_value = 2 * (1 - stats.t.cdf(np.abs(t_stat), df=n - k))
+                
+                for pos, j in enumerate(cols):
+                    result = {
+                        'method': 'ols',
+                        'inference': inference,
+                        'ate': float(ate[pos]),
+                        'ci_lower': float(ci_lower[pos]),
+                        'ci_upper': float(ci_upper[pos]),
+                        'standard_error': float(std_error[pos]),
+                        'p_value': float(p_value[pos]),
+                        'sample_size': int(n),
+                        'treatment': treatment,
+                        'outcome': outcomes[j],
+                        'confounders': confounders,
+                    }
+                    if inference == 'hac':
+                        result['max_lags'] = lags
+                    else:
+                        result['n_bootstrap'] = n_draws[pos]
+                    results[outcomes[j]] = result
             
-            # Calculate standard error via bootstrap
-            bootstrap_ates = []
-            n = len(Y)
+            return results
+            
+        except Exception as e:
+            logger.error(f"OLS estimation failed: {e}")
+            return {
+                outcome: {
+                    'method': 'failed',
+                    'error': str(e),
+                    'treatment': treatment,
+                    'outcome': outcome,
+                }
+                for outcome in outcomes
+            }
+    
+    def _estimate_ate_iv(
+        self,
+        data: pd.DataFrame,
+        treatment: str,
+        outcome: str,
+        confounders: List[str],
+        instruments: Optional[List[str]] = None,
+        cov_type: str = 'robust'
+    ) -> Dict[str, Any]:
+        """
+        Estimate ATE using two-stage least squares. See estimate_iv_grid.
+        """
+        return self.estimate_iv_grid(
+            data, treatment, [outcome], confounders,
+            instruments=instruments, cov_type=cov_type
+        )[outcome]
+    
+    def estimate_iv_grid(
+        self,
+        data: pd.DataFrame,
+        treatment: str,
+        outcomes: List[str],
+        confounders: List[str],
+        instruments: Optional[List[str]] = None,
+        instrument_lags: int = 2,
+        cov_type: str = 'robust',
+        max_lags: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Estimate the 2SLS effect of one endogenous treatment on many outcomes.
+        
+        The first stage (treatment on instruments and confounders) is solved
+        once from a QR factorization of the instrument matrix; the second
+        stage regresses every outcome on the fitted treatment and confounders
+        in one multi-output solve. Standard errors are the analytic 2SLS
+        sandwich, computed for all outcomes at once:
+        - 'robust': heteroskedasticity-robust (HC1)
+        - 'hac': Newey-West (Bartlett kernel), no small-sample correction
+        
+        Outcomes with the same missing rows share the first stage, as in
+        estimate_ate_grid. Without explicit instruments the treatment's own
+        lags 1..instrument_lags are used, the usual choice for persistent
+        macro series; these are only valid if the lagged treatment affects
+        outcomes solely through the current treatment.
+        
+        Args:
+            data: DataFrame with treatment, outcomes, confounders and instruments
+            treatment: Endogenous treatment variable name
+            outcomes: Outcome variable names
+            confounders: Exogenous control variable names
+            instruments: Excluded instrument column names
+            instrument_lags: Treatment lags used when instruments is None
+            cov_type: 'robust' or 'hac'
+            max_lags: Newey-West bandwidth (default: floor(4 * (n/100)^(2/9)))
+        
+        Returns:
+            Dict of outcome -> ATE result (estimate_ate format plus first-stage
+            F-statistics)
+        """
+        try:
+            if cov_type not in ('robust', 'hac'):
+                raise ValueError(f"Unknown covariance type: {cov_type}")
             
-            for _ in range(1000):
-                idx = np.random.choice(n, size=n, replace=True)
-                model_b = LinearRegression()
-                model_b.fit(X[idx], Y[idx])
-                bootstrap_ates.append(model_b.coef_[0])
+            if instruments:
+                Z_ex = data[instruments]
+            else:
+                Z_ex = pd.concat(
+                    {f'{treatment}_lag{lag}': data[treatment].shift(lag)
+                     for lag in range(1, instrument_lags + 1)},
+                    axis=1
+                )
+            instrument_names = list(Z_ex.columns)
             
-            std_error = np.std(bootstrap_ates)
-            ci_lower, ci_upper = np.percentile(bootstrap_ates, [2.5, 97.5])
+            # Shared design: [treatment, confounders, 1] and [instruments, confounders, 1]
+            design = pd.concat([data[[treatment] + confounders], Z_ex], axis=1).dropna()
+            W_all = np.column_stack([design[confounders].values.astype(float), np.ones(len(design))])
+            T_all = design[treatment].values.astype(float)
+            Z_all = design[instrument_names].values.astype(float)
+            Y_all = data.loc[design.index, outcomes].values.astype(float)
+            observed = np.isfinite(Y_all)
+            q = len(instrument_names)
             
-            # Calculate p-value
-            t_stat = ate / std_error
-            p_value = 2 * (1 - stats.t.cdf(abs(t_stat), df=n-len(confounders)-2))
+            groups = {}
+            for j in range(len(outcomes)):
+                groups.setdefault(observed[:, j].tobytes(), []).append(j)
             
-            return {
-                'method': 'ols',
-                'ate': float(ate),
-                'ci_lower': float(ci_lower),
-                'ci_upper': float(ci_upper),
-                'standard_error': float(std_error),
-                'p_value': float(p_value),
-                'sample_size': len(analysis_data),
-                'treatment': treatment,
-                'outcome': outcome,
-                'confounders': confounders,
-            }
+            z_crit = stats.norm.ppf(0.975)
+            results = {}
             
+            for cols in groups.values():
+                mask = observed[:, cols[0]]
+                W, t, Y = W_all[mask], T_all[mask], Y_all[mask][:, cols]
+                Z = np.column_stack([Z_all[mask], W])
+                n, k, l = len(t), W.shape[1] + 1, Z.shape[1]
+                
+                if n <= l:
+                    raise ValueError('Insufficient data for 2SLS')
+                
+                # First stage: project the treatment on the instrument space
+                Q, R = np.linalg.qr(Z)
+                pi = np.linalg.solve(R, Q.T @ t)
+                t_hat = Q @ (Q.T @ t)
+                v = t - t_hat
+                
+                # First-stage F for the excluded instruments (classical and HC1 Wald)
+                w_coef, _, _, _ = np.linalg.lstsq(W, t, rcond=None)
+                rss_restricted = np.sum((t - W @ w_coef) ** 2)
+                rss = v @ v
+                first_stage_f = ((rss_restricted - rss) / q) / (rss / (n - l))
+                
+                # Q R^-T equals Z (Z'Z)^-1, so these influence rows give the HC1 sandwich
+                influence = Q @ np.linalg.inv(R).T * v[:, None]
+                cov_pi = influence.T @ influence * n / (n - l)
+                pi_ex = pi[:q]
+                first_stage_f_robust = pi_ex @ np.linalg.solve(cov_pi[:q, :q], pi_ex) / q
+                
+                # Second stage for all outcomes
+                X_hat = np.column_stack([t_hat, W])
+                X = np.column_stack([t, W])
+                bread = np.linalg.inv(X_hat.T @ X_hat)
+                beta = bread @ (X_hat.T @ Y)
+                resid = Y - X @ beta
+                
+                # Variance of the treatment coefficient: h_i = row i of X_hat (X_hat'X_hat)^-1 e_1
+                h = X_hat @ bread[:, 0]
+                scores = h[:, None] * resid
+                if cov_type == 'hac':
+                    lags = max_lags
+                    if lags is None:
+                        lags = int(np.floor(4 * (n / 100.0) ** (2.0 / 9.0)))
+                    variance = np.einsum('ij,ij->j', scores, scores)
+                    for lag in range(1, min(lags, n - 1) + 1):
+                        weight = 1.0 - lag / (lags + 1.0)
+                        variance += 2 * weight * np.einsum('ij,ij->j', scores[lag:], scores[:-lag])
+                else:
+                    variance = np.einsum('ij,ij->j', scores, scores) * n / (n - k)
+                
+                ate = beta[0]
+                std_error = np.sqrt(variance)
+                p_value = 2 * (1 - stats.norm.cdf(np.abs(ate / std_error)))
+                
+                for pos, j in enumerate(cols):
+                    result = {
+                        'method': 'iv_2sls',
+                        'inference': cov_type,
+                        'ate': float(ate[pos]),
+                        'ci_lower': float(ate[pos] - z_crit * std_error[pos]),
+                        'ci_upper': float(ate[pos] + z_crit * std_error[pos]),
+                        'standard_error': float(std_error[pos]),
+                        'p_value': float(p_value[pos]),
+                        'first_stage_f': float(first_stage_f),
+                        'first_stage_f_robust': float(first_stage_f_robust),
+                        'weak_instruments': bool(first_stage_f_robust < 10),
+                        'instruments': instrument_names,
+                        'sample_size': int(n),
+                        'treatment': treatment,
+                        'outcome': outcomes[j],
+                        'confounders': confounders,
+                    }
+                    if cov_type == 'hac':
+                        result['max_lags'] = lags
+                    results[outcomes[j]] = result
+            
+            return results
+        
         except Exception as e:
-            logger.error(f"OLS estimation failed: {e}")
+            logger.error(f"2SLS estimation failed: {e}")
             return {
-                'method': 'failed',
-                'error': str(e),
-                'treatment': treatment,
-                'outcome': outcome,
+                outcome: {
+                    'method': 'failed',
+                    'error': str(e),
+                    'treatment': treatment,
+                    'outcome': outcome,
+                }
+                for outcome in outcomes
             }
     
     # ============================================
@@ -438,38 +779,38 @@ class TreatmentEffectEstimator:
         treatment: str,
         outcome: str,
         confounders: List[str],
-        effect_modifiers: List[str]
+        effect_modifiers: List[str],
+        nuisance: Optional['NuisanceCache'] = None
     ) -> Dict[str, Any]:
-        """Estimate CATE using EconML's Causal Forest."""
+        """
+        Estimate CATE using EconML's Causal Forest.
+        
+        Equivalent to CausalForestDML: the generalized random forest is fit on
+        cross-fitted residuals, which come from a NuisanceCache conditioned on
+        confounders + effect modifiers and can be shared across calls.
+        """
         try:
-            from econml.dml import CausalForestDML
-            from sklearn.ensemble import RandomForestRegressor
+            from econml.grf import CausalForest
             
-            # Prepare data
-            all_vars = [treatment, outcome] + confounders + effect_modifiers
-            all_vars = list(set(all_vars))  # Remove duplicates
-            analysis_data = data[all_vars].dropna()
+            controls = list(dict.fromkeys(confounders + effect_modifiers))
+            if nuisance is None:
+                nuisance = NuisanceCache(
+                    data, controls, random_state=self.random_state, n_jobs=self.n_jobs
+                )
             
-            Y = analysis_data[outcome].values
-            T = analysis_data[treatment].values
-            X = analysis_data[effect_modifiers].values
-            W = analysis_data[confounders].values if confounders else None
+            t_res, y_res, rows = nuisance.pair(treatment, outcome)
+            X = data[effect_modifiers].values[rows].astype(float)
             
-            # Create Causal Forest
-            cf = CausalForestDML(
-                model_y=RandomForestRegressor(n_estimators=100, max_depth=5, random_state=self.random_state),
-                model_t=RandomForestRegressor(n_estimators=100, max_depth=5, random_state=self.random_state),
+            # Causal forest final stage
+            cf = CausalForest(
                 n_estimators=100,
                 random_state=self.random_state,
-                cv=5
+                n_jobs=self.n_jobs
             )
-            
-            # Fit
-            cf.fit(Y, T, X=X, W=W)
+            cf.fit(X, t_res, y_res)
             
             # Get CATE for all observations
-            cate = cf.effect(X)
-            cate_intervals = cf.effect_interval(X, alpha=0.05)
+            cate = cf.predict(X).ravel()
             
             # Feature importance for effect modification
             importance = cf.feature_importances_
@@ -482,7 +823,7 @@ class TreatmentEffectEstimator:
                 'cate_min': float(np.min(cate)),
                 'cate_max': float(np.max(cate)),
                 'feature_importance': dict(zip(effect_modifiers, importance.tolist())),
-                'sample_size': len(analysis_data),
+                'sample_size': len(rows),
                 'treatment': treatment,
                 'outcome': outcome,
                 'effect_modifiers': effect_modifiers,
@@ -535,6 +876,248 @@ class TreatmentEffectEstimator:
         except Exception as e:
             return {'method': 'failed', 'error': str(e)}
     
+    def estimate_cate_surface(
+        self,
+        data: pd.DataFrame,
+        treatments: Union[str, List[str]],
+        outcomes: List[str],
+        confounders: List[str],
+        effect_modifiers: List[str],
+        grid_size: Union[int, List[int]] = 25,
+        quantile_range: Tuple[float, float] = (0.01, 0.99),
+        alpha: float = 0.05,
+        output_path: Optional[str] = None
+    ) -> Union['CATESurface', Dict[str, Any]]:
+        """
+        Evaluate CATEs and their intervals on a grid over the effect modifiers.
+        
+        Each modifier axis spans the given quantile range of the data in
+        grid_size quantile-spaced points (fewer for discrete modifiers such as
+        0/1 flags). With EconML a causal forest is fit per treatment/outcome
+        pair on residuals from one shared NuisanceCache, so every variable is
+        cross-fitted once; otherwise the effect is linear in the modifiers
+        (treatment x modifier interactions with HC1 intervals). The result is
+        served by CATESurface.query with multilinear interpolation.
+        
+        Args:
+            data: DataFrame with all variables
+            treatments: Treatment column name or list of names
+            outcomes: Outcome column names
+            confounders: Confounding variables
+            effect_modifiers: Variables spanning the grid
+            grid_size: Points per modifier axis (one value or one per modifier)
+            quantile_range: Data quantiles covered by each axis
+            alpha: Interval level (1 - alpha coverage)
+            output_path: Optional .npz path to store the surface
+        
+        Returns:
+            CATESurface, or a dict with 'error'
+        """
+        try:
+            if isinstance(treatments, str):
+                treatments = [treatments]
+            if isinstance(grid_size, int):
+                grid_size = [grid_size] * len(effect_modifiers)
+            
+            treatments = [t for t in treatments if t in data.columns]
+            outcomes = [o for o in outcomes if o in data.columns]
+            if not treatments or not outcomes or not effect_modifiers:
+                return {'error': 'No treatment, outcome or effect modifier columns found in data'}
+            
+            axes = []
+            for modifier, size in zip(effect_modifiers, grid_size):
+                column = data[modifier].dropna()
+                axes.append(np.unique(np.quantile(column, np.linspace(*quantile_range, size))))
+            grid = np.stack([g.ravel() for g in np.meshgrid(*axes, indexing='ij')], axis=1)
+            shape = tuple(len(a) for a in axes)
+            
+            values = np.full((len(CATE_SURFACE_FIELDS), len(treatments), len(outcomes)) + shape, np.nan)
+            
+            if self._econml_available:
+                from econml.grf import CausalForest
+                
+                method = 'causal_forest'
+                controls = list(dict.fromkeys(confounders + effect_modifiers))
+                nuisance = NuisanceCache(
+                    data, controls, random_state=self.random_state, n_jobs=self.n_jobs
+                )
+                for i, treatment in enumerate(treatments):
+                    for j, outcome in enumerate(outcomes):
+                        t_res, y_res, rows = nuisance.pair(treatment, outcome)
+                        X = data[effect_modifiers].values[rows].astype(float)
+                        
+                        cf = CausalForest(
+                            n_estimators=100,
+                            random_state=self.random_state,
+                            n_jobs=self.n_jobs
+                        )
+                        cf.fit(X, t_res, y_res)
+                        point, lower, upper = cf.predict(grid, interval=True, alpha=alpha)
+                        values[:, i, j] = np.stack([point, lower, upper]).reshape((3,) + shape)
+                
+                logger.info(f"CATE surface: {nuisance.n_fits} nuisance fits, "
+                            f"{len(treatments) * len(outcomes)} forests, {len(grid)} grid points")
+            else:
+                method = 'linear_interaction'
+                for i, treatment in enumerate(treatments):
+                    for j, outcome in enumerate(outcomes):
+                        values[:, i, j] = _linear_cate_on_grid(
+                            data, treatment, outcome, confounders, effect_modifiers, grid, alpha
+                        ).reshape((3,) + shape)
+            
+            surface = CATESurface(
+                treatments=treatments,
+                outcomes=outcomes,
+                modifiers=effect_modifiers,
+                axes=axes,
+                values=values.astype(np.float32),
+                alpha=alpha,
+                method=method
+            )
+            
+            if output_path:
+                surface.save(output_path)
+                logger.info(f"CATE surface saved to {output_path}")
+            
+            return surface
+        
+        except Exception as e:
+            logger.error(f"CATE surface estimation failed: {e}")
+            return {'error': str(e)}
+    
+    # ============================================
+    # TIME-VARYING TREATMENT EFFECTS
+    # ============================================
+    
+    def estimate_rolling_ate(
+        self,
+        data: pd.DataFrame,
+        treatments: Union[str, List[str]],
+        outcomes: List[str],
+        confounders: List[str],
+        window: Optional[int] = 252,
+        min_periods: Optional[int] = None,
+        refresh_every: int = 250,
+        output_path: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Backdoor-adjusted ATE series from recursive least squares.
+        
+        For each treatment the regression Y = a*T + b*W + c is tracked through
+        time with P = (X'X)^-1 updated by Sherman-Morrison rank-one steps: each
+        new row is added, and with a fixed window the row leaving it is
+        dropped. X'Y and y'y are carried for all outcomes at once, so every
+        date yields coefficients and classical OLS standard errors for every
+        sector from a single k x k matrix. P is recomputed exactly every
+        refresh_every dates to bound floating-point drift.
+        
+        Args:
+            data: DataFrame with treatment, outcome and confounder columns
+            treatments: Treatment column name or list of names
+            outcomes: Outcome column names (e.g. sector returns)
+            confounders: Confounder column names
+            window: Rows per estimation window, or None for an expanding
+                (recursive) estimate over all rows so far
+            min_periods: Rows before the first recursive estimate
+                (default: 63); ignored for fixed windows
+            refresh_every: Dates between exact recomputations of P
+            output_path: Optional .npz path to store the series
+        
+        Returns:
+            Dictionary with the estimate dates and (n_treatments, n_dates,
+            n_outcomes) stacks of ATE and standard error
+        """
+        if isinstance(treatments, str):
+            treatments = [treatments]
+        
+        treatments = [t for t in treatments if t in data.columns]
+        outcomes = [o for o in outcomes if o in data.columns]
+        confounders = [c for c in confounders if c in data.columns and c not in treatments]
+        
+        if not treatments or not outcomes:
+            return {'error': 'No treatment or outcome columns found in data'}
+        
+        clean = data[treatments + confounders + outcomes].dropna()
+        n = len(clean)
+        k = len(confounders) + 2
+        first_end = window if window else (min_periods or 63)
+        
+        if first_end <= k + 1 or n < first_end:
+            return {'error': 'Insufficient data for rolling treatment effects'}
+        
+        W = clean[confounders].values.astype(float)
+        Y = clean[outcomes].values.astype(float)
+        ends = np.arange(first_end, n + 1)
+        ate = np.full((len(treatments), len(ends), len(outcomes)), np.nan)
+        std_error = np.full_like(ate, np.nan)
+        
+        logger.info(
+            f"Rolling ATE: {len(treatments)} treatments x {len(outcomes)} outcomes, "
+            f"{len(ends)} dates ({'window ' + str(window) if window else 'recursive'})"
+        )
+        
+        for i, treatment in enumerate(treatments):
+            X = np.column_stack([clean[treatment].values.astype(float), W, np.ones(n)])
+            P = XtY = yy = None
+            
+            for t, end in enumerate(ends):
+                start = end - window if window else 0
+                if P is None or t % refresh_every == 0:
+                    Xw, Yw = X[start:end], Y[start:end]
+                    P = np.linalg.pinv(Xw.T @ Xw)
+                    XtY, yy = Xw.T @ Yw, np.einsum('ij,ij->j', Yw, Yw)
+                else:
+                    # Add the row entering the estimate
+                    x, y = X[end - 1], Y[end - 1]
+                    Px = P @ x
+                    P -= np.outer(Px, Px) / (1.0 + x @ Px)
+                    XtY += np.outer(x, y)
+                    yy += y * y
+                    if window:
+                        # Drop the row leaving the window
+                        x, y = X[start - 1], Y[start - 1]
+                        Px = P @ x
+                        P += np.outer(Px, Px) / (1.0 - x @ Px)
+                        XtY -= np.outer(x, y)
+                        yy -= y * y
+                
+                beta = P @ XtY
+                rss = np.maximum(yy - np.einsum('ij,ij->j', beta, XtY), 0.0)
+                sigma2 = rss / (end - start - k)
+                ate[i, t] = beta[0]
+                std_error[i, t] = np.sqrt(sigma2 * max(P[0, 0], 0.0))
+        
+        dates = np.array(clean.index[ends - 1].astype(str), dtype=str)
+        sample_size = np.minimum(ends, window) if window else ends
+        
+        result = {
+            'method': 'rolling_ols' if window else 'recursive_ols',
+            'treatments': treatments,
+            'outcomes': outcomes,
+            'confounders': confounders,
+            'dates': dates,
+            'ate': ate,
+            'standard_error': std_error,
+            'sample_size': sample_size,
+            'window': window,
+        }
+        
+        if output_path:
+            np.savez_compressed(
+                output_path,
+                treatments=np.asarray(treatments),
+                outcomes=np.asarray(outcomes),
+                confounders=np.asarray(confounders, dtype=str),
+                dates=dates,
+                ate=ate.astype(np.float32),
+                standard_error=std_error.astype(np.float32),
+                sample_size=sample_size.astype(np.int32),
+                window=np.array(window or 0),
+            )
+            logger.info(f"Rolling ATE saved to {output_path}")
+        
+        return result
+    
     # ============================================
     # SECTOR-MACRO TREATMENT EFFECTS
     # ============================================
@@ -543,17 +1126,25 @@ class TreatmentEffectEstimator:
         self,
         feature_matrix: pd.DataFrame,
         sectors: List[str] = None,
-        macro_treatments: List[str] = None
+        macro_treatments: List[str] = None,
+        method: str = 'grid',
+        inference: str = 'bootstrap'
     ) -> Dict[str, Dict[str, Any]]:
         """
         Estimate causal effects of macroeconomic changes on sector returns.
         
         This replaces hardcoded sector sensitivities with data-driven estimates.
+        With method='grid' each treatment is estimated against all sectors in
+        one shared-design regression (see estimate_ate_grid), and method='iv'
+        does the same with 2SLS (see estimate_iv_grid); any other method is
+        passed to estimate_ate cell by cell.
         
         Args:
             feature_matrix: DataFrame with sector returns and macro variables
             sectors: List of sectors to analyze
             macro_treatments: List of macro variables as treatments
+            method: 'grid' or an estimate_ate method ('auto', 'ols', 'ipw', 'dml', 'dowhy', 'iv')
+            inference: OLS inference mode ('hac', 'bootstrap', 'bayesian_bootstrap')
             
         Returns:
             Nested dict: {sector: {macro_var: effect_estimate}}
@@ -568,32 +1159,73 @@ class TreatmentEffectEstimator:
         confounders = ['SP500_Return', 'SP500_Volatility_21d']
         confounders = [c for c in confounders if c in feature_matrix.columns]
         
-        results = {}
+        outcome_cols = {
+            sector: f'{sector}_Return_1d'
+            for sector in sectors
+            if f'{sector}_Return_1d' in feature_matrix.columns
+        }
+        treatments = [t for t in macro_treatments if t in feature_matrix.columns]
         
-        for sector in sectors:
-            outcome_col = f'{sector}_Return_1d'
-            
-            if outcome_col not in feature_matrix.columns:
+        results = {sector: {} for sector in outcome_cols}
+        
+        # DML nuisance models depend on one variable each, so fit E[Y|W] once
+        # per sector and E[T|W] once per treatment instead of once per cell
+        method = self._resolve_method(method) if method != 'grid' else method
+        nuisance = None
+        if method == 'dml':
+            nuisance = NuisanceCache(
+                feature_matrix, confounders, random_state=self.random_state, n_jobs=self.n_jobs
+            )
+        
+        for treatment in treatments:
+            if method == 'grid':
+                logger.info(f"Estimating effect of {treatment} on {len(outcome_cols)} sectors")
+                effects = self.estimate_ate_grid(
+                    data=feature_matrix,
+                    treatment=treatment,
+                    outcomes=list(outcome_cols.values()),
+                    confounders=confounders,
+                    inference=inference
+                )
+                for sector, outcome_col in outcome_cols.items():
+                    results[sector][treatment] = effects[outcome_col]
                 continue
             
-            results[sector] = {}
-            
-            for treatment in macro_treatments:
-                if treatment not in feature_matrix.columns:
-                    continue
-                
-                logger.info(f"Estimating effect of {treatment} on {sector}")
-                
-                effect = self.estimate_ate(
+            if method == 'iv':
+                # One first stage per treatment, all sectors in the second stage
+                effects = self.estimate_iv_grid(
                     data=feature_matrix,
                     treatment=treatment,
-                    outcome=outcome_col,
+                    outcomes=list(outcome_cols.values()),
                     confounders=confounders,
-                    method='auto'
+                    cov_type='hac' if inference == 'hac' else 'robust'
                 )
+                for sector, outcome_col in outcome_cols.items():
+                    results[sector][treatment] = effects[outcome_col]
+                continue
+            
+            for sector, outcome_col in outcome_cols.items():
+                logger.info(f"Estimating effect of {treatment} on {sector}")
+                
+                if nuisance is not None:
+                    effect = self._estimate_ate_dml(
+                        feature_matrix, treatment, outcome_col, confounders, nuisance=nuisance
+                    )
+                else:
+                    effect = self.estimate_ate(
+                        data=feature_matrix,
+                        treatment=treatment,
+                        outcome=outcome_col,
+                        confounders=confounders,
+                        method=method,
+                        inference=inference
+                    )
                 
                 results[sector][treatment] = effect
         
+        if nuisance is not None:
+            logger.info(f"DML nuisance cache: {nuisance.n_fits} forest fits")
+        
         return results
     
     def build_sensitivity_matrix(
@@ -632,6 +1264,345 @@ class TreatmentEffectEstimator:
         return matrix.fillna(0)
 
 
+# ============================================
+# CROSS-FITTED NUISANCE MODELS
+# ============================================
+
+class NuisanceCache:
+    """
+    Cross-fitted nuisance models E[V|W] shared across a treatment/outcome grid.
+    
+    Each variable (treatment or outcome) gets one random-forest regression on
+    the controls W per fold, and its out-of-fold residuals are cached. All
+    variables use the same fold assignment, so residuals of any treatment
+    and outcome can be paired directly in a DML final stage. Over S outcomes
+    and T treatments this needs S + T cross-fits instead of S x T.
+    """
+    
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        controls: List[str],
+        n_folds: int = 5,
+        n_estimators: int = 100,
+        max_depth: int = 5,
+        n_jobs: int = -1,
+        random_state: int = 42
+    ):
+        """
+        Initialize the cache and assign folds.
+        
+        Args:
+            data: DataFrame with controls and the variables to residualize
+            controls: Variables conditioned on (confounders W)
+            n_folds: Number of cross-fitting folds
+            n_estimators: Trees per nuisance forest
+            max_depth: Maximum tree depth
+            n_jobs: Parallel jobs per forest
+            random_state: Seed for fold assignment and forests
+        """
+        from sklearn.model_selection import KFold
+        
+        self.data = data
+        self.controls = list(controls)
+        self.n_folds = n_folds
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        
+        # One fold id per row with complete controls (-1 elsewhere)
+        self._W = data[self.controls].values.astype(float)
+        complete = np.flatnonzero(np.isfinite(self._W).all(axis=1))
+        self.folds = np.full(len(data), -1)
+        splitter = KFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+        for fold, (_, test) in enumerate(splitter.split(complete)):
+            self.folds[complete[test]] = fold
+        
+        self._residuals = {}
+        self.n_fits = 0
+    
+    def residuals(self, column: str) -> np.ndarray:
+        """Out-of-fold residuals of a column (NaN where unavailable)."""
+        if column not in self._residuals:
+            self._residuals[column] = self._cross_fit(column)
+        return self._residuals[column]
+    
+    def pair(self, treatment: str, outcome: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Residuals of a treatment and an outcome on their common rows.
+        
+        Returns:
+            Tuple of (treatment residuals, outcome residuals, row positions)
+        """
+        t_res = self.residuals(treatment)
+        y_res = self.residuals(outcome)
+        rows = np.flatnonzero(np.isfinite(t_res) & np.isfinite(y_res))
+        return t_res[rows], y_res[rows], rows
+    
+    def _cross_fit(self, column: str) -> np.ndarray:
+        """Fit the nuisance forest fold by fold and return residuals."""
+        from sklearn.ensemble import RandomForestRegressor
+        
+        values = self.data[column].values.astype(float)
+        usable = (self.folds >= 0) & np.isfinite(values)
+        residuals = np.full(len(values), np.nan)
+        
+        for fold in range(self.n_folds):
+            train = usable & (self.folds != fold)
+            test = usable & (self.folds == fold)
+            if not test.any() or not train.any():
+                continue
+            
+            if self.controls:
+                model = RandomForestRegressor(
+                    n_estimators=self.n_estimators,
+                    max_depth=self.max_depth,
+                    random_state=self.random_state,
+                    n_jobs=self.n_jobs
+                )
+                model.fit(self._W[train], values[train])
+                residuals[test] = values[test] - model.predict(self._W[test])
+                self.n_fits += 1
+            else:
+                residuals[test] = values[test] - values[train].mean()
+        
+        return residuals
+
+
+# ============================================
+# OLS INFERENCE HELPERS
+# ============================================
+
+def _newey_west_cov(X: np.ndarray, resid: np.ndarray, max_lags: int) -> np.ndarray:
+    """
+    Newey-West HAC covariance of OLS coefficients.
+    
+    Bartlett-kernel long-run covariance of the scores x_t * e_t, sandwiched
+    between (X'X)^-1 (no small-sample correction, as in statsmodels).
+    
+    Args:
+        X: Design matrix (n x k), including the intercept column
+        resid: OLS residuals (n,)
+        max_lags: Bandwidth (number of autocovariance lags)
+        
+    Returns:
+        Coefficient covariance matrix (k x k)
+    """
+    n = X.shape[0]
+    scores = X * resid[:, None]
+    meat = scores.T @ scores
+    
+    for lag in range(1, min(max_lags, n - 1) + 1):
+        weight = 1.0 - lag / (max_lags + 1.0)
+        gamma = scores[lag:].T @ scores[:-lag]
+        meat += weight * (gamma + gamma.T)
+    
+    bread = np.linalg.inv(X.T @ X)
+    return bread @ meat @ bread
+
+
+def _bootstrap_weight_chunks(
+    rng: np.random.Generator,
+    n: int,
+    n_bootstrap: int,
+    scheme: str = 'multinomial',
+    max_cells: int = 2_000_000
+):
+    """
+    Yield (chunk x n) observation-weight matrices for bootstrap replicates.
+    
+    Schemes:
+    - 'multinomial': resample counts, equivalent to drawing n indices with
+      replacement
+    - 'bayesian': Dirichlet weights scaled to sum to n
+    - 'poisson': independent Poisson(1) counts (Poisson bootstrap)
+    
+    Chunks are sized to keep at most max_cells weights in memory.
+    """
+    chunk_size = max(1, min(n_bootstrap, max_cells // max(n, 1)))
+    
+    for start in range(0, n_bootstrap, chunk_size):
+        size = min(chunk_size, n_bootstrap - start)
+        if scheme == 'bayesian':
+            weights = rng.exponential(size=(size, n))
+            weights *= n / weights.sum(axis=1, keepdims=True)
+        elif scheme == 'poisson':
+            weights = rng.poisson(1.0, size=(size, n)).astype(float)
+        elif scheme == 'multinomial':
+            idx = rng.integers(0, n, size=(size, n)) + n * np.arange(size)[:, None]
+            weights = np.bincount(idx.ravel(), minlength=size * n).reshape(size, n).astype(float)
+        else:
+            raise ValueError(f"Unknown bootstrap scheme: {scheme}")
+        yield weights
+
+
+def _weighted_ols_coefficients(
+    X: np.ndarray,
+    Y: np.ndarray,
+    weights: np.ndarray
+) -> np.ndarray:
+    """
+    Solve many weighted least-squares problems at once.
+    
+    Stacks the normal equations X'WX b = X'Wy for every weight row and solves
+    them in one batched call. Degenerate replicates come back as NaN.
+    
+    Args:
+        X: Design matrix (n x k)
+        Y: Outcome (n,) or outcomes (n x m)
+        weights: Observation weights (B x n)
+        
+    Returns:
+        Coefficients (B x k), or (B x k x m) for multiple outcomes
+    """
+    XtWX = np.einsum('bn,ni,nj->bij', weights, X, X, optimize=True)
+    XtWY = np.einsum('bn,ni,n...->bi...', weights, X, Y, optimize=True)
+    
+    squeeze = XtWY.ndim == 2
+    if squeeze:
+        XtWY = XtWY[..., None]
+    
+    coefs = np.full(XtWY.shape, np.nan)
+    well_posed = np.linalg.cond(XtWX) < 1e12
+    if well_posed.any():
+        coefs[well_posed] = np.linalg.solve(XtWX[well_posed], XtWY[well_posed])
+    
+    return coefs[..., 0] if squeeze else coefs
+
+
+# ============================================
+# ASYNC REFUTATION JOBS
+# ============================================
+
+# DoWhy refuter name and extra arguments. A test passes when the refuter's
+# significance test does not reject (placebo effect consistent with zero,
+# other refuters consistent with the original estimate).
+REFUTERS = {
+    'placebo_treatment': ('placebo_treatment_refuter', {'placebo_type': 'permute'}),
+    'random_common_cause': ('random_common_cause', {}),
+    'data_subset': ('data_subset_refuter', {'subset_fraction': 0.8}),
+}
+
+MAX_REFUTATION_JOBS = 500
+
+_refutation_executor = None
+_refutation_jobs = {}
+_refutation_lock = threading.Lock()
+
+
+def _get_refutation_executor() -> ThreadPoolExecutor:
+    """Get or create the refutation worker pool."""
+    global _refutation_executor
+    with _refutation_lock:
+        if _refutation_executor is None:
+            _refutation_executor = ThreadPoolExecutor(
+                max_workers=int(os.environ.get('REFUTATION_WORKERS', 2)),
+                thread_name_prefix='refutation'
+            )
+    return _refutation_executor
+
+
+def submit_refutation_job(
+    model,
+    identified_estimand,
+    estimate,
+    treatment: str = None,
+    outcome: str = None,
+    refuters: Optional[List[str]] = None,
+    num_simulations: int = 100
+) -> str:
+    """
+    Queue DoWhy refutation tests for an estimate.
+    
+    Args:
+        model: Fitted dowhy.CausalModel
+        identified_estimand: Estimand the estimate was computed for
+        estimate: dowhy CausalEstimate to refute
+        treatment: Treatment name (for reporting)
+        outcome: Outcome name (for reporting)
+        refuters: Keys of REFUTERS to run (default: all)
+        num_simulations: Simulations per refuter
+        
+    Returns:
+        Refutation job ID
+    """
+    refuters = list(refuters or REFUTERS.keys())
+    unknown = [r for r in refuters if r not in REFUTERS]
+    if unknown:
+        raise ValueError(f"Unknown refuters: {unknown}")
+    
+    job_id = str(uuid.uuid4())[:8]
+    job = {
+        'job_id': job_id,
+        'status': 'pending',
+        'treatment': treatment,
+        'outcome': outcome,
+        'estimated_effect': float(estimate.value),
+        'refuters': refuters,
+        'num_simulations': num_simulations,
+        'refutation_tests': [],
+        'submitted_at': datetime.now().isoformat(),
+        'completed_at': None,
+    }
+    
+    with _refutation_lock:
+        _refutation_jobs[job_id] = job
+        # Drop the oldest finished jobs beyond the retention limit
+        if len(_refutation_jobs) > MAX_REFUTATION_JOBS:
+            finished = [k for k, v in _refutation_jobs.items() if v['status'] in ('completed', 'failed')]
+            for old_id in finished[:len(_refutation_jobs) - MAX_REFUTATION_JOBS]:
+                del _refutation_jobs[old_id]
+    
+    _get_refutation_executor().submit(
+        _run_refutation_job, job, model, identified_estimand, estimate
+    )
+    return job_id
+
+
+def get_refutation_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Get the status and results of a refutation job, or None if unknown."""
+    with _refutation_lock:
+        job = _refutation_jobs.get(job_id)
+        return dict(job, refutation_tests=list(job['refutation_tests'])) if job else None
+
+
+def _run_refutation_job(job: Dict[str, Any], model, identified_estimand, estimate):
+    """Run each requested refuter, recording failures per test."""
+    job['status'] = 'running'
+    
+    for name in job['refuters']:
+        method_name, kwargs = REFUTERS[name]
+        try:
+            refutation = model.refute_estimate(
+                identified_estimand,
+                estimate,
+                method_name=method_name,
+                num_simulations=job['num_simulations'],
+                **kwargs
+            )
+            significance = refutation.refutation_result or {}
+            is_significant = significance.get('is_statistically_significant')
+            new_effect = refutation.new_effect
+            test = {
+                'test': name,
+                'new_effect': float(np.mean(new_effect)) if new_effect is not None else None,
+                'p_value': float(significance['p_value']) if significance.get('p_value') is not None else None,
+                'passed': bool(not is_significant) if is_significant is not None else None,
+            }
+        except Exception as e:
+            logger.error(f"Refuter {name} failed for job {job['job_id']}: {e}")
+            test = {'test': name, 'error': str(e), 'passed': None}
+        
+        with _refutation_lock:
+            job['refutation_tests'].append(test)
+    
+    with _refutation_lock:
+        failed = all('error' in t for t in job['refutation_tests'])
+        job['status'] = 'failed' if failed else 'completed'
+        job['completed_at'] = datetime.now().isoformat()
+
+
 # ============================================
 # SENSITIVITY ANALYSIS
 # ============================================
@@ -641,7 +1612,12 @@ def sensitivity_analysis(
     treatment: str,
     outcome: str,
     confounders: List[str],
-    unmeasured_confounder_strength: List[float] = [0.1, 0.2, 0.3, 0.5]
+    unmeasured_confounder_strength: List[float] = [0.1, 0.2, 0.3, 0.5],
+    grid_size: int = 101,
+    max_r2: float = 0.5,
+    benchmark_multipliers: List[float] = [1.0, 2.0, 3.0],
+    q: float = 1.0,
+    alpha: float = 0.05
 ) -> Dict[str, Any]:
     """
     Perform sensitivity analysis for unmeasured confounding.
@@ -649,62 +1625,353 @@ def sensitivity_analysis(
     Estimates how strong an unmeasured confounder would need to be
     to explain away the observed treatment effect.
     
+    Uses the omitted-variable-bias bounds in terms of partial R² (Cinelli &
+    Hazlett, 2020). A confounder Z explaining R²_{D~Z|X} of the residual
+    treatment variance and R²_{Y~Z|D,X} of the residual outcome variance
+    biases the OLS estimate by at most
+    
+        se * sqrt(df) * sqrt(R²_{Y~Z|D,X} * R²_{D~Z|X} / (1 - R²_{D~Z|X}))
+    
+    so every point of the sensitivity surface follows in closed form from one
+    regression's estimate, standard error and degrees of freedom.
+    
     Args:
         data: DataFrame with variables
         treatment: Treatment variable
         outcome: Outcome variable
         confounders: Measured confounders
-        unmeasured_confounder_strength: List of confounder strengths to simulate
+        unmeasured_confounder_strength: Partial R² values (with both treatment
+            and outcome) reported in sensitivity_results
+        grid_size: Points per axis of the contour grid
+        max_r2: Largest partial R² on the contour grid axes
+        benchmark_multipliers: Confounder strengths as multiples of each
+            observed confounder, for the benchmark bounds
+        q: Fraction of the effect to be explained away by the robustness value
+        alpha: Significance level for the robustness value of the t-test
         
     Returns:
         Dictionary with sensitivity analysis results
     """
-    estimator = TreatmentEffectEstimator()
+    try:
+        analysis_data = data[[treatment, outcome] + confounders].dropna()
+        
+        Y = analysis_data[outcome].values.astype(float)
+        D = analysis_data[treatment].values.astype(float)
+        W = analysis_data[confounders].values.astype(float)
+        X = np.column_stack([D, W, np.ones(len(D))])
+        n, k = X.shape
+        df = n - k
+        
+        # Baseline regression and its t-statistics
+        beta, _, _, _ = np.linalg.lstsq(X, Y, rcond=None)
+        resid = Y - X @ beta
+        sigma2 = resid @ resid / df
+        se = np.sqrt(sigma2 * np.diag(np.linalg.pinv(X.T @ X)))
+        t_values = beta / se
+        
+        baseline_ate = float(beta[0])
+        baseline_se = float(se[0])
+        t_stat = t_values[0]
+        
+        # Partial R² of treatment with outcome and robustness values
+        partial_r2_dy = t_stat ** 2 / (t_stat ** 2 + df)
+        f_q = q * abs(t_stat) / np.sqrt(df)
+        robustness_value = _robustness_value(f_q)
+        t_crit = stats.t.ppf(1 - alpha / 2, df=df - 1)
+        robustness_value_alpha = _robustness_value(max(f_q - t_crit / np.sqrt(df - 1), 0.0))
+        
+        # Contour grid over (R²_{D~Z|X}, R²_{Y~Z|D,X})
+        r2_grid = np.linspace(0.0, max_r2, grid_size)
+        r2_d, r2_y = np.meshgrid(r2_grid, r2_grid, indexing='ij')
+        adj_estimate, adj_se = _ovb_adjust(baseline_ate, baseline_se, df, r2_d, r2_y)
+        adj_t = adj_estimate / adj_se
+        
+        # Reported strengths (same partial R² with treatment and outcome)
+        strengths = np.asarray(unmeasured_confounder_strength, dtype=float)
+        strength_estimates, _ = _ovb_adjust(baseline_ate, baseline_se, df, strengths, strengths)
+        sensitivity_results = [
+            {
+                'confounder_strength': float(strength),
+                'adjusted_ate': float(adjusted),
+                'bias': float(baseline_ate - adjusted),
+                'percent_change': float((adjusted - baseline_ate) / baseline_ate * 100) if baseline_ate != 0 else 0
+            }
+            for strength, adjusted in zip(strengths, strength_estimates)
+        ]
+        
+        # Benchmark bounds: confounders k times as strong as an observed one
+        benchmarks = []
+        if confounders:
+            # Partial R² of each confounder with the treatment, given the others
+            Wc = np.column_stack([W, np.ones(len(D))])
+            gamma, _, _, _ = np.linalg.lstsq(Wc, D, rcond=None)
+            resid_d = D - Wc @ gamma
+            df_d = len(D) - Wc.shape[1]
+            se_d = np.sqrt(resid_d @ resid_d / df_d * np.diag(np.linalg.pinv(Wc.T @ Wc)))
+            t_d = (gamma / se_d)[:len(confounders)]
+            r2_dx = t_d ** 2 / (t_d ** 2 + df_d)
+            
+            # Partial R² of each confounder with the outcome, given treatment and the others
+            t_y = t_values[1:1 + len(confounders)]
+            r2_yx = t_y ** 2 / (t_y ** 2 + df)
+            
+            for name, r2dxj, r2yxj in zip(confounders, r2_dx, r2_yx):
+                for kd in benchmark_multipliers:
+                    ky = kd
+                    r2dz = kd * r2dxj / (1 - r2dxj)
+                    r2zxj = kd * r2dxj ** 2 / ((1 - kd * r2dxj) * (1 - r2dxj))
+                    if r2dz >= 1 or r2zxj >= 1:
+                        continue
+                    r2yz = ((np.sqrt(ky) + np.sqrt(r2zxj)) / np.sqrt(1 - r2zxj)) ** 2 * r2yxj / (1 - r2yxj)
+                    if r2yz >= 1:
+                        continue
+                    bench_estimate, bench_se = _ovb_adjust(baseline_ate, baseline_se, df, r2dz, r2yz)
+                    benchmarks.append({
+                        'benchmark': name,
+                        'multiplier': float(kd),
+                        'r2_treatment': float(r2dz),
+                        'r2_outcome': float(r2yz),
+                        'adjusted_ate': float(bench_estimate),
+                        'adjusted_t': float(bench_estimate / bench_se),
+                    })
+        
+        return {
+            'baseline_ate': baseline_ate,
+            'baseline_standard_error': baseline_se,
+            'baseline_t': float(t_stat),
+            'degrees_of_freedom': int(df),
+            'partial_r2_treatment_outcome': float(partial_r2_dy),
+            'robustness_value': float(robustness_value),
+            'robustness_value_alpha': float(robustness_value_alpha),
+            'sensitivity_results': sensitivity_results,
+            'contour': {
+                'r2_treatment': r2_grid.tolist(),
+                'r2_outcome': r2_grid.tolist(),
+                'adjusted_ate': adj_estimate.tolist(),
+                'adjusted_t': adj_t.tolist(),
+                't_critical': float(t_crit),
+            },
+            'benchmarks': benchmarks,
+            'treatment': treatment,
+            'outcome': outcome,
+        }
+        
+    except Exception as e:
+        logger.error(f"Sensitivity analysis failed: {e}")
+        return {'error': str(e), 'treatment': treatment, 'outcome': outcome}
+
+
+def _robustness_value(f: float) -> float:
+    """Robustness value for a partial Cohen's f: 0.5 * (sqrt(f^4 + 4f^2) - f^2)."""
+    return 0.5 * (np.sqrt(f ** 4 + 4 * f ** 2) - f ** 2)
+
+
+def _ovb_adjust(
+    estimate: float,
+    std_error: float,
+    df: int,
+    r2_d: Union[float, np.ndarray],
+    r2_y: Union[float, np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bias-adjusted estimate and standard error for confounder strengths.
     
-    # Get baseline estimate
-    baseline = estimator.estimate_ate(data, treatment, outcome, confounders, method='ols')
-    baseline_ate = baseline.get('ate', 0)
+    The bias is taken to reduce the magnitude of the estimate. Works
+    elementwise on arrays of partial R² values.
     
-    # Simulate unmeasured confounder
-    sensitivity_results = []
+    Returns:
+        Tuple of (adjusted estimate, adjusted standard error)
+    """
+    r2_d = np.minimum(np.asarray(r2_d, dtype=float), 1 - 1e-12)
+    r2_y = np.asarray(r2_y, dtype=float)
     
-    for strength in unmeasured_confounder_strength:
-        # Create synthetic confounder that correlates with both T and Y
-        analysis_data = data[[treatment, outcome] + confounders].dropna()
+    bias = std_error * np.sqrt(df * r2_y * r2_d / (1 - r2_d))
+    adjusted = np.sign(estimate) * (abs(estimate) - bias)
+    adjusted_se = std_error * np.sqrt((1 - r2_y) / (1 - r2_d) * df / (df - 1))
+    return adjusted, adjusted_se
+
+
+def load_rolling_ate(filepath: str) -> Dict[str, Any]:
+    """
+    Load rolling ATE series saved by estimate_rolling_ate.
+    
+    Args:
+        filepath: Path to the .npz file
+    
+    Returns:
+        Dictionary with the same keys as estimate_rolling_ate
+    """
+    with np.load(filepath) as stored:
+        window = int(stored['window']) or None
+        return {
+            'method': 'rolling_ols' if window else 'recursive_ols',
+            'treatments': stored['treatments'].tolist(),
+            'outcomes': stored['outcomes'].tolist(),
+            'confounders': stored['confounders'].tolist(),
+            'dates': stored['dates'],
+            'ate': stored['ate'],
+            'standard_error': stored['standard_error'],
+            'sample_size': stored['sample_size'],
+            'window': window,
+        }
+
+
+# ============================================
+# CATE SURFACES
+# ============================================
+
+CATE_SURFACE_FIELDS = ('effect', 'ci_lower', 'ci_upper')
+
+
+class CATESurface:
+    """
+    Precomputed CATEs on a modifier grid, queried by multilinear interpolation.
+    
+    values has shape (fields, treatments, outcomes, *grid), one grid axis per
+    effect modifier. Queries outside the grid are clamped to its edges.
+    """
+    
+    def __init__(
+        self,
+        treatments: List[str],
+        outcomes: List[str],
+        modifiers: List[str],
+        axes: List[np.ndarray],
+        values: np.ndarray,
+        alpha: float = 0.05,
+        method: str = 'causal_forest'
+    ):
+        self.treatments = list(treatments)
+        self.outcomes = list(outcomes)
+        self.modifiers = list(modifiers)
+        self.axes = [np.asarray(a, dtype=float) for a in axes]
+        self.values = values
+        self.alpha = alpha
+        self.method = method
         
-        T = analysis_data[treatment].values
-        Y = analysis_data[outcome].values
+        self._treatment_index = {t: i for i, t in enumerate(self.treatments)}
+        self._outcome_index = {o: j for j, o in enumerate(self.outcomes)}
+        self._axis_lists = [a.tolist() for a in self.axes]
+    
+    def query(
+        self,
+        treatment: str,
+        outcome: str,
+        modifiers: Dict[str, float]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Interpolated effect and interval at a point in modifier space.
         
-        # Synthetic confounder correlated with T and Y
-        U = strength * (T - T.mean()) / T.std() + strength * (Y - Y.mean()) / Y.std() + np.random.randn(len(T)) * (1 - strength)
+        Args:
+            treatment: Treatment column
+            outcome: Outcome column
+            modifiers: Modifier values; missing modifiers use the grid midpoint
         
-        # Add to confounders and re-estimate
-        analysis_data_with_U = analysis_data.copy()
-        analysis_data_with_U['synthetic_confounder'] = U
+        Returns:
+            Dict with effect, ci_lower, ci_upper, the point used and whether it
+            was clamped to the grid, or None for an unknown pair
+        """
+        i = self._treatment_index.get(treatment)
+        j = self._outcome_index.get(outcome)
+        if i is None or j is None:
+            return None
         
-        adjusted = estimator.estimate_ate(
-            analysis_data_with_U,
-            treatment,
-            outcome,
-            confounders + ['synthetic_confounder'],
-            method='ols'
-        )
+        cell = self.values[:, i, j]
+        corners, point, clamped = [], {}, False
+        for name, axis in zip(self.modifiers, self._axis_lists):
+            x = float(modifiers.get(name, axis[len(axis) // 2]))
+            if x < axis[0] or x > axis[-1]:
+                clamped = True
+                x = min(max(x, axis[0]), axis[-1])
+            point[name] = x
+            
+            lo = min(max(bisect.bisect_left(axis, x) - 1, 0), max(len(axis) - 2, 0))
+            hi = min(lo + 1, len(axis) - 1)
+            frac = (x - axis[lo]) / (axis[hi] - axis[lo]) if hi > lo else 0.0
+            corners.append(((lo, 1.0 - frac), (hi, frac)))
         
-        adjusted_ate = adjusted.get('ate', 0)
+        # Weighted sum over the 2^d surrounding grid nodes
+        block = np.zeros(len(CATE_SURFACE_FIELDS))
+        for corner in itertools.product(*corners):
+            weight = 1.0
+            for _, w in corner:
+                weight *= w
+            if weight:
+                block += weight * cell[(slice(None),) + tuple(idx for idx, _ in corner)]
         
-        sensitivity_results.append({
-            'confounder_strength': strength,
-            'adjusted_ate': adjusted_ate,
-            'bias': baseline_ate - adjusted_ate,
-            'percent_change': ((adjusted_ate - baseline_ate) / baseline_ate * 100) if baseline_ate != 0 else 0
-        })
+        result = dict(zip(CATE_SURFACE_FIELDS, block.astype(float).tolist()))
+        result.update({'modifiers': point, 'clamped': clamped})
+        return result
     
-    return {
-        'baseline_ate': baseline_ate,
-        'sensitivity_results': sensitivity_results,
-        'treatment': treatment,
-        'outcome': outcome,
-    }
+    def save(self, filepath: str):
+        """Save the surface as a compressed npz archive."""
+        np.savez_compressed(
+            filepath,
+            treatments=np.array(self.treatments, dtype=str),
+            outcomes=np.array(self.outcomes, dtype=str),
+            modifiers=np.array(self.modifiers, dtype=str),
+            values=self.values,
+            meta=np.array([self.method, str(self.alpha)], dtype=str),
+            **{f'axis_{k}': axis for k, axis in enumerate(self.axes)}
+        )
+    
+    @classmethod
+    def load(cls, filepath: str) -> 'CATESurface':
+        """Load a surface saved with save()."""
+        with np.load(filepath) as archive:
+            modifiers = archive['modifiers'].tolist()
+            method, alpha = archive['meta'].tolist()
+            return cls(
+                treatments=archive['treatments'].tolist(),
+                outcomes=archive['outcomes'].tolist(),
+                modifiers=modifiers,
+                axes=[archive[f'axis_{k}'] for k in range(len(modifiers))],
+                values=archive['values'],
+                alpha=float(alpha),
+                method=method
+            )
+
+
+def _linear_cate_on_grid(
+    data: pd.DataFrame,
+    treatment: str,
+    outcome: str,
+    confounders: List[str],
+    effect_modifiers: List[str],
+    grid: np.ndarray,
+    alpha: float = 0.05
+) -> np.ndarray:
+    """
+    CATE on grid points from a treatment x modifier interaction regression.
+    
+    Fits Y = T * (a + b'M) + c'W + d'M + e and returns a + b'm with HC1
+    intervals for each grid row m.
+    
+    Returns:
+        Array (3, n_points) of effect, lower and upper bound
+    """
+    columns = list(dict.fromkeys([treatment, outcome] + confounders + effect_modifiers))
+    clean = data[columns].dropna()
+    t = clean[treatment].values.astype(float)
+    M = clean[effect_modifiers].values.astype(float)
+    controls = [c for c in dict.fromkeys(confounders + effect_modifiers) if c != treatment]
+    
+    X = np.column_stack([t, t[:, None] * M, clean[controls].values.astype(float), np.ones(len(t))])
+    y = clean[outcome].values.astype(float)
+    n, k = X.shape
+    
+    beta, _, _, _ = np.linalg.lstsq(X, y, rcond=None)
+    bread = np.linalg.pinv(X.T @ X)
+    scores = X * (y - X @ beta)[:, None]
+    cov = bread @ (scores.T @ scores) @ bread * n / (n - k)
+    
+    # Effect at m is L @ beta with L = [1, m, 0...]
+    m = len(effect_modifiers) + 1
+    L = np.column_stack([np.ones(len(grid)), grid])
+    effect = L @ beta[:m]
+    std_error = np.sqrt(np.einsum('ij,jk,ik->i', L, cov[:m, :m], L))
+    z_crit = stats.norm.ppf(1 - alpha / 2)
+    return np.stack([effect, effect - z_crit * std_error, effect + z_crit * std_error])
 
 
 # Singleton instance
@@ -0,0 +1,70 @@
+"""causal relationships: model version, data hash and lookup indexes
+
+Revision ID: 3f1c2a9d7b40
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+Databases created before these columns existed keep the old table, since
+db.create_all() never alters an existing table. Fresh databases already get
+everything from create_all(), so each step checks what is present first.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b40'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+TABLE = 'causal_relationships'
+
+COLUMNS = [
+    ('model_version', sa.String(length=20)),
+    ('data_hash', sa.String(length=32)),
+]
+
+INDEXES = [
+    ('ix_causal_relationships_model_version', ['model_version']),
+    ('ix_causal_relationships_data_hash', ['data_hash']),
+    ('ix_causal_relationships_discovery_method', ['discovery_method']),
+    ('ix_causal_rel_version_effect', ['model_version', 'effect_variable']),
+    ('ix_causal_rel_version_cause', ['model_version', 'cause_variable']),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return
+
+    columns = {column['name'] for column in inspector.get_columns(TABLE)}
+    with op.batch_alter_table(TABLE) as batch_op:
+        for name, type_ in COLUMNS:
+            if name not in columns:
+                batch_op.add_column(sa.Column(name, type_, nullable=True))
+
+    indexes = {index['name'] for index in inspector.get_indexes(TABLE)}
+    for name, index_columns in INDEXES:
+        if name not in indexes:
+            op.create_index(name, TABLE, index_columns, unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return
+
+    indexes = {index['name'] for index in inspector.get_indexes(TABLE)}
+    for name, _ in reversed(INDEXES):
+        if name in indexes:
+            op.drop_index(name, table_name=TABLE)
+
+    columns = {column['name'] for column in inspector.get_columns(TABLE)}
+    with op.batch_alter_table(TABLE) as batch_op:
+        for name, _ in reversed(COLUMNS):
+            if name in columns:
+                batch_op.drop_column(name)
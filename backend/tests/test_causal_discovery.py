@@ -0,0 +1,190 @@
+"""
+Tests for the causal discovery engine.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.causal_discovery import CausalDiscoveryEngine
+
+
+# ============================================
+# FIXTURES
+# ============================================
+
+@pytest.fixture
+def engine():
+    return CausalDiscoveryEngine(significance_level=0.05)
+
+
+@pytest.fixture
+def lagged_data():
+    """Three series where x drives y at lag 1 and z is independent noise."""
+    rng = np.random.default_rng(0)
+    n = 400
+    x = rng.normal(size=n)
+    z = rng.normal(size=n)
+    y = np.empty(n)
+    y[0] = rng.normal()
+    y[1:] = 0.8 * x[:-1] + 0.3 * rng.normal(size=n - 1)
+    return pd.DataFrame({'x': x, 'y': y, 'z': z})
+
+
+# ============================================
+# CONSENSUS DAG
+# ============================================
+
+def test_dag_edge_without_p_values_has_no_nan(engine):
+    relationships = [
+        {'cause': 'a', 'effect': 'b', 'method': 'pc_algorithm', 'is_causal': True},
+        {'cause': 'b', 'effect': 'c', 'method': 'continuous_optimization',
+         'weight': -0.4, 'is_causal': True},
+        {'cause': 'a', 'effect': 'c', 'method': 'granger', 'p_value': 0.01, 'is_causal': True},
+    ]
+    
+    dag = engine.build_causal_dag(relationships)
+    edges = {(e['from'], e['to']): e for e in dag['edges']}
+    
+    assert edges[('a', 'b')]['avg_p_value'] is None
+    assert edges[('a', 'b')]['strength'] is None
+    assert edges[('b', 'c')]['avg_p_value'] is None
+    assert edges[('b', 'c')]['strength'] == pytest.approx(0.4)
+    assert edges[('a', 'c')]['strength'] == pytest.approx(0.99)
+    # Strict JSON rejects NaN, which is what the API serializes to
+    json.dumps(dag, allow_nan=False)
+
+
+# ============================================
+# ROLLING GRANGER CAUSALITY
+# ============================================
+
+def test_rolling_granger_matches_direct_refit(engine, lagged_data):
+    from statsmodels.tsa.stattools import grangercausalitytests
+    
+    window, step = 120, 7
+    result = engine.rolling_granger_causality(
+        lagged_data, window=window, max_lag=1, step=step, refresh_every=5
+    )
+    variables = result['variables']
+    X = lagged_data[variables]
+    
+    # Windows both before and after exact refreshes of the running sums
+    for w in (0, 3, 4, 5, 11, len(result['dates']) - 1):
+        start = w * step
+        chunk = X.iloc[start:start + window + 1]
+        for i, cause in enumerate(variables):
+            for j, effect in enumerate(variables):
+                if i == j:
+                    continue
+                test = grangercausalitytests(chunk[[effect, cause]], maxlag=1)
+                f_stat, p_value = test[1][0]['ssr_ftest'][:2]
+                assert result['f_statistics'][w, i, j] == pytest.approx(f_stat, rel=1e-4)
+                assert result['p_values'][w, i, j] == pytest.approx(p_value, rel=1e-4, abs=1e-7)
+        assert result['dates'][w] == str(chunk.index[-1])
+
+
+def test_rolling_granger_running_sums_match_exact_recompute(engine, lagged_data):
+    incremental = engine.rolling_granger_causality(
+        lagged_data, window=100, max_lag=3, step=2, refresh_every=1000
+    )
+    exact = engine.rolling_granger_causality(
+        lagged_data, window=100, max_lag=3, step=2, refresh_every=1
+    )
+    
+    np.testing.assert_allclose(incremental['p_values'], exact['p_values'], rtol=1e-4, atol=1e-7)
+    np.testing.assert_array_equal(incremental['optimal_lags'], exact['optimal_lags'])
+
+
+# ============================================
+# CANDIDATE SCREENING
+# ============================================
+
+def test_screening_report_reset_between_calls(engine, lagged_data):
+    engine.discover_all_relationships(lagged_data, methods=['granger'], screen=True)
+    assert engine.last_screening_report is not None
+    
+    engine.discover_all_relationships(lagged_data, methods=['granger'], screen=False)
+    assert engine.last_screening_report is None
+
+
+# ============================================
+# STABILITY SELECTION
+# ============================================
+
+def test_stability_selection_keeps_lag_one_edge(engine, lagged_data):
+    result = engine.stability_selection(
+        lagged_data, methods=['granger'], n_bootstrap=60, batch_size=20,
+        min_bootstrap=60, max_lag=2, n_jobs=1, random_state=7
+    )
+    frequency = result['frequency']
+    
+    assert result['n_resamples'] == 60
+    assert frequency.loc['x', 'y'] >= 0.95
+    # Noise edges stay below the selection threshold
+    assert {(e['from'], e['to']) for e in result['edges']} == {('x', 'y')}
+
+
+# ============================================
+# CONTINUOUS STRUCTURE LEARNING
+# ============================================
+
+@pytest.fixture
+def chain_data():
+    """Strongly coupled chain a -> b -> c -> d, where line searches leave the log-det domain."""
+    rng = np.random.default_rng(0)
+    n = 500
+    X = np.zeros((n, 4))
+    X[:, 0] = rng.normal(size=n)
+    for j in range(1, 4):
+        X[:, j] = 2.0 * X[:, j - 1] + 0.3 * rng.normal(size=n)
+    return pd.DataFrame(X, columns=list('abcd'))
+
+
+def test_structure_learning_rejects_steps_outside_domain(engine, chain_data, monkeypatch):
+    import scipy.optimize
+    
+    minimize = scipy.optimize.minimize
+    objectives = []
+    
+    def recording_minimize(fun, x0, **kwargs):
+        objectives.append(fun)
+        return minimize(fun, x0, **kwargs)
+    
+    monkeypatch.setattr(scipy.optimize, 'minimize', recording_minimize)
+    result = engine.continuous_structure_learning(chain_data)
+    
+    # w_ab = w_ba = 1 makes I - W * W singular
+    d = 4
+    w = np.zeros(2 * d * d)
+    w[1] = w[d] = 1.0
+    value, grad = objectives[0](w)
+    assert value == np.inf
+    assert not grad.any()
+    
+    assert result['edges']
+    for entry in result['lambda_path']:
+        assert entry['converged']
+        assert np.isfinite(entry['acyclicity']) and entry['acyclicity'] > -1e-8
+    W = result['adjacency'].values
+    sign, _ = np.linalg.slogdet(np.eye(d) - W * W)
+    assert sign > 0
+
+
+def test_structure_learning_reports_unconverged_solves(engine, chain_data, monkeypatch, caplog):
+    import scipy.optimize
+    
+    minimize = scipy.optimize.minimize
+    
+    def one_iteration(fun, x0, **kwargs):
+        kwargs['options'] = {**kwargs.get('options', {}), 'maxiter': 1}
+        return minimize(fun, x0, **kwargs)
+    
+    monkeypatch.setattr(scipy.optimize, 'minimize', one_iteration)
+    with caplog.at_level('WARNING', logger='app.services.causal_discovery'):
+        result = engine.continuous_structure_learning(chain_data, lambdas=(0.1,))
+    
+    assert [entry['converged'] for entry in result['lambda_path']] == [False]
+    assert 'did not converge' in caplog.text
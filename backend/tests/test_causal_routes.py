@@ -0,0 +1,76 @@
+"""
+Tests for the /api/causal endpoints.
+"""
+
+import pytest
+
+
+# ============================================
+# FIXTURES
+# ============================================
+
+@pytest.fixture
+def app():
+    from app import create_app
+    return create_app('testing')
+
+
+@pytest.fixture
+def client(app):
+    from flask_jwt_extended import create_access_token
+    
+    with app.app_context():
+        token = create_access_token(identity='1')
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return client
+
+
+@pytest.fixture
+def estimate_calls(monkeypatch):
+    import app.services.causal_service as cs
+    
+    calls = []
+    
+    def estimate(treatment, outcome, dag_structure=None, refute=False, num_simulations=100):
+        calls.append({'refute': refute, 'num_simulations': num_simulations})
+        return {'treatment': treatment, 'outcome': outcome, 'ate': 0.0}
+    
+    monkeypatch.setattr(cs, 'estimate_causal_effect', estimate)
+    return calls
+
+
+# ============================================
+# EFFECT ESTIMATION
+# ============================================
+
+@pytest.mark.parametrize('extra, refute, num_simulations', [
+    ({}, False, 100),
+    ({'refute': 'false', 'num_simulations': '50'}, False, 50),
+    ({'refute': 'true'}, True, 100),
+    ({'refute': True, 'num_simulations': 10 ** 7}, True, 1000),
+    ({'refute': 1, 'num_simulations': 0}, True, 1),
+])
+def test_estimate_effects_parses_refutation_options(client, estimate_calls, extra, refute, num_simulations):
+    response = client.post('/api/causal/estimate-effects', json={
+        'treatment': 'interest_rates', 'outcome': 'technology', **extra
+    })
+    
+    assert response.status_code == 200
+    assert estimate_calls == [{'refute': refute, 'num_simulations': num_simulations}]
+
+
+@pytest.mark.parametrize('extra', [
+    {'refute': 'maybe'},
+    {'refute': 2},
+    {'refute': None},
+    {'num_simulations': 'many'},
+    {'num_simulations': [10]},
+])
+def test_estimate_effects_rejects_bad_refutation_options(client, estimate_calls, extra):
+    response = client.post('/api/causal/estimate-effects', json={
+        'treatment': 'interest_rates', 'outcome': 'technology', **extra
+    })
+    
+    assert response.status_code == 400
+    assert estimate_calls == []
@@ -0,0 +1,119 @@
+"""
+Tests for the causal service's precomputed effect table.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import app.services.causal_service as cs
+
+
+# ============================================
+# FIXTURES
+# ============================================
+
+@pytest.fixture
+def effect_table_env(tmp_path, monkeypatch):
+    """Empty models directory, active version 'v1' and a controllable clock."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cs, 'MODELS_DIR', str(tmp_path))
+    monkeypatch.setattr(cs, 'FEATURE_MATRIX_PATH', str(tmp_path / 'missing.parquet'))
+    monkeypatch.setattr(cs, '_active_effect_version', lambda: 'v1')
+    monkeypatch.setattr(cs, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    cs.invalidate_effect_table()
+    yield clock
+    cs.invalidate_effect_table()
+
+
+def _table(version='v1'):
+    factors = ['interest_rates', 'vix']
+    sectors = ['technology', 'energy']
+    values = np.arange(len(cs.EFFECT_TABLE_FIELDS) * 4, dtype=float).reshape(-1, 2, 2)
+    values[:, 1, 1] = np.nan
+    columns = {
+        'interest_rates': 'Fed_Funds_Rate_Change',
+        'vix': 'VIX_Change',
+        'technology': 'Technology_Return_1d',
+        'energy': 'Energy_Return_1d',
+    }
+    return cs.EffectTable(factors, sectors, values, columns, version, 'abc123', '2026-01-02T00:00:00')
+
+
+# ============================================
+# LOOKUP AND PERSISTENCE
+# ============================================
+
+def test_effect_table_lookup_accepts_aliases_and_column_names():
+    table = _table()
+    expected = dict(zip(cs.EFFECT_TABLE_FIELDS, table.values[:, 0, 0].tolist()))
+    
+    assert table.lookup('interest_rates', 'technology') == expected
+    assert table.lookup('interest_rates', 'tech') == expected
+    assert table.lookup('Interest Rates', 'Technology') == expected
+    assert table.lookup('Fed_Funds_Rate_Change', 'Technology_Return_1d') == expected
+    assert table.lookup('vix', 'energy') is None  # not estimated
+    assert table.lookup('oil_price', 'technology') is None
+    assert table.lookup('interest_rates', 'utilities') is None
+
+
+def test_effect_table_save_load_round_trip(tmp_path):
+    table = _table()
+    path = str(tmp_path / 'effect_table_v1.npz')
+    table.save(path)
+    
+    loaded = cs.EffectTable.load(path)
+    
+    assert loaded.factors == table.factors
+    assert loaded.sectors == table.sectors
+    assert loaded.columns == table.columns
+    assert (loaded.version, loaded.data_hash, loaded.computed_at) == ('v1', 'abc123', '2026-01-02T00:00:00')
+    np.testing.assert_array_equal(loaded.values, table.values)
+    assert loaded.lookup('interest_rates', 'tech') == table.lookup('interest_rates', 'tech')
+
+
+# ============================================
+# LOADING AND RETRIES
+# ============================================
+
+def test_get_effect_table_loads_saved_version(effect_table_env, monkeypatch):
+    _table().save(cs._effect_table_path('v1'))
+    monkeypatch.setattr(cs, 'refresh_effect_table', pytest.fail)
+    
+    table = cs.get_effect_table()
+    
+    assert table.version == 'v1'
+    assert cs.get_effect_table() is table
+
+
+def test_failed_build_is_retried_after_delay(effect_table_env, monkeypatch):
+    clock = effect_table_env
+    
+    # No feature matrix: the build fails and records the failure time
+    assert cs.refresh_effect_table(version='v1', background=False) is None
+    
+    refreshes = []
+    monkeypatch.setattr(cs, 'refresh_effect_table', lambda **kwargs: refreshes.append(kwargs))
+    
+    clock.now += cs.EFFECT_TABLE_RETRY_SECONDS - 1
+    assert cs.get_effect_table() is None
+    assert refreshes == []
+    
+    clock.now += 1
+    assert cs.get_effect_table() is None
+    assert refreshes == [{'version': 'v1', 'background': True}]
+
+
+def test_successful_build_clears_failure(effect_table_env, monkeypatch):
+    assert cs.refresh_effect_table(version='v1', background=False) is None
+    
+    monkeypatch.setattr(cs, 'build_effect_table', lambda data, version: _table(version))
+    table = cs.refresh_effect_table(feature_data=object(), version='v1', background=False)
+    
+    assert table is not None
+    assert cs.get_effect_table() is table
+    assert 'v1' not in cs._effect_table_failed_at
+    
+    cs.invalidate_effect_table()
+    assert cs.get_effect_table().lookup('interest_rates', 'tech') == table.lookup('interest_rates', 'tech')
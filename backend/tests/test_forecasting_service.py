@@ -0,0 +1,515 @@
+"""
+Tests for the forecasting service.
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.services.forecasting_service as fs
+
+
+# ============================================
+# FIXTURES
+# ============================================
+
+def _garch_returns(n, seed):
+    """Daily decimal returns from a GARCH(1,1) with fat-ish volatility clustering."""
+    rng = np.random.default_rng(seed)
+    omega, alpha, beta = 0.05, 0.1, 0.85
+    variance = omega / (1 - alpha - beta)
+    returns = np.empty(n)
+    for t in range(n):
+        returns[t] = np.sqrt(variance) * rng.standard_normal()
+        variance = omega + alpha * returns[t] ** 2 + beta * variance
+    return returns / 100
+
+
+@pytest.fixture
+def returns_frame():
+    index = pd.bdate_range('2020-01-01', periods=700)
+    return pd.DataFrame({
+        'Technology_Return_1d': _garch_returns(700, 1),
+        'Real_Estate_Return_1d': _garch_returns(700, 2),
+    }, index=index)
+
+
+@pytest.fixture
+def nowcaster_factory(tmp_path, monkeypatch):
+    """Nowcaster over a parquet in tmp_path with no registry or saved models."""
+    monkeypatch.setattr(fs, 'MODELS_DIR', str(tmp_path))
+    monkeypatch.setattr(fs, '_registry_garch_states', lambda: {})
+    path = tmp_path / 'feature_matrix.parquet'
+    
+    def write(frame, mtime):
+        frame.to_parquet(path)
+        os.utime(path, (mtime, mtime))
+    
+    def make(refit_every=1000):
+        return fs.VolatilityNowcaster(feature_path=str(path), refit_every=refit_every)
+    
+    return make, write
+
+
+def _wait_for_refits(nowcaster, timeout=30):
+    deadline = time.time() + timeout
+    while nowcaster._refitting and time.time() < deadline:
+        time.sleep(0.05)
+    assert not nowcaster._refitting
+
+
+# ============================================
+# ARIMA ORDER SEARCH
+# ============================================
+
+@pytest.fixture
+def arma_series():
+    rng = np.random.default_rng(12)
+    n = 500
+    noise = rng.normal(scale=0.01, size=n + 1)
+    values = np.zeros(n + 1)
+    for t in range(1, n + 1):
+        values[t] = 0.6 * values[t - 1] + noise[t] + 0.4 * noise[t - 1]
+    return pd.Series(values[1:])
+
+
+@pytest.fixture
+def aic_cache(monkeypatch):
+    cache = {}
+    monkeypatch.setattr(fs, '_aic_cache', cache)
+    return cache
+
+
+def test_stepwise_search_matches_grid(arma_series, aic_cache):
+    stepwise = fs.ARIMAForecaster(max_p=3, max_d=0, max_q=3, search='stepwise', n_jobs=1)
+    stepwise_order = stepwise._auto_select_order(arma_series)
+    stats = stepwise.search_stats
+    assert stats['n_fits'] == stats['n_candidates'] < 16 and stats['n_cached'] == 0
+    
+    aic_cache.clear()
+    grid = fs.ARIMAForecaster(max_p=3, max_d=0, max_q=3, search='grid', n_jobs=1)
+    assert grid._auto_select_order(arma_series) == stepwise_order
+    assert grid.search_stats['n_fits'] == 16
+    assert stepwise_order[0] >= 1 and stepwise_order[2] >= 1
+
+
+def test_warm_start_only_from_nested_orders(arma_series):
+    values = arma_series.values
+    cold = fs._fit_arima_order(values, (1, 0, 1))
+    larger = fs._fit_arima_order(values, (2, 0, 2))
+    
+    # (2, 0, 2) estimates would start (1, 0, 1) away from its optimum
+    from_larger = fs._fit_arima_order(values, (1, 0, 1), warm_params=larger['params'])
+    assert from_larger['aic'] == pytest.approx(cold['aic'], rel=1e-8)
+    
+    from_smaller = fs._fit_arima_order(values, (2, 0, 2), warm_params=cold['params'])
+    assert np.isfinite(from_smaller['aic'])
+    # Starts at the (1, 0, 1) optimum: two more parameters, likelihood no lower
+    assert from_smaller['aic'] <= cold['aic'] + 4
+
+
+def test_order_search_reuses_cached_aics(arma_series, aic_cache):
+    first = fs.ARIMAForecaster(max_p=2, max_d=0, max_q=2, n_jobs=1)
+    order = first._auto_select_order(arma_series)
+    assert len(aic_cache) == first.search_stats['n_fits'] > 0
+    
+    second = fs.ARIMAForecaster(max_p=2, max_d=0, max_q=2, n_jobs=1)
+    assert second._auto_select_order(arma_series) == order
+    assert second.search_stats['n_fits'] == 0
+    assert second.search_stats['n_cached'] == second.search_stats['n_candidates']
+    
+    # A different series gets its own entries
+    third = fs.ARIMAForecaster(max_p=2, max_d=0, max_q=2, n_jobs=1)
+    third._auto_select_order(arma_series * 2)
+    assert third.search_stats['n_cached'] == 0
+
+
+def test_aic_cache_evicts_oldest_entries(arma_series, aic_cache, monkeypatch):
+    monkeypatch.setattr(fs, 'MAX_AIC_CACHE', 3)
+    grid = fs.ARIMAForecaster(max_p=2, max_d=0, max_q=1, search='grid', n_jobs=1)
+    grid._auto_select_order(arma_series)
+    
+    assert grid.search_stats['n_fits'] == 6
+    assert [order for _, order in aic_cache] == [(1, 0, 1), (2, 0, 0), (2, 0, 1)]
+
+
+def test_parallel_order_search_matches_in_process(arma_series, aic_cache):
+    serial = fs.ARIMAForecaster(max_p=2, max_d=0, max_q=2, search='grid', n_jobs=1)
+    serial_order = serial._auto_select_order(arma_series)
+    serial_cache = dict(aic_cache)
+    
+    aic_cache.clear()
+    try:
+        parallel = fs.ARIMAForecaster(max_p=2, max_d=0, max_q=2, search='grid', n_jobs=2)
+        assert parallel._auto_select_order(arma_series) == serial_order
+        assert fs._order_search_pool._mp_context.get_start_method() == 'spawn'
+    finally:
+        fs._shutdown_order_search_pool()
+    
+    assert aic_cache.keys() == serial_cache.keys()
+    for key, (aic, _) in serial_cache.items():
+        assert aic_cache[key][0] == pytest.approx(aic, rel=1e-8)
+
+
+# ============================================
+# VOLATILITY SIMULATION
+# ============================================
+
+@pytest.mark.parametrize('vol_type, gamma, nu', [
+    ('GARCH', 0.0, None),
+    ('GJR-GARCH', 0.08, 8.0),
+])
+def test_simulated_variance_converges_to_analytic(vol_type, gamma, nu):
+    state = fs.OnlineGARCHState(
+        vol_type, omega=0.05, alpha=0.06, beta=0.88, variance=2.5, gamma=gamma, nu=nu
+    )
+    horizon = 21
+    
+    sims = fs.simulate_garch_paths([state.as_params()], horizon=horizon, n_simulations=100_000, random_state=7)
+    
+    expected = state.forecast(horizon)
+    assert sims['variance'][0, 0] == pytest.approx(expected[0], rel=1e-12)
+    np.testing.assert_allclose(sims['variance'][0], expected, rtol=0.02)
+    
+    lower, volatility, upper = sims['ci_lower'][0], sims['volatility'][0], sims['ci_upper'][0]
+    # Step 0 is the known next-day variance; the bands widen after it
+    assert lower[0] == pytest.approx(upper[0]) and volatility[0] == pytest.approx(upper[0])
+    assert np.all(lower[1:] < volatility[1:]) and np.all(volatility[1:] < upper[1:])
+    
+    again = fs.simulate_garch_paths([state.as_params()], horizon=horizon, n_simulations=100_000, random_state=7)
+    np.testing.assert_array_equal(again['ci_upper'], sims['ci_upper'])
+
+
+def test_simulation_batches_models_independently():
+    states = [
+        fs.OnlineGARCHState('GARCH', omega=0.05, alpha=0.06, beta=0.88, variance=2.5),
+        fs.OnlineGARCHState('GJR-GARCH', omega=0.02, alpha=0.03, beta=0.9, variance=0.8, gamma=0.1, nu=6.0),
+    ]
+    sims = fs.simulate_garch_paths([s.as_params() for s in states], horizon=10, n_simulations=50_000, random_state=3)
+    
+    assert sims['variance'].shape == sims['ci_lower'].shape == (2, 10)
+    for i, state in enumerate(states):
+        np.testing.assert_allclose(sims['variance'][i], state.forecast(10), rtol=0.03)
+
+
+# ============================================
+# GARCH BATCH FITTING
+# ============================================
+
+@pytest.fixture
+def garch_history():
+    return pd.Series(_garch_returns(800, 5), index=pd.bdate_range('2019-01-01', periods=800))
+
+
+def _fit_garch(returns, previous=None, **kwargs):
+    previous = {'Technology': previous} if previous else None
+    return fs.fit_garch_batch({'Technology': returns}, previous=previous, n_jobs=1, **kwargs)['Technology']
+
+
+def test_garch_refit_skipped_for_small_extension(garch_history):
+    base = _fit_garch(garch_history.iloc[:550])
+    extended = _fit_garch(garch_history.iloc[:553], previous=base['state'])
+    
+    assert not extended['refit']
+    assert extended['parameter_shift'] < 0.1
+    assert extended['state']['params'] == base['state']['params']
+    assert extended['state']['n_observations'] == 553
+    
+    reference = fs.GARCHForecaster()
+    reference.fix(garch_history.iloc[:553], base['state']['params'])
+    np.testing.assert_allclose(
+        extended['forecaster'].predict(steps=5, method='analytic')['volatility'],
+        reference.predict(steps=5, method='analytic')['volatility']
+    )
+
+
+@pytest.mark.parametrize('n_obs, altered, tolerance', [
+    (750, False, 0.1),   # more new days than max_extension_days
+    (553, True, 0.1),    # earlier history changed (hash mismatch)
+    (553, False, 0.01),  # predicted shift above the tolerance
+])
+def test_garch_refit_forced(garch_history, n_obs, altered, tolerance):
+    base = _fit_garch(garch_history.iloc[:550])
+    returns = garch_history.iloc[:n_obs].copy()
+    if altered:
+        returns.iloc[10] *= 2
+    
+    refit = _fit_garch(returns, previous=base['state'], tolerance=tolerance)
+    
+    assert refit['refit'] and refit['warm_start']
+    assert (refit['parameter_shift'] is not None) == (n_obs == 553 and not altered)
+    assert refit['state']['params'] != base['state']['params']
+    
+    cold = fs.GARCHForecaster()
+    cold.fit(returns)
+    np.testing.assert_allclose(
+        list(refit['state']['params'].values()), cold.model.params.values, rtol=1e-3, atol=1e-5
+    )
+
+
+def test_parallel_garch_batch_matches_in_process(garch_history):
+    returns = {
+        'Technology': garch_history,
+        'Real_Estate': pd.Series(_garch_returns(800, 6), index=garch_history.index),
+    }
+    serial = fs.fit_garch_batch(returns, n_jobs=1)
+    parallel = fs.fit_garch_batch(returns, n_jobs=2)
+    
+    for sector in returns:
+        assert parallel[sector]['state'] == serial[sector]['state']
+
+
+# ============================================
+# VOLATILITY NOWCASTING
+# ============================================
+
+def test_nowcaster_reload_updates_every_sector(nowcaster_factory, returns_frame):
+    make, write = nowcaster_factory
+    write(returns_frame.iloc[:-5], 1_000_000)
+    nowcaster = make()
+    
+    tech = nowcaster.get_state('Technology')
+    real_estate = nowcaster.get_state('Real Estate')
+    expected = fs.OnlineGARCHState.from_dict(real_estate.to_dict())
+    for date, value in returns_frame['Real_Estate_Return_1d'].iloc[-5:].items():
+        expected.update(float(value), str(date))
+    
+    # One reload, triggered by a request for a different sector
+    write(returns_frame, 2_000_000)
+    nowcaster.get_state('Technology')
+    
+    assert tech.n_updates == 5
+    real_estate = nowcaster.get_state('Real Estate')
+    assert real_estate.n_updates == 5
+    assert real_estate.last_date == str(returns_frame.index[-1])
+    assert real_estate.variance == pytest.approx(expected.variance, rel=1e-12)
+
+
+def test_nowcaster_registry_state_starts_refit_count_at_zero(nowcaster_factory, returns_frame, monkeypatch):
+    make, write = nowcaster_factory
+    returns = returns_frame['Technology_Return_1d']
+    # Training stores the state of the train split; the feature matrix also holds the test split
+    stored = fs.fit_garch_batch({'Technology': returns.iloc[:500]}, n_jobs=1)['Technology']['state']
+    monkeypatch.setattr(fs, '_registry_garch_states', lambda: {'Technology': stored})
+    write(returns_frame, 1_000_000)
+    nowcaster = make(refit_every=21)
+    
+    state = nowcaster.get_state('Technology')
+    
+    assert state.n_updates == 0
+    assert not nowcaster._refitting
+    assert state.last_date == str(returns.index[-1])
+    reference = fs.GARCHForecaster()
+    reference.fix(returns, stored['params'])
+    assert state.variance == pytest.approx(fs.OnlineGARCHState.from_forecaster(reference).variance, rel=1e-12)
+
+
+def test_nowcaster_refit_replays_newer_returns(nowcaster_factory, returns_frame, monkeypatch):
+    make, write = nowcaster_factory
+    write(returns_frame.iloc[:-10], 1_000_000)
+    nowcaster = make(refit_every=3)
+    nowcaster.get_state('Technology')
+    
+    # Hold the refit until more returns have arrived
+    real_batch = fs.fit_garch_batch
+    released = []
+    
+    def slow_batch(*args, **kwargs):
+        while not released:
+            time.sleep(0.01)
+        return real_batch(*args, **kwargs)
+    
+    monkeypatch.setattr(fs, 'fit_garch_batch', slow_batch)
+    write(returns_frame.iloc[:-6], 2_000_000)
+    old = nowcaster.get_state('Technology')
+    assert 'Technology' in nowcaster._refitting
+    assert old.n_updates == 0
+    
+    write(returns_frame, 3_000_000)
+    nowcaster.get_state('Technology')
+    released.append(True)
+    _wait_for_refits(nowcaster)
+    
+    new = nowcaster.states['Technology']
+    assert new is not old
+    assert new.last_date == str(returns_frame.index[-1])
+    assert new.n_updates == 6
+
+
+def test_nowcaster_failed_refit_backs_off(nowcaster_factory, returns_frame, monkeypatch):
+    make, write = nowcaster_factory
+    write(returns_frame.iloc[:-10], 1_000_000)
+    nowcaster = make(refit_every=3)
+    nowcaster.get_state('Technology')
+    
+    attempts = []
+    
+    def failing_batch(*args, **kwargs):
+        attempts.append(1)
+        raise RuntimeError('optimizer failed')
+    
+    monkeypatch.setattr(fs, 'fit_garch_batch', failing_batch)
+    write(returns_frame.iloc[:-5], 2_000_000)
+    for _ in range(5):
+        state = nowcaster.get_state('Technology')
+        _wait_for_refits(nowcaster)
+    
+    assert len(attempts) == 1
+    assert state is nowcaster.states['Technology']
+    assert state.last_date == str(returns_frame.index[-6])
+    
+    write(returns_frame, 3_000_000)
+    nowcaster.get_state('Technology')
+    _wait_for_refits(nowcaster)
+    assert len(attempts) == 2
+
+
+# ============================================
+# LSTM FORECASTING
+# ============================================
+
+def test_lstm_predict_restores_eval_mode_on_failure():
+    pytest.importorskip('torch')
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(120, 20, 2)).astype(np.float32)
+    y = 0.5 * X[:, -1, 0]
+    lstm = fs.LSTMForecaster(sequence_length=20, hidden_size=8)
+    assert 'error' not in lstm.fit(X, y, epochs=1)
+    
+    forward = lstm.model.forward
+    
+    def failing_forward(x):
+        if lstm.model.training:
+            raise RuntimeError('MC pass failed')
+        return forward(x)
+    
+    lstm.model.forward = failing_forward
+    result = lstm.predict(X[-1:], n_simulations=10)
+    
+    assert 'error' in result
+    assert not lstm.model.training
+    assert not lstm.model.lstm.training
+
+
+def test_lstm_export_uses_per_precision_tolerance(tmp_path):
+    pytest.importorskip('torch')
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(120, 20, 2)).astype(np.float32)
+    y = 0.01 * X[:, -1, 0]
+    lstm = fs.LSTMForecaster(sequence_length=20, hidden_size=8)
+    assert 'error' not in lstm.fit(X, y, epochs=1)
+    
+    fp32 = lstm.export(str(tmp_path / 'fp32.pt'), X)
+    assert fp32['valid'] and fp32['tolerance'] == fs.LSTM_EXPORT_TOLERANCE
+    exported = fs.ExportedLSTM(fp32['path'])
+    eager = np.array(lstm.predict(X, n_simulations=1)['predictions'])
+    np.testing.assert_allclose(exported.predict(X), eager, atol=fs.LSTM_EXPORT_TOLERANCE)
+    
+    int8 = lstm.export(str(tmp_path / 'int8.pt'), X, quantize=True)
+    assert int8['tolerance'] == fs.LSTM_EXPORT_QUANT_TOLERANCE
+    assert int8['valid'] == (int8['max_abs_error'] <= fs.LSTM_EXPORT_QUANT_TOLERANCE)
+    assert os.path.exists(tmp_path / 'int8.pt') == int8['valid']
+
+
+def _list_sequences(data, target_col, feature_cols, sequence_length, horizon):
+    """The list-based windows prepare_sequences used to stack."""
+    features = data[feature_cols].values
+    target = data[target_col].values
+    X, y = [], []
+    for i in range(len(data) - sequence_length - horizon):
+        X.append(features[i:i + sequence_length])
+        y.append(target[i + sequence_length + horizon - 1])
+    return np.array(X), np.array(y)
+
+
+@pytest.mark.parametrize('sequence_length, horizon', [(20, 5), (10, 1), (60, 21)])
+def test_sequence_windows_match_list_based_output(sequence_length, horizon):
+    pytest.importorskip('torch')
+    rng = np.random.default_rng(2)
+    data = pd.DataFrame(rng.normal(size=(150, 3)), columns=['a', 'b', 'target'])
+    expected_X, expected_y = _list_sequences(data, 'target', ['a', 'b'], sequence_length, horizon)
+    
+    X, y = fs.prepare_sequences(data, 'target', ['a', 'b'], sequence_length, horizon)
+    assert X.dtype == expected_X.dtype == np.float64
+    assert X.flags.writeable and y.flags.writeable
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(y, expected_y)
+    
+    dataset = fs.SequenceDataset.from_frame(data, 'target', ['a', 'b'], sequence_length, horizon)
+    assert len(dataset) == len(expected_X)
+    np.testing.assert_array_equal(dataset.targets(), expected_y.astype(np.float32))
+    
+    index = np.arange(len(dataset))[::7]
+    X_batch, y_batch = dataset[index]
+    np.testing.assert_array_equal(X_batch.numpy(), expected_X[index].astype(np.float32))
+    np.testing.assert_array_equal(y_batch.numpy()[:, 0], expected_y[index].astype(np.float32))
+
+
+def test_prepare_sequences_too_short_frame_is_empty():
+    data = pd.DataFrame(np.ones((30, 2)), columns=['a', 'target'])
+    X, y = fs.prepare_sequences(data, 'target', ['a'], sequence_length=20, horizon=10)
+    assert X.shape == (0, 20, 1) and y.shape == (0,)
+
+
+# ============================================
+# WALK-FORWARD EVALUATION
+# ============================================
+
+@pytest.fixture
+def ar_series():
+    rng = np.random.default_rng(3)
+    n = 360
+    values = np.empty(n)
+    values[0] = 0.0
+    for t in range(1, n):
+        values[t] = 0.6 * values[t - 1] + rng.normal(scale=0.01)
+    return pd.Series(values, index=pd.bdate_range('2021-01-01', periods=n))
+
+
+def test_walk_forward_arima_matches_per_origin_filtering(ar_series):
+    from statsmodels.tsa.arima.model import ARIMA
+    
+    initial_window, horizons = 200, (1, 5)
+    arima = fs.ARIMAForecaster(max_p=2, max_d=0, max_q=1, n_jobs=1)
+    assert 'error' not in arima.fit(ar_series.iloc[:initial_window])
+    
+    result = fs.walk_forward_backtest(
+        arima, ar_series, horizons=horizons, initial_window=initial_window, refit_every=None
+    )
+    assert result['n_origins'] == len(ar_series) - initial_window
+    
+    # Parameters are estimated once, on the data up to the first origin
+    values = ar_series.values
+    params = fs._fit_arima_order(values[:initial_window], arima.order)['params']
+    for i in (0, 1, 37, result['n_origins'] - 6):
+        origin = initial_window - 1 + i
+        model = ARIMA(values[:origin + 1], order=arima.order)
+        filtered = model.filter(np.array([params[name] for name in model.param_names]))
+        expected = filtered.forecast(max(horizons))[np.array(horizons) - 1]
+        np.testing.assert_allclose(result['forecasts'][i], expected, rtol=1e-6, atol=1e-10)
+        np.testing.assert_allclose(result['actuals'][i], values[origin + np.array(horizons)])
+
+
+def test_walk_forward_garch_matches_per_origin_filtering():
+    returns = pd.Series(_garch_returns(700, 4), index=pd.bdate_range('2019-01-01', periods=700))
+    initial_window, horizons = 500, (1, 5, 10)
+    garch = fs.GARCHForecaster()
+    
+    result = fs.walk_forward_backtest(
+        garch, returns, horizons=horizons, initial_window=initial_window, refit_every=None
+    )
+    
+    reference = fs.GARCHForecaster()
+    reference.fit(returns.iloc[:initial_window])
+    params = reference.model.params.to_dict()
+    for i in (0, 1, 50, result['n_origins'] - 11):
+        origin = initial_window - 1 + i
+        reference.fix(returns.iloc[:origin + 1], params)
+        variance = reference.model.forecast(horizon=max(horizons), reindex=False).variance.values[-1]
+        expected = variance[np.array(horizons) - 1] / 1e4
+        np.testing.assert_allclose(result['forecasts'][i], expected, rtol=1e-6)
+        np.testing.assert_allclose(result['actuals'][i], returns.values[origin + np.array(horizons)] ** 2)
+    assert 'qlike' in result['metrics']['h1']
@@ -0,0 +1,127 @@
+"""
+Tests for the /api/ml endpoints.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.routes.ml as ml_routes
+
+
+# ============================================
+# FIXTURES
+# ============================================
+
+@pytest.fixture
+def app():
+    from app import create_app
+    return create_app('testing')
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def unmigrated_db(app):
+    """causal_relationships as created before model_version/data_hash existed."""
+    from app import db
+    
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('DROP TABLE causal_relationships')
+            connection.exec_driver_sql(
+                'CREATE TABLE causal_relationships ('
+                'id INTEGER PRIMARY KEY, cause_variable VARCHAR(100) NOT NULL, '
+                'effect_variable VARCHAR(100) NOT NULL, discovery_method VARCHAR(50), '
+                'p_value FLOAT, granger_f_statistic FLOAT, optimal_lag INTEGER, '
+                'sample_size INTEGER, created_at DATETIME, updated_at DATETIME)'
+            )
+    return app
+
+
+@pytest.fixture
+def feature_dir(tmp_path, monkeypatch):
+    """Feature matrix where x Granger-causes y at lag 1."""
+    rng = np.random.default_rng(0)
+    n = 400
+    x = rng.normal(size=n)
+    y = np.zeros(n)
+    for t in range(1, n):
+        y[t] = 0.6 * x[t - 1] + rng.normal(scale=0.5)
+    (tmp_path / 'processed').mkdir()
+    pd.DataFrame({'x': x, 'y': y}).to_parquet(tmp_path / 'processed' / 'feature_matrix.parquet')
+    monkeypatch.setattr(ml_routes, 'DATA_DIR', str(tmp_path))
+    return tmp_path
+
+
+# ============================================
+# PERSISTED CAUSAL RELATIONSHIPS
+# ============================================
+
+def test_unmigrated_causal_table_falls_back_to_live(unmigrated_db, feature_dir):
+    with unmigrated_db.app_context():
+        assert ml_routes._served_causal_version() == (None, {})
+    
+    client = unmigrated_db.test_client()
+    response = client.post('/api/ml/causal/granger', json={
+        'cause_variable': 'x', 'effect_variable': 'y', 'max_lag': 2
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['source'] == 'computed' and body['result']['is_causal']
+    
+    response = client.get('/api/ml/causal/drivers/y')
+    assert response.status_code == 404
+
+
+# ============================================
+# VOLATILITY
+# ============================================
+
+class _StubNowcaster:
+    def __init__(self, states):
+        self.states = states
+    
+    def get_state(self, sector):
+        return self.states.get(sector)
+
+
+@pytest.fixture
+def nowcaster(feature_dir, monkeypatch):
+    import app.services.forecasting_service as fs
+    
+    state = fs.OnlineGARCHState(
+        'GARCH', omega=0.05, alpha=0.06, beta=0.88, variance=2.5, last_date='2021-06-30'
+    )
+    stub = _StubNowcaster({'Technology': state})
+    monkeypatch.setattr(fs, 'get_volatility_nowcaster', lambda: stub)
+    return stub
+
+
+@pytest.mark.parametrize('body', [
+    {'method': 'foo'},
+    {'sectors': 'Technology'},
+    {'sectors': ['Technology', 3]},
+    {'horizon': 'ten'},
+    {'n_simulations': None},
+])
+def test_volatility_rejects_bad_parameters(client, nowcaster, body):
+    response = client.post('/api/ml/predict/volatility', json=body)
+    assert response.status_code == 400
+    assert not response.get_json()['success']
+
+
+@pytest.mark.parametrize('method', ['analytic', 'simulation'])
+def test_volatility_reports_sectors_without_state(client, nowcaster, method):
+    response = client.post('/api/ml/predict/volatility', json={
+        'sectors': ['Technology', 'Nowhere'], 'horizon': 5, 'method': method, 'n_simulations': 200
+    })
+    
+    assert response.status_code == 200
+    sectors = response.get_json()['sectors']
+    assert 'error' in sectors['Nowhere']
+    assert len(sectors['Technology']['volatility']) == 5
+    assert sectors['Technology']['as_of'] == '2021-06-30'
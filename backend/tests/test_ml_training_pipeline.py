@@ -0,0 +1,292 @@
+"""
+Tests for the ML training pipeline and prediction service.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.services.ml_training_pipeline as mp
+
+
+# ============================================
+# FIXTURES
+# ============================================
+
+@pytest.fixture
+def models_dir(tmp_path, monkeypatch):
+    """Empty models directory and registry; forecast cache state reset around each test."""
+    registry_path = str(tmp_path / 'model_registry.json')
+    monkeypatch.setattr(mp, 'MODELS_DIR', str(tmp_path))
+    monkeypatch.setattr(mp, 'REGISTRY_PATH', registry_path)
+    monkeypatch.setattr(mp.ModelRegistry.__init__, '__defaults__', (registry_path,))
+    mp.invalidate_forecast_cache()
+    yield tmp_path
+    mp.invalidate_forecast_cache()
+
+
+def _cache(version, sectors=('Technology', 'Real_Estate'), horizon=63, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(scale=0.01, size=(len(mp.FORECAST_CACHE_FIELDS), len(sectors), horizon))
+    return mp.ForecastCache(list(sectors), values, version, '2026-01-02T00:00:00')
+
+
+def _register_forecast(version):
+    registry = mp.ModelRegistry()
+    return registry.register_model('forecast', 'ensemble', version, {}, {}, mp.MODELS_DIR)
+
+
+def _pipeline():
+    pipeline = mp.MLTrainingPipeline.__new__(mp.MLTrainingPipeline)
+    pipeline.registry = mp.ModelRegistry()
+    return pipeline
+
+
+def _training_frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'Fed_Funds_Rate': rng.normal(size=n),
+        'Fed_Funds_Rate_Change': rng.normal(size=n),
+        'VIX': 20 + 5 * rng.normal(size=n),
+        'Yield_Curve_Spread': rng.normal(size=n),
+        'SP500_Return': 0.01 * rng.normal(size=n),
+        'SP500_Volatility_21d': 0.1 + 0.01 * rng.normal(size=n),
+    }, index=pd.bdate_range('2020-01-01', periods=n))
+    frame['Technology_Return_1d'] = (
+        -0.002 * frame['Fed_Funds_Rate_Change'] + 0.5 * frame['SP500_Return']
+        + 0.005 * rng.normal(size=n)
+    )
+    return frame
+
+
+# ============================================
+# TRAINING JOBS
+# ============================================
+
+def test_backtest_timeout_keeps_trained_model(models_dir, monkeypatch):
+    def timeout(*args, **kwargs):
+        raise mp.JobTimeoutError()
+    
+    monkeypatch.setattr(mp, 'walk_forward_backtest', timeout)
+    rng = np.random.default_rng(0)
+    series = pd.Series(rng.standard_t(df=6, size=600) * 0.01)
+    
+    result = mp._run_forecast_job(
+        'garch', 'Technology', series.iloc[:500], series.iloc[500:], 'v1',
+        models_dir=str(models_dir), timeout=0
+    )
+    
+    assert result['status'] == 'completed'
+    assert (models_dir / 'garch_Technology_v1.pkl').exists()
+    assert result['models']['garch'] == str(models_dir / 'garch_Technology_v1.pkl')
+    assert result['evaluation']['walk_forward']['status'] == 'timeout'
+    assert np.isfinite(result['evaluation']['mean_volatility'])
+
+
+def _stub_forecast_job(sector_name, train_series, test_series, version, previous, models_dir):
+    if sector_name == 'Energy':
+        raise RuntimeError('stub failure')
+    if sector_name == 'Healthcare':
+        time.sleep(60)
+    return {'evaluation': {'n_train': len(train_series)}, 'models': {'garch': f'{sector_name}.pkl'}}
+
+
+_real_run_forecast_job = mp._run_forecast_job
+
+
+def _run_stub_forecast_job(*args, **kwargs):
+    # Runs in a spawned worker, which re-imported the module's job table
+    mp.FORECAST_JOBS = {'garch': _stub_forecast_job}
+    return _real_run_forecast_job(*args, **kwargs)
+
+
+def test_failed_and_timed_out_jobs_do_not_stop_other_sectors(models_dir, monkeypatch):
+    monkeypatch.setattr(mp, 'FORECAST_JOBS', {'garch': _stub_forecast_job})
+    monkeypatch.setattr(mp, '_run_forecast_job', _run_stub_forecast_job)
+    monkeypatch.setattr(mp, 'FORECAST_JOB_TIMEOUT', 2)
+    
+    frame = _training_frame()
+    for sector in ('Energy', 'Healthcare', 'Financials'):
+        frame[f'{sector}_Return_1d'] = frame['Technology_Return_1d'].sample(frac=1, random_state=1).values
+    
+    status = {'errors': []}
+    results = _pipeline()._train_forecasting_models(
+        frame.iloc[:300], frame.iloc[300:], 'v1', 'hash', status=status
+    )
+    
+    jobs = status['forecasting_jobs']
+    assert jobs['Energy/garch']['status'] == 'failed'
+    assert jobs['Energy/garch']['error'] == 'stub failure'
+    assert jobs['Healthcare/garch']['status'] == 'timeout'
+    assert jobs['Healthcare/garch']['seconds'] < 30
+    for sector in ('Technology', 'Financials'):
+        assert jobs[f'{sector}/garch']['status'] == 'completed'
+        assert results['evaluations'][sector]['garch'] == {'n_train': 300}
+        assert results['models'][sector]['garch'] == f'{sector}.pkl'
+    
+    assert sorted(status['errors']) == [
+        'Energy/garch: stub failure',
+        'Healthcare/garch: Timed out after 2s',
+    ]
+    assert set(results['evaluations']) == {'Technology', 'Financials'}
+
+
+# ============================================
+# FORECAST CACHE
+# ============================================
+
+def test_forecast_cache_round_trip(models_dir):
+    cache = _cache('v1')
+    path = mp.forecast_cache_path('v1')
+    cache.save(path)
+    loaded = mp.ForecastCache.load(path)
+    
+    assert loaded.version == 'v1' and loaded.computed_at == cache.computed_at
+    np.testing.assert_array_equal(loaded.values, cache.values)
+    
+    j = cache.sectors.index('Real_Estate')
+    entry = loaded.lookup('Real Estate', 5)
+    fields = dict(zip(mp.FORECAST_CACHE_FIELDS, cache.values[:, j, :5]))
+    assert entry['cached'] and entry['version'] == 'v1'
+    np.testing.assert_allclose(entry['mean'], fields['mean'])
+    np.testing.assert_allclose(entry['ci_upper'], fields['ci_upper'])
+    np.testing.assert_allclose(entry['models']['garch']['volatility'], fields['volatility'])
+    assert set(entry['models']) == {'arima', 'lstm', 'garch'}
+    
+    assert loaded.lookup('Technology', 64) is None
+    assert loaded.lookup('Utilities', 5) is None
+
+
+def test_forecast_cache_skips_fallback_sectors(models_dir, monkeypatch):
+    def compute(self, sector, recent_data, horizon=21, version=None):
+        if sector == 'Utilities':
+            return self._fallback_prediction(recent_data, horizon)
+        path = list(np.linspace(0.001, 0.002, horizon))
+        return {
+            'mean': path, 'std': path, 'ci_lower': path, 'ci_upper': path,
+            'models': {'arima': {'forecast': path}},
+        }
+    
+    monkeypatch.setattr(mp.PredictionService, '_compute_sector_forecast', compute)
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame({
+        'Technology_Return_1d': rng.normal(size=300),
+        'Utilities_Return_1d': rng.normal(size=300),
+    })
+    
+    cache = mp.build_forecast_cache(features, 'v1')
+    
+    assert cache.lookup('Technology', 21)['models'] == {'arima': {'mean': list(np.linspace(0.001, 0.002, 63)[:21])}}
+    assert cache.lookup('Utilities', 21) is None
+
+
+def test_activation_invalidates_forecast_cache(models_dir):
+    from app import create_app
+    
+    for version in ('v1', 'v2'):
+        _register_forecast(version)
+        _cache(version, seed=int(version[1])).save(mp.forecast_cache_path(version))
+    mp.ModelRegistry().set_active_model('forecast', 'forecast_ensemble_v1')
+    
+    assert mp.get_forecast_cache().version == 'v1'
+    
+    client = create_app('testing').test_client()
+    response = client.post('/api/ml/models/forecast/forecast_ensemble_v2/activate')
+    assert response.status_code == 200
+    assert not mp._forecast_cache_loaded
+    
+    assert mp.get_forecast_cache().version == 'v2'
+    response = client.post('/api/ml/predict/sector', json={'sector': 'Technology', 'horizon': 5})
+    predictions = response.get_json()['predictions']
+    assert predictions['cached'] and predictions['version'] == 'v2'
+
+
+def test_live_forecast_uses_active_version(models_dir):
+    from app.services.forecasting_service import ARIMAForecaster
+    
+    rng = np.random.default_rng(1)
+    for version, level in (('v1', 0.01), ('v2', -0.01)):
+        arima = ARIMAForecaster(max_p=1, max_d=0, max_q=0, n_jobs=1)
+        assert 'error' not in arima.fit(pd.Series(level + rng.normal(scale=0.001, size=200)))
+        arima.save(str(models_dir / f'arima_Technology_{version}.pkl'))
+        _register_forecast(version)
+    mp.ModelRegistry().set_active_model('forecast', 'forecast_ensemble_v1')
+    
+    service = mp.PredictionService()
+    pred = service._compute_sector_forecast('Technology', pd.Series(rng.normal(size=100)), horizon=5)
+    
+    assert 'method' not in pred
+    np.testing.assert_allclose(pred['mean'], 0.01, atol=0.002)
+
+
+# ============================================
+# ACTIVATION AFTER TRAINING
+# ============================================
+
+def test_treatment_training_replaces_cached_cate_surface(models_dir, monkeypatch):
+    import app.services.causal_service as cs
+    
+    monkeypatch.setattr(cs, 'MODELS_DIR', str(models_dir))
+    monkeypatch.setattr(cs, 'refresh_effect_table', lambda **kwargs: None)
+    cs.invalidate_cate_surface()
+    assert cs.get_cate_surface() is None
+    
+    frame = _training_frame()
+    results = _pipeline()._train_treatment_models(frame.iloc[:300], frame.iloc[300:], 'v1', 'hash')
+    
+    assert results['cate_surface'] == mp.cate_surface_path('v1')
+    assert cs.get_cate_surface() is not None
+    cs.invalidate_cate_surface()
+
+
+def test_forecast_training_resets_nowcaster(models_dir, monkeypatch):
+    from app.services.forecasting_service import get_volatility_nowcaster
+    
+    monkeypatch.setattr(mp, 'FORECAST_JOBS', {})
+    nowcaster = get_volatility_nowcaster()
+    nowcaster.states['Technology'] = object()
+    
+    frame = _training_frame()
+    _pipeline()._train_forecasting_models(frame.iloc[:300], frame.iloc[300:], 'v1', 'hash')
+    
+    assert mp.ModelRegistry().get_active_model('forecast')['version'] == 'v1'
+    assert nowcaster.states == {}
+
+
+# ============================================
+# CAUSAL DISCOVERY TRAINING
+# ============================================
+
+@pytest.mark.parametrize('screen', [False, True])
+def test_causal_training_screens_granger_pairs(models_dir, monkeypatch, screen):
+    tested = []
+    granger = mp.CausalDiscoveryEngine.granger_causality_test
+    
+    def recording_granger(self, data, cause, effect, *args, **kwargs):
+        tested.append((cause, effect))
+        return granger(self, data, cause, effect, *args, **kwargs)
+    
+    monkeypatch.setattr(mp.CausalDiscoveryEngine, 'granger_causality_test', recording_granger)
+    monkeypatch.setattr(mp, 'CAUSAL_SCREEN', screen)
+    monkeypatch.setattr(mp, 'CAUSAL_SCREEN_TOP_K', 1)
+    
+    frame = _training_frame()
+    rng = np.random.default_rng(3)
+    frame['Energy_Return_1d'] = 0.01 * rng.normal(size=len(frame))
+    frame['Healthcare_Return_1d'] = (
+        0.6 * frame['Energy_Return_1d'].shift(1).fillna(0) + 0.005 * rng.normal(size=len(frame))
+    )
+    
+    results = _pipeline()._train_causal_models(frame.iloc[:300], frame.iloc[300:], 'v1', 'hash')
+    
+    variables = ['Technology_Return_1d', 'Energy_Return_1d', 'Healthcare_Return_1d', 'Fed_Funds_Rate']
+    active = mp.ModelRegistry().get_active_model('causal')
+    assert active['hyperparameters']['screened'] == screen
+    if screen:
+        assert results['screening']['pairs_kept'] == len(tested) <= len(variables)
+        assert ('Energy_Return_1d', 'Healthcare_Return_1d') in tested
+    else:
+        assert 'screening' not in results
+        assert len(tested) == len(variables) * (len(variables) - 1)
@@ -0,0 +1,433 @@
+"""
+Tests for the treatment effect estimator.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.treatment_effects import (
+    TreatmentEffectEstimator,
+    _ovb_adjust,
+    _robustness_value,
+    sensitivity_analysis,
+)
+
+
+# ============================================
+# FIXTURES
+# ============================================
+
+@pytest.fixture
+def estimator():
+    return TreatmentEffectEstimator(random_state=0, n_jobs=1)
+
+
+@pytest.fixture
+def panel():
+    """One confounded treatment and three outcomes with a time-varying effect."""
+    rng = np.random.default_rng(1)
+    n = 400
+    w1 = rng.normal(size=n)
+    w2 = rng.normal(size=n)
+    t = 0.5 * w1 + rng.normal(size=n)
+    effect = np.linspace(0.2, 1.0, n)
+    data = {'T': t, 'W1': w1, 'W2': w2}
+    for k in range(3):
+        data[f'Y{k}'] = effect * t * (k + 1) + w1 - 0.5 * w2 + rng.normal(size=n)
+    index = pd.bdate_range('2020-01-01', periods=n)
+    return pd.DataFrame(data, index=index)
+
+
+def _direct_ols(panel, start, end):
+    """Treatment coefficient and classical standard error per outcome from lstsq."""
+    X = np.column_stack([panel['T'], panel['W1'], panel['W2'], np.ones(len(panel))])[start:end]
+    Y = panel[['Y0', 'Y1', 'Y2']].values[start:end]
+    beta, _, _, _ = np.linalg.lstsq(X, Y, rcond=None)
+    resid = Y - X @ beta
+    sigma2 = (resid ** 2).sum(axis=0) / (len(X) - X.shape[1])
+    return beta[0], np.sqrt(sigma2 * np.linalg.inv(X.T @ X)[0, 0])
+
+
+# ============================================
+# ROLLING / RECURSIVE ATE
+# ============================================
+
+@pytest.mark.parametrize('window', [60, None])
+def test_rolling_ate_matches_lstsq(estimator, panel, window):
+    result = estimator.estimate_rolling_ate(
+        panel, 'T', ['Y0', 'Y1', 'Y2'], ['W1', 'W2'],
+        window=window, min_periods=50, refresh_every=100
+    )
+    first_end = window or 50
+    n_dates = len(panel) - first_end + 1
+    
+    assert result['ate'].shape == (1, n_dates, 3)
+    # Dates right after an exact refresh and far from the last one
+    for t in (0, 1, 99, 100, 150, n_dates - 1):
+        end = first_end + t
+        start = end - window if window else 0
+        ate, std_error = _direct_ols(panel, start, end)
+        np.testing.assert_allclose(result['ate'][0, t], ate, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(result['standard_error'][0, t], std_error, rtol=1e-6)
+        assert result['dates'][t] == panel.index[end - 1].strftime('%Y-%m-%d')
+        assert result['sample_size'][t] == end - start
+
+
+# ============================================
+# OLS ATE GRID
+# ============================================
+
+def test_ate_grid_hac_matches_statsmodels(estimator, panel):
+    import statsmodels.api as sm
+    
+    results = estimator.estimate_ate_grid(
+        panel, 'T', ['Y0', 'Y1', 'Y2'], ['W1', 'W2'], inference='hac', max_lags=5
+    )
+    
+    X = sm.add_constant(panel[['T', 'W1', 'W2']], prepend=False)
+    for outcome in ('Y0', 'Y1', 'Y2'):
+        fit = sm.OLS(panel[outcome], X).fit(
+            cov_type='HAC', cov_kwds={'maxlags': 5, 'use_correction': False}
+        )
+        assert results[outcome]['ate'] == pytest.approx(fit.params['T'], rel=1e-10)
+        assert results[outcome]['standard_error'] == pytest.approx(fit.bse['T'], rel=1e-8)
+        assert results[outcome]['max_lags'] == 5
+
+
+@pytest.mark.parametrize('inference', ['bootstrap', 'bayesian_bootstrap'])
+def test_ate_grid_bootstrap_matches_resampling_loop(panel, inference):
+    from sklearn.linear_model import LinearRegression
+    
+    n_bootstrap = 1000
+    estimator = TreatmentEffectEstimator(random_state=3, n_jobs=1)
+    results = estimator.estimate_ate_grid(
+        panel, 'T', ['Y0', 'Y2'], ['W1', 'W2'], inference=inference, n_bootstrap=n_bootstrap
+    )
+    
+    # Per-replicate refits, as the grid replaced
+    rng = np.random.default_rng(7)
+    X = panel[['T', 'W1', 'W2']].values
+    Y = panel[['Y0', 'Y2']].values
+    n = len(panel)
+    draws = []
+    for _ in range(n_bootstrap):
+        if inference == 'bootstrap':
+            idx = rng.integers(0, n, size=n)
+            fit = LinearRegression().fit(X[idx], Y[idx])
+        else:
+            weights = rng.dirichlet(np.ones(n)) * n
+            fit = LinearRegression().fit(X, Y, sample_weight=weights)
+        draws.append(fit.coef_[:, 0])
+    draws = np.array(draws)
+    
+    for j, outcome in enumerate(('Y0', 'Y2')):
+        result = results[outcome]
+        assert result['n_bootstrap'] == n_bootstrap
+        # Standard error of a bootstrap SE is about SE / sqrt(2B)
+        assert result['standard_error'] == pytest.approx(np.std(draws[:, j]), rel=0.1)
+        lower, upper = np.percentile(draws[:, j], [2.5, 97.5])
+        spread = upper - lower
+        assert result['ci_lower'] == pytest.approx(lower, abs=0.1 * spread)
+        assert result['ci_upper'] == pytest.approx(upper, abs=0.1 * spread)
+
+
+@pytest.mark.parametrize('inference', ['hac', 'bootstrap'])
+def test_ate_grid_handles_outcome_specific_missing_rows(estimator, panel, inference):
+    data = panel.copy()
+    data.iloc[:40, data.columns.get_loc('Y1')] = np.nan
+    data.iloc[300:350, data.columns.get_loc('Y2')] = np.nan
+    data.iloc[10:20, data.columns.get_loc('W2')] = np.nan
+    
+    results = estimator.estimate_ate_grid(
+        data, 'T', ['Y0', 'Y1', 'Y2'], ['W1', 'W2'], inference=inference, n_bootstrap=200
+    )
+    
+    for outcome, expected_rows in (('Y0', 390), ('Y1', 360), ('Y2', 340)):
+        rows = data[['T', 'W1', 'W2', outcome]].dropna()
+        X = np.column_stack([rows[['T', 'W1', 'W2']].values, np.ones(len(rows))])
+        beta, _, _, _ = np.linalg.lstsq(X, rows[outcome].values, rcond=None)
+        
+        result = results[outcome]
+        assert result['sample_size'] == len(rows) == expected_rows
+        assert result['ate'] == pytest.approx(beta[0], rel=1e-10)
+        assert np.isfinite(result['standard_error']) and result['standard_error'] > 0
+        
+        if inference == 'hac':
+            # Same answer as fitting that outcome on its own
+            alone = estimator.estimate_ate_grid(
+                data, 'T', [outcome], ['W1', 'W2'], inference='hac'
+            )[outcome]
+            assert result['max_lags'] == alone['max_lags']
+            assert result['standard_error'] == pytest.approx(alone['standard_error'], rel=1e-10)
+
+
+# ============================================
+# IV (2SLS) GRID
+# ============================================
+
+@pytest.fixture
+def iv_panel():
+    """Treatment confounded by an unobserved u, with two strong excluded instruments."""
+    rng = np.random.default_rng(4)
+    n = 600
+    z1, z2, w = rng.normal(size=(3, n))
+    u = rng.normal(size=n)
+    t = 0.8 * z1 - 0.6 * z2 + 0.5 * w + u + rng.normal(size=n)
+    data = {'T': t, 'Z1': z1, 'Z2': z2, 'W': w}
+    for k, effect in enumerate((1.5, -0.5)):
+        data[f'Y{k}'] = effect * t + 0.7 * w + 2.0 * u + rng.normal(size=n) * (1 + np.abs(z1))
+    return pd.DataFrame(data, index=pd.bdate_range('2020-01-01', periods=n))
+
+
+def _manual_2sls(data, outcome):
+    """Two explicit OLS stages with the HC1 sandwich built from structural residuals."""
+    n = len(data)
+    W = np.column_stack([data['W'], np.ones(n)])
+    Z = np.column_stack([data[['Z1', 'Z2']].values, W])
+    t = data['T'].values
+    y = data[outcome].values
+    
+    pi, _, _, _ = np.linalg.lstsq(Z, t, rcond=None)
+    X_hat = np.column_stack([Z @ pi, W])
+    beta, _, _, _ = np.linalg.lstsq(X_hat, y, rcond=None)
+    # Residuals use the actual treatment, not the first-stage fit
+    resid = y - np.column_stack([t, W]) @ beta
+    
+    bread = np.linalg.inv(X_hat.T @ X_hat)
+    meat = (X_hat * resid[:, None] ** 2).T @ X_hat
+    cov = bread @ meat @ bread * n / (n - X_hat.shape[1])
+    return beta[0], np.sqrt(cov[0, 0])
+
+
+def test_iv_grid_matches_two_stage_reference(estimator, iv_panel):
+    import statsmodels.api as sm
+    
+    results = estimator.estimate_iv_grid(
+        iv_panel, 'T', ['Y0', 'Y1'], ['W'], instruments=['Z1', 'Z2']
+    )
+    
+    for outcome, effect in (('Y0', 1.5), ('Y1', -0.5)):
+        ate, std_error = _manual_2sls(iv_panel, outcome)
+        result = results[outcome]
+        assert result['method'] == 'iv_2sls'
+        assert result['ate'] == pytest.approx(ate, rel=1e-10)
+        assert result['standard_error'] == pytest.approx(std_error, rel=1e-8)
+        assert abs(result['ate'] - effect) < 3 * std_error
+        assert not result['weak_instruments']
+    
+    # Naive OLS is biased by u; 2SLS is not
+    X = sm.add_constant(iv_panel[['T', 'W']])
+    ols = sm.OLS(iv_panel['Y0'], X).fit().params['T']
+    assert ols - 1.5 > 0.5
+    
+    # Classical first-stage F agrees with the nested-model F-test
+    first = sm.OLS(iv_panel['T'], sm.add_constant(iv_panel[['Z1', 'Z2', 'W']])).fit()
+    restricted = sm.OLS(iv_panel['T'], sm.add_constant(iv_panel[['W']])).fit()
+    f_value, _, _ = first.compare_f_test(restricted)
+    assert results['Y0']['first_stage_f'] == pytest.approx(f_value, rel=1e-8)
+
+
+def test_iv_grid_flags_weak_default_lag_instruments(estimator):
+    # i.i.d. treatment: its own lags carry no information about it
+    rng = np.random.default_rng(9)
+    n = 500
+    t = rng.normal(size=n)
+    w = rng.normal(size=n)
+    data = pd.DataFrame({'T': t, 'W': w, 'Y': t + w + rng.normal(size=n)})
+    
+    result = estimator.estimate_iv_grid(data, 'T', ['Y'], ['W'])['Y']
+    
+    assert result['instruments'] == ['T_lag1', 'T_lag2']
+    assert result['first_stage_f_robust'] < 10
+    assert result['weak_instruments']
+    
+    # A persistent treatment makes its lags strong instruments
+    persistent = np.zeros(n)
+    for i in range(1, n):
+        persistent[i] = 0.9 * persistent[i - 1] + rng.normal()
+    data['T'] = persistent
+    data['Y'] = persistent + w + rng.normal(size=n)
+    
+    result = estimator.estimate_iv_grid(data, 'T', ['Y'], ['W'])['Y']
+    
+    assert result['first_stage_f_robust'] > 10
+    assert not result['weak_instruments']
+
+
+# ============================================
+# SENSITIVITY ANALYSIS
+# ============================================
+
+# Darfur example from Cinelli & Hazlett (2020): peacefactor on directlyhurt,
+# as reported by sensemakr
+DARFUR = {'estimate': 0.09731582, 'se': 0.02325654, 'df': 783}
+
+
+def test_robustness_values_match_sensemakr_darfur():
+    from scipy import stats
+    
+    t_stat = DARFUR['estimate'] / DARFUR['se']
+    df = DARFUR['df']
+    f_q = abs(t_stat) / np.sqrt(df)
+    t_crit = stats.t.ppf(0.975, df=df - 1)
+    
+    assert t_stat ** 2 / (t_stat ** 2 + df) == pytest.approx(0.02187309, abs=1e-7)
+    assert _robustness_value(f_q) == pytest.approx(0.1387764, abs=1e-6)
+    assert _robustness_value(f_q - t_crit / np.sqrt(df - 1)) == pytest.approx(0.07625797, abs=1e-6)
+
+
+def test_ovb_bound_matches_sensemakr_darfur_female_benchmark():
+    # ovb_bounds(..., benchmark_covariates='female', kd=1)
+    adjusted, adjusted_se = _ovb_adjust(
+        DARFUR['estimate'], DARFUR['se'], DARFUR['df'], 0.009164246, 0.1246427
+    )
+    
+    assert adjusted == pytest.approx(0.07522, abs=1e-5)
+    assert adjusted_se == pytest.approx(0.021873, abs=1e-6)
+    assert adjusted / adjusted_se == pytest.approx(3.4389, abs=1e-3)
+
+
+def test_sensitivity_analysis_uses_regression_partial_r2(panel):
+    import statsmodels.api as sm
+    
+    result = sensitivity_analysis(
+        panel, 'T', 'Y0', ['W1', 'W2'], benchmark_multipliers=[1.0]
+    )
+    
+    fit = sm.OLS(panel['Y0'], sm.add_constant(panel[['T', 'W1', 'W2']])).fit()
+    df = fit.df_resid
+    assert result['degrees_of_freedom'] == df
+    assert result['baseline_ate'] == pytest.approx(fit.params['T'], rel=1e-10)
+    assert result['baseline_t'] == pytest.approx(fit.tvalues['T'], rel=1e-8)
+    assert result['robustness_value'] == pytest.approx(
+        _robustness_value(abs(fit.tvalues['T']) / np.sqrt(df)), rel=1e-8
+    )
+    
+    # 1x W1 benchmark from the partial R2 of W1 with treatment and outcome
+    treatment_fit = sm.OLS(panel['T'], sm.add_constant(panel[['W1', 'W2']])).fit()
+    r2_dx = treatment_fit.tvalues['W1'] ** 2 / (treatment_fit.tvalues['W1'] ** 2 + treatment_fit.df_resid)
+    r2_yx = fit.tvalues['W1'] ** 2 / (fit.tvalues['W1'] ** 2 + df)
+    r2_dz = r2_dx / (1 - r2_dx)
+    r2_zx = r2_dx ** 2 / (1 - r2_dx) ** 2
+    r2_yz = ((1 + np.sqrt(r2_zx)) / np.sqrt(1 - r2_zx)) ** 2 * r2_yx / (1 - r2_yx)
+    
+    bound = next(b for b in result['benchmarks'] if b['benchmark'] == 'W1')
+    assert bound['r2_treatment'] == pytest.approx(r2_dz, rel=1e-8)
+    assert bound['r2_outcome'] == pytest.approx(r2_yz, rel=1e-8)
+    expected, _ = _ovb_adjust(fit.params['T'], fit.bse['T'], df, r2_dz, r2_yz)
+    assert bound['adjusted_ate'] == pytest.approx(float(expected), rel=1e-8)
+
+
+# ============================================
+# DML NUISANCE CACHE
+# ============================================
+
+@pytest.fixture
+def macro_frame():
+    """Two macro treatments and three sectors driven by two market confounders."""
+    rng = np.random.default_rng(6)
+    n = 300
+    market = rng.normal(size=n)
+    vol = np.abs(rng.normal(size=n))
+    data = {
+        'SP500_Return': market,
+        'SP500_Volatility_21d': vol,
+        'Fed_Funds_Rate_Change': 0.3 * market + rng.normal(size=n),
+        'VIX_Change': -0.5 * market + vol + rng.normal(size=n),
+    }
+    for k, sector in enumerate(('Technology', 'Energy', 'Healthcare')):
+        data[f'{sector}_Return_1d'] = (
+            (k - 1) * data['Fed_Funds_Rate_Change'] + 0.5 * data['VIX_Change']
+            + market + np.sin(vol) + rng.normal(size=n)
+        )
+    frame = pd.DataFrame(data, index=pd.bdate_range('2020-01-01', periods=n))
+    frame.iloc[:25, frame.columns.get_loc('Energy_Return_1d')] = np.nan
+    return frame
+
+
+def test_shared_nuisance_cache_matches_per_cell_dml(estimator, macro_frame, monkeypatch):
+    import app.services.treatment_effects as te
+    
+    caches = []
+    
+    class RecordingCache(te.NuisanceCache):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            caches.append(self)
+    
+    monkeypatch.setattr(te, 'NuisanceCache', RecordingCache)
+    sectors = ['Technology', 'Energy', 'Healthcare']
+    treatments = ['Fed_Funds_Rate_Change', 'VIX_Change']
+    
+    shared = estimator.estimate_macro_sector_effects(
+        macro_frame, sectors=sectors, macro_treatments=treatments, method='dml'
+    )
+    
+    assert len(caches) == 1
+    cache = caches[0]
+    assert cache.n_fits == (len(sectors) + len(treatments)) * cache.n_folds
+    
+    # A fresh cache per cell fits the same folds and forests
+    for sector in sectors:
+        for treatment in treatments:
+            alone = estimator._estimate_ate_dml(
+                macro_frame, treatment, f'{sector}_Return_1d',
+                ['SP500_Return', 'SP500_Volatility_21d']
+            )
+            result = shared[sector][treatment]
+            assert result['method'] == 'double_ml'
+            assert result['sample_size'] == alone['sample_size']
+            assert result['ate'] == pytest.approx(alone['ate'], rel=1e-12)
+            assert result['standard_error'] == pytest.approx(alone['standard_error'], rel=1e-12)
+    
+    assert shared['Energy']['VIX_Change']['sample_size'] == len(macro_frame) - 25
+    assert len(caches) == 1 + len(sectors) * len(treatments)
+    assert all(c.n_fits == 2 * c.n_folds for c in caches[1:])
+
+
+# ============================================
+# IPW BOOTSTRAP
+# ============================================
+
+def _naive_ipw_bootstrap(panel, outcome, n_bootstrap, scheme, seed):
+    """The per-replicate resampling loop the chunked bootstrap replaced."""
+    from sklearn.linear_model import LogisticRegression
+    
+    T = panel['T'].values
+    T_binary = (T > np.median(T)).astype(int)
+    Y = panel[outcome].values
+    X = panel[['W1', 'W2']].values
+    ps = LogisticRegression(random_state=seed, max_iter=1000).fit(X, T_binary).predict_proba(X)[:, 1]
+    ps = np.clip(ps, 0.01, 0.99)
+    
+    rng = np.random.default_rng(seed)
+    n = len(Y)
+    ates = []
+    for _ in range(n_bootstrap):
+        if scheme == 'multinomial':
+            counts = np.bincount(rng.integers(0, n, size=n), minlength=n)
+        else:
+            counts = rng.poisson(1.0, size=n)
+        w_t = counts * T_binary / ps
+        w_c = counts * (1 - T_binary) / (1 - ps)
+        if w_t.sum() > 0 and w_c.sum() > 0:
+            ates.append(np.sum(Y * w_t) / w_t.sum() - np.sum(Y * w_c) / w_c.sum())
+    return np.array(ates)
+
+
+@pytest.mark.parametrize('scheme', ['multinomial', 'poisson'])
+@pytest.mark.parametrize('max_chunk_cells', [2_000_000, 5_000])
+def test_ipw_chunked_bootstrap_matches_resampling_loop(estimator, panel, scheme, max_chunk_cells):
+    result = estimator._estimate_ate_ipw(
+        panel, 'T', 'Y1', ['W1', 'W2'],
+        n_bootstrap=300, bootstrap=scheme, max_chunk_cells=max_chunk_cells
+    )
+    ates = _naive_ipw_bootstrap(panel, 'Y1', 300, scheme, seed=0)
+    
+    assert result['method'] == 'ipw'
+    assert result['n_bootstrap'] == len(ates) == 300
+    assert result['standard_error'] == pytest.approx(np.std(ates), rel=1e-8)
+    lower, upper = np.percentile(ates, [2.5, 97.5])
+    assert result['ci_lower'] == pytest.approx(lower, rel=1e-8)
+    assert result['ci_upper'] == pytest.approx(upper, rel=1e-8)